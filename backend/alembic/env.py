@@ -26,6 +26,7 @@ from app.models import (
     user_group,  # noqa: F401
     user_group_member,  # noqa: F401
     scheduler_control,  # noqa: F401
+    number_counter,  # noqa: F401
 )
 
 # this is the Alembic Config object, which provides
@@ -0,0 +1,91 @@
+"""Maintain a work order count on assets
+
+Revision ID: add_asset_work_order_count
+Revises: add_report_indexes
+Create Date: 2026-10-16 17:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'add_asset_work_order_count'
+down_revision: Union[str, None] = 'add_report_indexes'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+ASSET_WO_COUNT_SQL = (
+    "UPDATE assets SET work_order_count = ("
+    "SELECT COUNT(*) FROM work_orders WHERE asset_id = {row}.asset_id"
+    ") WHERE id = {row}.asset_id"
+)
+
+# (trigger name suffix, event, affected rows) for SQLite, which has one event per trigger
+SQLITE_TRIGGERS = [
+    ('insert', 'INSERT', ('NEW',)),
+    ('delete', 'DELETE', ('OLD',)),
+    ('update', 'UPDATE OF asset_id', ('OLD', 'NEW')),
+]
+
+
+def upgrade() -> None:
+    """Add assets.work_order_count, keep it current with triggers and index it per organization."""
+    op.add_column(
+        'assets',
+        sa.Column('work_order_count', sa.Integer(), server_default='0', nullable=False),
+    )
+
+    if op.get_bind().dialect.name == 'postgresql':
+        op.execute(
+            "CREATE OR REPLACE FUNCTION recount_asset_work_orders() RETURNS trigger AS $$\n"
+            "BEGIN\n"
+            "    IF TG_OP <> 'INSERT' THEN\n"
+            f"        {ASSET_WO_COUNT_SQL.format(row='OLD')};\n"
+            "    END IF;\n"
+            "    IF TG_OP <> 'DELETE' THEN\n"
+            f"        {ASSET_WO_COUNT_SQL.format(row='NEW')};\n"
+            "    END IF;\n"
+            "    RETURN NULL;\n"
+            "END;\n"
+            "$$ LANGUAGE plpgsql"
+        )
+        op.execute(
+            "CREATE TRIGGER trg_work_orders_asset_count "
+            "AFTER INSERT OR DELETE OR UPDATE OF asset_id "
+            "ON work_orders FOR EACH ROW EXECUTE FUNCTION recount_asset_work_orders()"
+        )
+    else:
+        for name, event, rows in SQLITE_TRIGGERS:
+            op.execute(
+                f"CREATE TRIGGER trg_work_orders_asset_count_{name} "
+                f"AFTER {event} ON work_orders BEGIN "
+                + "".join(f"{ASSET_WO_COUNT_SQL.format(row=row)}; " for row in rows)
+                + "END"
+            )
+
+    # Count existing work orders
+    op.execute(
+        "UPDATE assets SET work_order_count = ("
+        "SELECT COUNT(*) FROM work_orders WHERE asset_id = assets.id)"
+    )
+    op.create_index(
+        'ix_asset_org_work_order_count',
+        'assets',
+        ['organization_id', 'work_order_count'],
+    )
+
+
+def downgrade() -> None:
+    """Drop the work order count, its index and its triggers."""
+    op.drop_index('ix_asset_org_work_order_count', 'assets')
+    if op.get_bind().dialect.name == 'postgresql':
+        op.execute("DROP TRIGGER IF EXISTS trg_work_orders_asset_count ON work_orders")
+        op.execute("DROP FUNCTION IF EXISTS recount_asset_work_orders()")
+    else:
+        for name, _, _ in SQLITE_TRIGGERS:
+            op.execute(f"DROP TRIGGER IF EXISTS trg_work_orders_asset_count_{name}")
+    with op.batch_alter_table('assets') as batch_op:
+        batch_op.drop_column('work_order_count')
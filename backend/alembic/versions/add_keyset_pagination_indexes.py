@@ -0,0 +1,40 @@
+"""Add composite indexes for keyset pagination
+
+Revision ID: add_keyset_pagination_indexes
+Revises: add_rpn_score_to_assets
+Create Date: 2026-10-16 09:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'add_keyset_pagination_indexes'
+down_revision: Union[str, None] = 'add_rpn_score_to_assets'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Add indexes backing cursor pagination on vendors, purchase orders and locations."""
+    op.create_index('ix_vendors_organization_id_code', 'vendors', ['organization_id', 'code'])
+    op.create_index(
+        'ix_purchase_orders_organization_id_id',
+        'purchase_orders',
+        ['organization_id', 'id'],
+    )
+    op.create_index(
+        'ix_locations_organization_id_hierarchy_path_id',
+        'locations',
+        ['organization_id', 'hierarchy_path', 'id'],
+    )
+
+
+def downgrade() -> None:
+    """Remove keyset pagination indexes."""
+    op.drop_index('ix_locations_organization_id_hierarchy_path_id', 'locations')
+    op.drop_index('ix_purchase_orders_organization_id_id', 'purchase_orders')
+    op.drop_index('ix_vendors_organization_id_code', 'vendors')
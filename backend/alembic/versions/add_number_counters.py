@@ -0,0 +1,42 @@
+"""Add per-organization document number counters
+
+Revision ID: add_number_counters
+Revises: add_keyset_pagination_indexes
+Create Date: 2026-10-16 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'add_number_counters'
+down_revision: Union[str, None] = 'add_keyset_pagination_indexes'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Add number_counters table and seed PO counters from existing purchase orders."""
+    op.create_table(
+        'number_counters',
+        sa.Column('organization_id', sa.Integer(), nullable=False),
+        sa.Column('name', sa.String(length=50), nullable=False),
+        sa.Column('last_value', sa.BigInteger(), nullable=False),
+        sa.ForeignKeyConstraint(
+            ['organization_id'], ['organizations.id'],
+            name='fk_number_counters_organization_id_organizations',
+        ),
+        sa.PrimaryKeyConstraint('organization_id', 'name', name='pk_number_counters'),
+    )
+    op.execute(
+        "INSERT INTO number_counters (organization_id, name, last_value) "
+        "SELECT organization_id, 'purchase_order', COUNT(*) FROM purchase_orders GROUP BY organization_id"
+    )
+
+
+def downgrade() -> None:
+    """Remove number_counters table."""
+    op.drop_table('number_counters')
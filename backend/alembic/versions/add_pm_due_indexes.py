@@ -0,0 +1,40 @@
+"""Add PM due-list and numbering indexes
+
+Revision ID: add_pm_due_indexes
+Revises: seed_pm_and_wo_counters
+Create Date: 2026-10-16 14:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'add_pm_due_indexes'
+down_revision: Union[str, None] = 'seed_pm_and_wo_counters'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Add a partial index over active PMs by due date and a tenant-scoped PM number index."""
+    op.create_index(
+        'ix_pm_org_due_active',
+        'preventive_maintenance',
+        ['organization_id', 'next_due_date'],
+        postgresql_where=sa.text('is_active'),
+        sqlite_where=sa.text('is_active'),
+    )
+    op.create_index(
+        'ix_pm_organization_id_pm_number',
+        'preventive_maintenance',
+        ['organization_id', 'pm_number'],
+    )
+
+
+def downgrade() -> None:
+    """Remove PM due-list and numbering indexes."""
+    op.drop_index('ix_pm_organization_id_pm_number', 'preventive_maintenance')
+    op.drop_index('ix_pm_org_due_active', 'preventive_maintenance')
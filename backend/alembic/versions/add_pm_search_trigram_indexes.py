@@ -0,0 +1,51 @@
+"""Add pg_trgm indexes for PM and job plan searches
+
+Revision ID: add_pm_search_trigram_indexes
+Revises: add_pm_due_indexes
+Create Date: 2026-10-16 15:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'add_pm_search_trigram_indexes'
+down_revision: Union[str, None] = 'add_pm_due_indexes'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# (index name, table, column) for every column searched with ILIKE '%term%'
+TRIGRAM_INDEXES = [
+    ('ix_pm_pm_number_trgm', 'preventive_maintenance', 'pm_number'),
+    ('ix_pm_name_trgm', 'preventive_maintenance', 'name'),
+    ('ix_job_plans_code_trgm', 'job_plans', 'code'),
+    ('ix_job_plans_name_trgm', 'job_plans', 'name'),
+]
+
+
+def upgrade() -> None:
+    """Add GIN trigram indexes backing PM and job plan searches (PostgreSQL only)."""
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+
+    op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    for name, table, column in TRIGRAM_INDEXES:
+        op.create_index(
+            name,
+            table,
+            [column],
+            postgresql_using='gin',
+            postgresql_ops={column: 'gin_trgm_ops'},
+        )
+
+
+def downgrade() -> None:
+    """Remove PM and job plan trigram search indexes."""
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+
+    for name, table, _ in reversed(TRIGRAM_INDEXES):
+        op.drop_index(name, table)
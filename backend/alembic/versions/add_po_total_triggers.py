@@ -0,0 +1,104 @@
+"""Compute purchase order totals in the database
+
+Revision ID: add_po_total_triggers
+Revises: add_search_trigram_indexes
+Create Date: 2026-10-16 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'add_po_total_triggers'
+down_revision: Union[str, None] = 'add_search_trigram_indexes'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+PO_SUBTOTAL_SQL = (
+    "UPDATE purchase_orders SET subtotal = ("
+    "SELECT COALESCE(SUM(total_cost), 0) FROM purchase_order_lines "
+    "WHERE purchase_order_id = {row}.purchase_order_id"
+    ") WHERE id = {row}.purchase_order_id"
+)
+
+# (trigger name suffix, event, affected rows) for SQLite, which has one event per trigger
+SQLITE_TRIGGERS = [
+    ('insert', 'INSERT', ('NEW',)),
+    ('delete', 'DELETE', ('OLD',)),
+    ('update', 'UPDATE OF quantity_ordered, unit_cost, purchase_order_id', ('OLD', 'NEW')),
+]
+
+
+def _replace_column(table: str, column: str, new_column: sa.Column) -> None:
+    """Swap `column` for `new_column`; SQLite needs a table rebuild to add a generated column."""
+    with op.batch_alter_table(table) as batch_op:
+        batch_op.drop_column(column)
+    with op.batch_alter_table(table) as batch_op:
+        batch_op.add_column(new_column)
+
+
+def upgrade() -> None:
+    """Make line and PO totals generated columns and maintain PO subtotals with triggers."""
+    _replace_column('purchase_order_lines', 'total_cost', sa.Column(
+        'total_cost', sa.Float(), sa.Computed('quantity_ordered * unit_cost', persisted=True), nullable=False,
+    ))
+    _replace_column('purchase_orders', 'total', sa.Column(
+        'total', sa.Float(), sa.Computed('subtotal + tax + shipping_cost', persisted=True), nullable=False,
+    ))
+
+    if op.get_bind().dialect.name == 'postgresql':
+        op.execute(
+            "CREATE OR REPLACE FUNCTION recompute_po_subtotal() RETURNS trigger AS $$\n"
+            "BEGIN\n"
+            "    IF TG_OP <> 'INSERT' THEN\n"
+            f"        {PO_SUBTOTAL_SQL.format(row='OLD')};\n"
+            "    END IF;\n"
+            "    IF TG_OP <> 'DELETE' THEN\n"
+            f"        {PO_SUBTOTAL_SQL.format(row='NEW')};\n"
+            "    END IF;\n"
+            "    RETURN NULL;\n"
+            "END;\n"
+            "$$ LANGUAGE plpgsql"
+        )
+        op.execute(
+            "CREATE TRIGGER trg_purchase_order_lines_subtotal "
+            "AFTER INSERT OR DELETE OR UPDATE OF quantity_ordered, unit_cost, purchase_order_id "
+            "ON purchase_order_lines FOR EACH ROW EXECUTE FUNCTION recompute_po_subtotal()"
+        )
+    else:
+        for name, event, rows in SQLITE_TRIGGERS:
+            op.execute(
+                f"CREATE TRIGGER trg_purchase_order_lines_subtotal_{name} "
+                f"AFTER {event} ON purchase_order_lines BEGIN "
+                + "".join(f"{PO_SUBTOTAL_SQL.format(row=row)}; " for row in rows)
+                + "END"
+            )
+
+    # Bring existing subtotals in line with their lines
+    op.execute(
+        "UPDATE purchase_orders SET subtotal = ("
+        "SELECT COALESCE(SUM(total_cost), 0) FROM purchase_order_lines "
+        "WHERE purchase_order_id = purchase_orders.id)"
+    )
+
+
+def downgrade() -> None:
+    """Drop the subtotal triggers and turn the totals back into plain columns."""
+    if op.get_bind().dialect.name == 'postgresql':
+        op.execute("DROP TRIGGER IF EXISTS trg_purchase_order_lines_subtotal ON purchase_order_lines")
+        op.execute("DROP FUNCTION IF EXISTS recompute_po_subtotal()")
+    else:
+        for name, _, _ in SQLITE_TRIGGERS:
+            op.execute(f"DROP TRIGGER IF EXISTS trg_purchase_order_lines_subtotal_{name}")
+
+    _replace_column('purchase_orders', 'total', sa.Column(
+        'total', sa.Float(), server_default='0', nullable=False,
+    ))
+    op.execute("UPDATE purchase_orders SET total = subtotal + tax + shipping_cost")
+    _replace_column('purchase_order_lines', 'total_cost', sa.Column(
+        'total_cost', sa.Float(), server_default='0', nullable=False,
+    ))
+    op.execute("UPDATE purchase_order_lines SET total_cost = quantity_ordered * unit_cost")
@@ -0,0 +1,51 @@
+"""Add tenant-scoped indexes for report aggregates
+
+Revision ID: add_report_indexes
+Revises: add_pm_search_trigram_indexes
+Create Date: 2026-10-16 16:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'add_report_indexes'
+down_revision: Union[str, None] = 'add_pm_search_trigram_indexes'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# (index name, table, columns)
+INDEXES = [
+    ('ix_wo_org_status_due', 'work_orders', ['organization_id', 'status', 'due_date']),
+    ('ix_wo_org_created', 'work_orders', ['organization_id', 'created_at']),
+    (
+        'ix_wo_org_asset_worktype_status',
+        'work_orders',
+        ['organization_id', 'asset_id', 'work_type', 'status'],
+    ),
+    ('ix_asset_org_active_status', 'assets', ['organization_id', 'is_active', 'status']),
+    ('ix_stock_level_part_reorder', 'stock_levels', ['part_id', 'available_quantity', 'reorder_point']),
+]
+
+
+def upgrade() -> None:
+    """Add composite indexes behind dashboard and report predicates."""
+    for name, table, columns in INDEXES:
+        op.create_index(name, table, columns)
+    op.create_index(
+        'ix_wo_org_actual_end',
+        'work_orders',
+        ['organization_id', 'actual_end'],
+        postgresql_where=sa.text("status = 'COMPLETED'"),
+        sqlite_where=sa.text("status = 'COMPLETED'"),
+    )
+
+
+def downgrade() -> None:
+    """Remove report indexes."""
+    op.drop_index('ix_wo_org_actual_end', 'work_orders')
+    for name, table, _ in reversed(INDEXES):
+        op.drop_index(name, table)
@@ -0,0 +1,54 @@
+"""Add pg_trgm indexes for ILIKE searches
+
+Revision ID: add_search_trigram_indexes
+Revises: add_number_counters
+Create Date: 2026-10-16 11:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'add_search_trigram_indexes'
+down_revision: Union[str, None] = 'add_number_counters'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# (index name, table, column) for every column searched with ILIKE '%term%'
+TRIGRAM_INDEXES = [
+    ('ix_parts_part_number_trgm', 'parts', 'part_number'),
+    ('ix_parts_name_trgm', 'parts', 'name'),
+    ('ix_vendors_code_trgm', 'vendors', 'code'),
+    ('ix_vendors_name_trgm', 'vendors', 'name'),
+    ('ix_locations_code_trgm', 'locations', 'code'),
+    ('ix_locations_name_trgm', 'locations', 'name'),
+    ('ix_purchase_orders_po_number_trgm', 'purchase_orders', 'po_number'),
+]
+
+
+def upgrade() -> None:
+    """Add GIN trigram indexes backing substring searches (PostgreSQL only)."""
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+
+    op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    for name, table, column in TRIGRAM_INDEXES:
+        op.create_index(
+            name,
+            table,
+            [column],
+            postgresql_using='gin',
+            postgresql_ops={column: 'gin_trgm_ops'},
+        )
+
+
+def downgrade() -> None:
+    """Remove trigram search indexes."""
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+
+    for name, table, _ in reversed(TRIGRAM_INDEXES):
+        op.drop_index(name, table)
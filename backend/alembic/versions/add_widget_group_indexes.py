@@ -0,0 +1,52 @@
+"""Add indexes for dashboard widget group-bys
+
+Grouped widgets filter on organization and a created_at range and group by
+one column. Leading with (organization_id, <group column>, created_at) lets
+the planner read each group's rows for the period in index order instead of
+hash-aggregating a scan of the organization's rows. Asset status groups are
+already served by ix_asset_org_active_status.
+
+Revision ID: add_widget_group_indexes
+Revises: add_asset_work_order_count
+Create Date: 2026-10-16 18:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'add_widget_group_indexes'
+down_revision: Union[str, None] = 'add_asset_work_order_count'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# (index name, table, columns)
+INDEXES = [
+    ('ix_wo_org_status_created', 'work_orders', ['organization_id', 'status', 'created_at']),
+    ('ix_wo_org_priority_created', 'work_orders', ['organization_id', 'priority', 'created_at']),
+    ('ix_wo_org_worktype_created', 'work_orders', ['organization_id', 'work_type', 'created_at']),
+    ('ix_labor_org_craft_created', 'labor_transactions', ['organization_id', 'craft', 'created_at']),
+]
+
+
+def upgrade() -> None:
+    """Add composite indexes behind grouped dashboard widgets."""
+    for name, table, columns in INDEXES:
+        op.create_index(name, table, columns)
+    op.create_index(
+        'ix_wo_org_failure_code_created',
+        'work_orders',
+        ['organization_id', 'failure_code', 'created_at'],
+        postgresql_where=sa.text('failure_code IS NOT NULL'),
+        sqlite_where=sa.text('failure_code IS NOT NULL'),
+    )
+
+
+def downgrade() -> None:
+    """Remove widget group-by indexes."""
+    op.drop_index('ix_wo_org_failure_code_created', 'work_orders')
+    for name, table, _ in reversed(INDEXES):
+        op.drop_index(name, table)
@@ -0,0 +1,39 @@
+"""Seed PM and work order number counters
+
+Revision ID: seed_pm_and_wo_counters
+Revises: add_po_total_triggers
+Create Date: 2026-10-16 13:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'seed_pm_and_wo_counters'
+down_revision: Union[str, None] = 'add_po_total_triggers'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# (counter name, numbered table)
+COUNTERS = [
+    ('preventive_maintenance', 'preventive_maintenance'),
+    ('work_order', 'work_orders'),
+]
+
+
+def upgrade() -> None:
+    """Seed PM and work order counters from existing rows."""
+    for name, table in COUNTERS:
+        op.execute(
+            "INSERT INTO number_counters (organization_id, name, last_value) "
+            f"SELECT organization_id, '{name}', COUNT(*) FROM {table} GROUP BY organization_id"
+        )
+
+
+def downgrade() -> None:
+    """Remove PM and work order counters."""
+    for name, _ in COUNTERS:
+        op.execute(f"DELETE FROM number_counters WHERE name = '{name}'")
@@ -1,14 +1,18 @@
 """
 API dependencies for authentication, authorization, and common operations.
 """
-from typing import Optional, Generator, Annotated
-from fastapi import Depends, HTTPException, status, Header, Query
+import base64
+import json
+from typing import Any, Optional, Generator, AsyncGenerator, Annotated
+from fastapi import Depends, HTTPException, status, Header, Query, Request, Response
+from pydantic import TypeAdapter
 from fastapi.security import OAuth2PasswordBearer
-from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.ext.asyncio import AsyncSession, AsyncMappingResult
 from sqlalchemy import select
 from sqlalchemy.orm import selectinload
 
-from app.core.database import get_db
+from app.core.cache import bump_cache_version
+from app.core.database import get_db, get_read_db
 from app.core.security import decode_token, verify_password
 from app.core.config import get_settings
 from app.models.user import User, APIKey
@@ -132,6 +136,22 @@ async def get_current_superuser(
     return current_user
 
 
+async def invalidate_reports_cache(
+    request: Request,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+) -> AsyncGenerator[None, None]:
+    """
+    Invalidate the organization's cached dashboard and notifications after a
+    successful write. Commits first so a concurrent reader can't cache the
+    pre-write rows under the new version.
+    """
+    yield
+    if request.method not in ("GET", "HEAD"):
+        await db.commit()
+        await bump_cache_version("reports", current_user.organization_id)
+
+
 class PermissionChecker:
     """
     Dependency for checking user permissions.
@@ -180,10 +200,92 @@ class PaginationParams:
         self.page_size = page_size
         self.offset = (page - 1) * page_size
 
+    def page_count(self, total: Optional[int]) -> Optional[int]:
+        """Number of pages holding `total` items, or None when the total is unknown."""
+        if total is None:
+            return None
+        return -(-total // self.page_size)
+
+
+def encode_cursor(*values: Any) -> str:
+    """Encode the sort key of the last row on a page into an opaque keyset cursor."""
+    return base64.urlsafe_b64encode(json.dumps(list(values)).encode()).decode()
+
+
+def decode_cursor(cursor: str, *types: type) -> list:
+    """
+    Decode a cursor produced by encode_cursor.
+    Raises 400 unless the cursor carries one value of each of `types`, in order.
+    """
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+    except ValueError:
+        values = None
+
+    if (
+        not isinstance(values, list)
+        or len(values) != len(types)
+        or not all(
+            isinstance(value, expected) and not isinstance(value, bool)
+            for value, expected in zip(values, types)
+        )
+    ):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor",
+        )
+    return values
+
+
+def serialized_response(adapter: TypeAdapter, value: Any) -> Response:
+    """
+    Validate `value` once with a prebuilt TypeAdapter and return it as JSON bytes.
+    Used on hot list endpoints to skip FastAPI's second validate-and-serialize
+    pass over the response_model, which stays on the route for OpenAPI docs.
+    """
+    return Response(
+        content=adapter.dump_json(adapter.validate_python(value)),
+        media_type="application/json",
+    )
+
+
+async def serialized_partitions_response(adapter: TypeAdapter, result: AsyncMappingResult) -> Response:
+    """
+    Serialize a streamed result into one JSON array, a partition at a time.
+    `adapter` validates a list of rows; only one partition of rows and its
+    validated models are alive at once, the rest is already JSON bytes.
+    The body is still built in full because the request's session closes
+    before a StreamingResponse would start reading from its cursor.
+    """
+    chunks = [
+        adapter.dump_json(adapter.validate_python(partition))[1:-1]
+        async for partition in result.partitions()
+    ]
+    return Response(content=b"[" + b",".join(chunks) + b"]", media_type="application/json")
+
+
+# Trigram (pg_trgm) indexes can only serve patterns with at least three characters
+MIN_SUBSTRING_SEARCH = 3
+
+
+def search_pattern(search: Optional[str]) -> Optional[str]:
+    """
+    Build the ILIKE pattern for a free-text search parameter.
+    Returns None for a blank search so callers skip the filter entirely; terms
+    shorter than MIN_SUBSTRING_SEARCH match as a prefix instead of a substring.
+    """
+    if not search or not search.strip():
+        return None
+    search = search.strip()
+    if len(search) < MIN_SUBSTRING_SEARCH:
+        return f"{search}%"
+    return f"%{search}%"
+
 
 # Type aliases for cleaner signatures
 CurrentUser = Annotated[User, Depends(get_current_user)]
 CurrentActiveUser = Annotated[User, Depends(get_current_active_user)]
 CurrentSuperuser = Annotated[User, Depends(get_current_superuser)]
 DBSession = Annotated[AsyncSession, Depends(get_db)]
+ReadDBSession = Annotated[AsyncSession, Depends(get_read_db)]
 Pagination = Annotated[PaginationParams, Depends()]
@@ -249,7 +249,7 @@ async def list_assets(
         total=total,
         page=pagination.page,
         page_size=pagination.page_size,
-        pages=(total + pagination.page_size - 1) // pagination.page_size,
+        pages=pagination.page_count(total),
     )
 
 
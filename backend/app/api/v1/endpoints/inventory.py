@@ -4,11 +4,21 @@ Inventory management endpoints.
 from typing import Any, List, Optional, Dict
 from datetime import datetime, timedelta, date
 
-from fastapi import APIRouter, HTTPException, status, Query
-from sqlalchemy import select, func
-from sqlalchemy.orm import selectinload
-
-from app.api.deps import DBSession, CurrentUser, Pagination
+from fastapi import APIRouter, HTTPException, status, Query, Request
+from pydantic import TypeAdapter
+from sqlalchemy import select, insert, update, func, lambda_stmt, tuple_, case, cast, exists
+from sqlalchemy.orm import selectinload, joinedload, raiseload
+
+from app.api.deps import (
+    DBSession,
+    CurrentUser,
+    Pagination,
+    encode_cursor,
+    decode_cursor,
+    search_pattern,
+    serialized_response,
+)
+from app.core.cache import etag_response, bump_cache_version
 from app.models.inventory import (
     Part,
     PartCategory,
@@ -27,6 +37,7 @@ from app.models.inventory import (
     CycleCountStatus,
 )
 from app.models.scheduler_control import SchedulerControl
+from app.services.numbering import next_number
 from app.schemas.inventory import (
     PartCreate,
     PartUpdate,
@@ -59,6 +70,150 @@ from app.models.work_order import MaterialTransaction
 
 router = APIRouter()
 
+# Column projections for read-only list endpoints; rows are returned as plain
+# mappings and validated once by the endpoint's response_model.
+_PART_COLUMNS = (
+    Part.id,
+    Part.organization_id,
+    Part.part_number,
+    Part.name,
+    Part.description,
+    Part.category_id,
+    Part.part_type,
+    Part.uom,
+    Part.status,
+    Part.manufacturer,
+    Part.manufacturer_part_number,
+    Part.primary_vendor_id,
+    Part.vendor_part_number,
+    Part.unit_cost,
+    Part.average_cost,
+    Part.last_cost,
+    Part.barcode,
+    Part.weight,
+    Part.weight_uom,
+    Part.dimensions,
+    Part.custom_fields,
+    Part.created_at,
+    Part.updated_at,
+)
+_STOREROOM_COLUMNS = (
+    Storeroom.id,
+    Storeroom.organization_id,
+    Storeroom.code,
+    Storeroom.name,
+    Storeroom.description,
+    Storeroom.location_id,
+    Storeroom.is_default,
+    Storeroom.is_active,
+    Storeroom.created_at,
+    Storeroom.updated_at,
+)
+_STOCK_LEVEL_COLUMNS = (
+    StockLevel.id,
+    StockLevel.part_id,
+    StockLevel.storeroom_id,
+    StockLevel.current_balance,
+    StockLevel.reserved_quantity,
+    StockLevel.available_quantity,
+    StockLevel.reorder_point,
+    StockLevel.reorder_quantity,
+    StockLevel.min_level,
+    StockLevel.max_level,
+    StockLevel.safety_stock,
+    StockLevel.bin_location,
+    StockLevel.last_receipt_date,
+    StockLevel.last_issue_date,
+)
+_CYCLE_COUNT_COLUMNS = (
+    CycleCount.id,
+    CycleCount.name,
+    CycleCount.description,
+    CycleCount.status,
+    CycleCount.storeroom_id,
+    CycleCount.scheduled_date,
+    CycleCount.started_at,
+    CycleCount.completed_at,
+    CycleCount.bin_prefix,
+    CycleCount.category_ids,
+    CycleCount.part_type_filter,
+    CycleCount.used_in_last_days,
+    CycleCount.usage_start_date,
+    CycleCount.usage_end_date,
+    CycleCount.include_zero_movement,
+    CycleCount.transacted_only,
+    CycleCount.line_limit,
+    CycleCount.total_lines,
+    CycleCount.total_variance,
+    CycleCount.created_at,
+    CycleCount.updated_at,
+)
+
+_VENDOR_COLUMNS = (
+    Vendor.id,
+    Vendor.organization_id,
+    Vendor.code,
+    Vendor.name,
+    Vendor.description,
+    Vendor.contact_name,
+    Vendor.email,
+    Vendor.phone,
+    Vendor.fax,
+    Vendor.website,
+    Vendor.address_line1,
+    Vendor.address_line2,
+    Vendor.city,
+    Vendor.state,
+    Vendor.postal_code,
+    Vendor.country,
+    Vendor.payment_terms,
+    Vendor.lead_time_days,
+    Vendor.currency,
+    Vendor.rating,
+    Vendor.is_active,
+    Vendor.is_approved,
+    Vendor.created_at,
+    Vendor.updated_at,
+)
+_PURCHASE_ORDER_COLUMNS = (
+    PurchaseOrder.id,
+    PurchaseOrder.organization_id,
+    PurchaseOrder.po_number,
+    PurchaseOrder.description,
+    PurchaseOrder.vendor_id,
+    PurchaseOrder.status,
+    PurchaseOrder.order_date,
+    PurchaseOrder.expected_date,
+    PurchaseOrder.received_date,
+    PurchaseOrder.ship_to_storeroom_id,
+    PurchaseOrder.shipping_method,
+    PurchaseOrder.tracking_number,
+    PurchaseOrder.subtotal,
+    PurchaseOrder.tax,
+    PurchaseOrder.shipping_cost,
+    PurchaseOrder.total,
+    PurchaseOrder.currency,
+    PurchaseOrder.payment_terms,
+    PurchaseOrder.requisition_number,
+    PurchaseOrder.approved_by_id,
+    PurchaseOrder.approved_at,
+    PurchaseOrder.notes,
+    PurchaseOrder.created_at,
+    PurchaseOrder.updated_at,
+)
+# Row keys for the paginated lists, whose rows may carry a trailing window-count column
+_PART_KEYS = tuple(column.key for column in _PART_COLUMNS)
+_VENDOR_KEYS = tuple(column.key for column in _VENDOR_COLUMNS)
+_PURCHASE_ORDER_KEYS = tuple(column.key for column in _PURCHASE_ORDER_COLUMNS)
+
+# Prebuilt validators/serializers for list responses, built once at import
+_PART_PAGE_ADAPTER = TypeAdapter(PaginatedResponse[PartResponse])
+_CYCLE_COUNT_PAGE_ADAPTER = TypeAdapter(PaginatedResponse[CycleCountResponse])
+_VENDOR_PAGE_ADAPTER = TypeAdapter(PaginatedResponse[VendorResponse])
+_PURCHASE_ORDER_PAGE_ADAPTER = TypeAdapter(PaginatedResponse[PurchaseOrderResponse])
+_STOREROOM_LIST_ADAPTER = TypeAdapter(List[StoreroomResponse])
+_CATEGORY_LIST_ADAPTER = TypeAdapter(List[PartCategoryResponse])
+
 
 # Part endpoints
 
@@ -75,37 +230,59 @@ async def list_parts(
     """
     List parts in the organization.
     """
-    query = select(Part).where(Part.organization_id == current_user.organization_id)
+    # Lambda statements let SQLAlchemy reuse the compiled SQL across requests;
+    # each optional filter is its own cache-keyed criteria step.
+    org_id = current_user.organization_id
+    query = lambda_stmt(lambda: select(*_PART_COLUMNS).where(Part.organization_id == org_id))
+    count_query = lambda_stmt(
+        lambda: select(func.count()).select_from(Part).where(Part.organization_id == org_id)
+    )
 
+    filters = []
     if category_id:
-        query = query.where(Part.category_id == category_id)
+        filters.append(lambda s: s.where(Part.category_id == category_id))
 
     if status:
-        query = query.where(Part.status == status)
-
-    if search:
-        search_filter = f"%{search}%"
-        query = query.where(
-            (Part.part_number.ilike(search_filter))
-            | (Part.name.ilike(search_filter))
+        filters.append(lambda s: s.where(Part.status == status))
+
+    search_filter = search_pattern(search)
+    if search_filter:
+        filters.append(
+            lambda s: s.where(
+                (Part.part_number.ilike(search_filter))
+                | (Part.name.ilike(search_filter))
+            )
         )
 
-    # Count total
-    count_query = select(func.count()).select_from(query.subquery())
-    total = await db.scalar(count_query)
-
-    # Get paginated results
-    query = query.order_by(Part.part_number).offset(pagination.offset).limit(pagination.page_size)
+    for criteria in filters:
+        query += criteria
+        count_query += criteria
+
+    # Get paginated results with the filtered total as a window count on every
+    # row; only a page past the end needs the separate COUNT
+    offset, limit = pagination.offset, pagination.page_size
+    query += lambda s: (
+        s.add_columns(func.count().over().label("total_count"))
+        .order_by(Part.part_number)
+        .offset(offset)
+        .limit(limit)
+    )
     result = await db.execute(query)
-    parts = result.scalars().all()
+    rows = result.all()
+    parts = [dict(zip(_PART_KEYS, row)) for row in rows]
+
+    if rows:
+        total = rows[0].total_count
+    else:
+        total = await db.scalar(count_query) if offset else 0
 
-    return PaginatedResponse(
+    return serialized_response(_PART_PAGE_ADAPTER, dict(
         items=parts,
         total=total,
         page=pagination.page,
         page_size=pagination.page_size,
-        pages=(total + pagination.page_size - 1) // pagination.page_size,
-    )
+        pages=pagination.page_count(total),
+    ))
 
 
 @router.get("/parts/low-stock", response_model=List[PartDetailResponse])
@@ -198,7 +375,6 @@ async def create_part(
             db.add(stock)
 
     await db.commit()
-    await db.refresh(part)
 
     return part
 
@@ -212,11 +388,14 @@ async def get_part(
     """
     Get part by ID with stock levels.
     """
+    org_id = current_user.organization_id
     result = await db.execute(
-        select(Part)
-        .options(selectinload(Part.stock_levels))
-        .where(Part.id == part_id)
-        .where(Part.organization_id == current_user.organization_id)
+        lambda_stmt(
+            lambda: select(Part)
+            .options(selectinload(Part.stock_levels))
+            .where(Part.id == part_id)
+            .where(Part.organization_id == org_id)
+        )
     )
     part = result.scalar_one_or_none()
 
@@ -262,7 +441,6 @@ async def update_part(
 
     part.updated_by_id = current_user.id
     await db.commit()
-    await db.refresh(part)
 
     return part
 
@@ -277,13 +455,15 @@ async def list_storerooms(
     """
     List storerooms.
     """
+    org_id = current_user.organization_id
     result = await db.execute(
-        select(Storeroom)
-        .where(Storeroom.organization_id == current_user.organization_id)
-        .order_by(Storeroom.code)
+        lambda_stmt(
+            lambda: select(*_STOREROOM_COLUMNS)
+            .where(Storeroom.organization_id == org_id)
+            .order_by(Storeroom.code)
+        )
     )
-    storerooms = result.scalars().all()
-    return storerooms
+    return serialized_response(_STOREROOM_LIST_ADAPTER, result.mappings().all())
 
 
 @router.post("/storerooms", response_model=StoreroomResponse, status_code=status.HTTP_201_CREATED)
@@ -303,7 +483,6 @@ async def create_storeroom(
 
     db.add(storeroom)
     await db.commit()
-    await db.refresh(storeroom)
 
     return storeroom
 
@@ -330,12 +509,10 @@ async def get_storeroom_stock(
         )
 
     result = await db.execute(
-        select(StockLevel)
+        select(*_STOCK_LEVEL_COLUMNS)
         .where(StockLevel.storeroom_id == storeroom_id)
     )
-    stock_levels = result.scalars().all()
-
-    return stock_levels
+    return [dict(row) for row in result.mappings()]
 
 
 @router.put("/stock/{stock_id}", response_model=StockLevelResponse)
@@ -368,7 +545,6 @@ async def update_stock_settings(
 
     stock.updated_by_id = current_user.id
     await db.commit()
-    await db.refresh(stock)
 
     return stock
 
@@ -386,12 +562,15 @@ async def adjust_stock(
     Adjust stock quantity (inventory count, correction).
     """
     # Get or create stock level
+    org_id = current_user.organization_id
     result = await db.execute(
-        select(StockLevel)
-        .join(Part)
-        .where(StockLevel.part_id == part_id)
-        .where(StockLevel.storeroom_id == storeroom_id)
-        .where(Part.organization_id == current_user.organization_id)
+        lambda_stmt(
+            lambda: select(StockLevel)
+            .join(Part)
+            .where(StockLevel.part_id == part_id)
+            .where(StockLevel.storeroom_id == storeroom_id)
+            .where(Part.organization_id == org_id)
+        )
     )
     stock = result.scalar_one_or_none()
 
@@ -409,7 +588,7 @@ async def adjust_stock(
 
     # Get part for cost
     result = await db.execute(
-        select(Part).where(Part.id == part_id)
+        lambda_stmt(lambda: select(Part).where(Part.id == part_id))
     )
     part = result.scalar_one()
 
@@ -494,7 +673,7 @@ async def list_cycle_counts(
     """
     List cycle count sessions for the organization.
     """
-    query = select(CycleCount).where(CycleCount.organization_id == current_user.organization_id)
+    query = select(*_CYCLE_COUNT_COLUMNS).where(CycleCount.organization_id == current_user.organization_id)
 
     if status:
         query = query.where(CycleCount.status == status)
@@ -508,33 +687,37 @@ async def list_cycle_counts(
     if scheduled_to:
         query = query.where(CycleCount.scheduled_date <= scheduled_to)
 
-    count_query = select(func.count()).select_from(query.subquery())
-    total = await db.scalar(count_query)
+    filtered = query
 
-    query = query.order_by(CycleCount.created_at.desc()).offset(pagination.offset).limit(pagination.page_size)
-    result = await db.execute(query)
-    cycle_counts = result.scalars().all()
-
-    storeroom_ids = [cc.storeroom_id for cc in cycle_counts]
-    storeroom_lookup: dict[int, dict[str, str]] = {}
-    if storeroom_ids:
-        storeroom_rows = await db.execute(
-            select(Storeroom.id, Storeroom.code, Storeroom.name).where(Storeroom.id.in_(storeroom_ids))
+    # The filtered total rides along as a window count; the storeroom join is
+    # many-to-one, so it does not change the row count
+    query = (
+        query.add_columns(
+            Storeroom.code.label("storeroom_code"),
+            Storeroom.name.label("storeroom_name"),
+            func.count().over().label("total_count"),
         )
-        storeroom_lookup = {row.id: {"code": row.code, "name": row.name} for row in storeroom_rows}
+        .outerjoin(Storeroom, Storeroom.id == CycleCount.storeroom_id)
+        .order_by(CycleCount.created_at.desc())
+        .offset(pagination.offset)
+        .limit(pagination.page_size)
+    )
+    result = await db.execute(query)
+    rows = result.mappings().all()
+    items = [{key: value for key, value in row.items() if key != "total_count"} for row in rows]
 
-    items = [
-        CycleCountResponse(**_cycle_count_payload(cc, storeroom_lookup))
-        for cc in cycle_counts
-    ]
+    if rows:
+        total = rows[0]["total_count"]
+    else:
+        total = await db.scalar(select(func.count()).select_from(filtered.subquery())) if pagination.offset else 0
 
-    return PaginatedResponse(
+    return serialized_response(_CYCLE_COUNT_PAGE_ADAPTER, dict(
         items=items,
         total=total,
         page=pagination.page,
         page_size=pagination.page_size,
-        pages=(total + pagination.page_size - 1) // pagination.page_size,
-    )
+        pages=pagination.page_count(total),
+    ))
 
 
 @router.post("/cycle-counts", response_model=CycleCountDetailResponse, status_code=status.HTTP_201_CREATED)
@@ -657,8 +840,6 @@ async def create_cycle_count(
         db.add(line)
 
     await db.commit()
-    await db.refresh(cycle_count)
-    await db.refresh(storeroom)
 
     # Reload with lines for response
     result = await db.execute(
@@ -730,8 +911,11 @@ async def get_cycle_count(
             detail="Cycle count not found",
         )
 
+    cc_storeroom_id = cycle_count.storeroom_id
     storeroom_info = await db.execute(
-        select(Storeroom.id, Storeroom.code, Storeroom.name).where(Storeroom.id == cycle_count.storeroom_id)
+        lambda_stmt(
+            lambda: select(Storeroom.id, Storeroom.code, Storeroom.name).where(Storeroom.id == cc_storeroom_id)
+        )
     )
     storeroom_row = storeroom_info.first()
     storeroom_lookup = {}
@@ -855,8 +1039,11 @@ async def record_cycle_count(
     )
     cycle_count = result.scalar_one()
 
+    cc_storeroom_id = cycle_count.storeroom_id
     storeroom_info = await db.execute(
-        select(Storeroom.id, Storeroom.code, Storeroom.name).where(Storeroom.id == cycle_count.storeroom_id)
+        lambda_stmt(
+            lambda: select(Storeroom.id, Storeroom.code, Storeroom.name).where(Storeroom.id == cc_storeroom_id)
+        )
     )
     storeroom_row = storeroom_info.first()
     storeroom_lookup = {}
@@ -922,7 +1109,6 @@ async def create_cycle_count_plan(
     )
     db.add(plan)
     await db.commit()
-    await db.refresh(plan)
     return CycleCountPlanResponse.model_validate(plan)
 
 
@@ -936,19 +1122,19 @@ async def pause_cycle_count_plan(
     """
     Pause or resume a cycle count plan.
     """
+    # Tenant check, update and read-back in one UPDATE ... RETURNING
     result = await db.execute(
-        select(CycleCountPlan)
+        update(CycleCountPlan)
         .where(CycleCountPlan.id == plan_id)
         .where(CycleCountPlan.organization_id == current_user.organization_id)
+        .values(is_paused=paused, updated_by_id=current_user.id)
+        .returning(CycleCountPlan)
     )
     plan = result.scalar_one_or_none()
     if not plan:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Plan not found")
 
-    plan.is_paused = paused
-    plan.updated_by_id = current_user.id
     await db.commit()
-    await db.refresh(plan)
     return CycleCountPlanResponse.model_validate(plan)
 
 
@@ -973,36 +1159,60 @@ async def list_vendors(
     pagination: Pagination,
     is_active: bool = Query(None),
     search: str = Query(None),
+    cursor: str = Query(None, description="Keyset cursor from a previous page's next_cursor"),
 ) -> Any:
     """
     List vendors.
     """
-    query = select(Vendor).where(Vendor.organization_id == current_user.organization_id)
+    query = select(*_VENDOR_COLUMNS).where(Vendor.organization_id == current_user.organization_id)
 
     if is_active is not None:
         query = query.where(Vendor.is_active == is_active)
 
-    if search:
-        search_filter = f"%{search}%"
+    search_filter = search_pattern(search)
+    if search_filter:
         query = query.where(
             (Vendor.code.ilike(search_filter))
             | (Vendor.name.ilike(search_filter))
         )
 
-    count_query = select(func.count()).select_from(query.subquery())
-    total = await db.scalar(count_query)
+    filtered = query
 
-    query = query.order_by(Vendor.code).offset(pagination.offset).limit(pagination.page_size)
-    result = await db.execute(query)
-    vendors = result.scalars().all()
+    # Keyset pagination when a cursor is supplied; OFFSET is kept as a fallback.
+    # Offset pages carry the filtered total as a window count on every row instead
+    # of a separate COUNT query; cursor pages skip the total entirely.
+    if cursor:
+        (last_code,) = decode_cursor(cursor, str)
+        query = query.where(Vendor.code > last_code)
+    else:
+        query = query.add_columns(func.count().over().label("total_count")).offset(pagination.offset)
 
-    return PaginatedResponse(
+    # Fetch one extra row to detect whether another page exists
+    query = query.order_by(Vendor.code).limit(pagination.page_size + 1)
+    result = await db.execute(query)
+    rows = result.all()
+    vendors = [dict(zip(_VENDOR_KEYS, row)) for row in rows]
+
+    total = None
+    if not cursor:
+        if rows:
+            total = rows[0].total_count
+        else:
+            total = await db.scalar(select(func.count()).select_from(filtered.subquery())) if pagination.offset else 0
+
+    next_cursor = None
+    if len(vendors) > pagination.page_size:
+        vendors = vendors[:pagination.page_size]
+        next_cursor = encode_cursor(vendors[-1]["code"])
+
+    return serialized_response(_VENDOR_PAGE_ADAPTER, dict(
         items=vendors,
         total=total,
         page=pagination.page,
         page_size=pagination.page_size,
-        pages=(total + pagination.page_size - 1) // pagination.page_size,
-    )
+        pages=pagination.page_count(total),
+        next_cursor=next_cursor,
+    ))
 
 
 @router.post("/vendors", response_model=VendorResponse, status_code=status.HTTP_201_CREATED)
@@ -1022,7 +1232,6 @@ async def create_vendor(
 
     db.add(vendor)
     await db.commit()
-    await db.refresh(vendor)
 
     return vendor
 
@@ -1030,13 +1239,13 @@ async def create_vendor(
 # Purchase Order endpoints
 
 async def generate_po_number(db, org_id: int) -> str:
-    """Generate next PO number."""
-    result = await db.execute(
-        select(func.count())
-        .select_from(PurchaseOrder)
-        .where(PurchaseOrder.organization_id == org_id)
+    """Generate next PO number from the organization's counter row."""
+    count = await next_number(
+        db,
+        org_id,
+        "purchase_order",
+        select(func.count()).select_from(PurchaseOrder).where(PurchaseOrder.organization_id == org_id),
     )
-    count = result.scalar() + 1
     return f"PO-{count:06d}"
 
 
@@ -1048,11 +1257,12 @@ async def list_purchase_orders(
     status: POStatus = Query(None),
     vendor_id: int = Query(None),
     search: str = Query(None),
+    cursor: str = Query(None, description="Keyset cursor from a previous page's next_cursor"),
 ) -> Any:
     """
     List purchase orders.
     """
-    query = select(PurchaseOrder).where(PurchaseOrder.organization_id == current_user.organization_id)
+    query = select(*_PURCHASE_ORDER_COLUMNS).where(PurchaseOrder.organization_id == current_user.organization_id)
 
     if status:
         query = query.where(PurchaseOrder.status == status)
@@ -1060,23 +1270,49 @@ async def list_purchase_orders(
     if vendor_id:
         query = query.where(PurchaseOrder.vendor_id == vendor_id)
 
-    if search:
-        query = query.where(PurchaseOrder.po_number.ilike(f"%{search}%"))
+    search_filter = search_pattern(search)
+    if search_filter:
+        query = query.where(PurchaseOrder.po_number.ilike(search_filter))
 
-    count_query = select(func.count()).select_from(query.subquery())
-    total = await db.scalar(count_query)
+    filtered = query
 
-    query = query.order_by(PurchaseOrder.created_at.desc()).offset(pagination.offset).limit(pagination.page_size)
-    result = await db.execute(query)
-    purchase_orders = result.scalars().all()
+    # Keyset pagination when a cursor is supplied; OFFSET is kept as a fallback.
+    # Offset pages carry the filtered total as a window count on every row instead
+    # of a separate COUNT query; cursor pages skip the total entirely.
+    if cursor:
+        # Keyed on id alone: ids follow creation order, and comparing created_at
+        # against a bound datetime is unreliable on SQLite's second-resolution text.
+        (last_id,) = decode_cursor(cursor, int)
+        query = query.where(PurchaseOrder.id < last_id)
+    else:
+        query = query.add_columns(func.count().over().label("total_count")).offset(pagination.offset)
 
-    return PaginatedResponse(
+    # Fetch one extra row to detect whether another page exists
+    query = query.order_by(PurchaseOrder.id.desc()).limit(pagination.page_size + 1)
+    result = await db.execute(query)
+    rows = result.all()
+    purchase_orders = [dict(zip(_PURCHASE_ORDER_KEYS, row)) for row in rows]
+
+    total = None
+    if not cursor:
+        if rows:
+            total = rows[0].total_count
+        else:
+            total = await db.scalar(select(func.count()).select_from(filtered.subquery())) if pagination.offset else 0
+
+    next_cursor = None
+    if len(purchase_orders) > pagination.page_size:
+        purchase_orders = purchase_orders[:pagination.page_size]
+        next_cursor = encode_cursor(purchase_orders[-1]["id"])
+
+    return serialized_response(_PURCHASE_ORDER_PAGE_ADAPTER, dict(
         items=purchase_orders,
         total=total,
         page=pagination.page,
         page_size=pagination.page_size,
-        pages=(total + pagination.page_size - 1) // pagination.page_size,
-    )
+        pages=pagination.page_count(total),
+        next_cursor=next_cursor,
+    ))
 
 
 @router.post("/purchase-orders", response_model=PurchaseOrderResponse, status_code=status.HTTP_201_CREATED)
@@ -1104,23 +1340,16 @@ async def create_purchase_order(
     db.add(po)
     await db.flush()
 
-    # Add lines
-    subtotal = 0
-    for line_data in lines_data:
-        line = PurchaseOrderLine(
-            purchase_order_id=po.id,
-            total_cost=line_data.quantity_ordered * line_data.unit_cost,
-            created_by_id=current_user.id,
-            **line_data.model_dump(),
-        )
-        db.add(line)
-        subtotal += line.total_cost
-
-    po.subtotal = subtotal
-    po.total = subtotal + po.tax + po.shipping_cost
+    # Insert all lines in one executemany round trip. Line and PO totals are
+    # computed by the database, so read back the ones the line triggers changed.
+    if lines_data:
+        await db.execute(insert(PurchaseOrderLine), [
+            {"purchase_order_id": po.id, "created_by_id": current_user.id, **line_data.model_dump()}
+            for line_data in lines_data
+        ])
+        await db.refresh(po, attribute_names=["subtotal", "total"])
 
     await db.commit()
-    await db.refresh(po)
 
     return po
 
@@ -1134,15 +1363,12 @@ async def get_purchase_order(
     """
     Get purchase order by ID with lines.
     """
-    result = await db.execute(
-        select(PurchaseOrder)
-        .options(selectinload(PurchaseOrder.lines))
-        .where(PurchaseOrder.id == po_id)
-        .where(PurchaseOrder.organization_id == current_user.organization_id)
+    po = await db.get(
+        PurchaseOrder, po_id, options=[selectinload(PurchaseOrder.lines), raiseload("*")]
     )
-    po = result.scalar_one_or_none()
 
-    if not po:
+    # Another tenant's PO is reported as missing rather than forbidden
+    if not po or po.organization_id != current_user.organization_id:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Purchase order not found",
@@ -1161,10 +1387,20 @@ async def update_po_status(
     """
     Update purchase order status.
     """
+    values = {"status": new_status, "updated_by_id": current_user.id}
+
+    # Handle approval
+    if new_status == POStatus.APPROVED:
+        values["approved_by_id"] = current_user.id
+        values["approved_at"] = datetime.utcnow()
+
+    # Tenant check, update and read-back in one UPDATE ... RETURNING
     result = await db.execute(
-        select(PurchaseOrder)
+        update(PurchaseOrder)
         .where(PurchaseOrder.id == po_id)
         .where(PurchaseOrder.organization_id == current_user.organization_id)
+        .values(**values)
+        .returning(PurchaseOrder)
     )
     po = result.scalar_one_or_none()
 
@@ -1174,16 +1410,7 @@ async def update_po_status(
             detail="Purchase order not found",
         )
 
-    # Handle approval
-    if new_status == POStatus.APPROVED:
-        po.approved_by_id = current_user.id
-        po.approved_at = datetime.utcnow()
-
-    po.status = new_status
-    po.updated_by_id = current_user.id
-
     await db.commit()
-    await db.refresh(po)
 
     return po
 
@@ -1200,7 +1427,10 @@ async def receive_po_lines(
     """
     result = await db.execute(
         select(PurchaseOrder)
-        .options(selectinload(PurchaseOrder.lines))
+        .options(
+            selectinload(PurchaseOrder.lines).joinedload(PurchaseOrderLine.part),
+            raiseload("*"),
+        )
         .where(PurchaseOrder.id == po_id)
         .where(PurchaseOrder.organization_id == current_user.organization_id)
     )
@@ -1219,8 +1449,9 @@ async def receive_po_lines(
         )
 
     line_map = {line.id: line for line in po.lines}
-    received_count = 0
 
+    # Resolve target storerooms up front so stock levels and parts load in bulk
+    receipts = []
     for receive in receive_data:
         line = line_map.get(receive.line_id)
         if not line:
@@ -1232,7 +1463,18 @@ async def receive_po_lines(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail=f"No storeroom specified for line {line.line_number}",
             )
+        receipts.append((receive, line, storeroom_id))
 
+    stock_by_key: Dict[tuple, StockLevel] = {}
+    if receipts:
+        stock_keys = list({(line.part_id, storeroom_id) for _, line, storeroom_id in receipts})
+        result = await db.execute(
+            select(StockLevel)
+            .where(tuple_(StockLevel.part_id, StockLevel.storeroom_id).in_(stock_keys))
+        )
+        stock_by_key = {(stock.part_id, stock.storeroom_id): stock for stock in result.scalars()}
+
+    for receive, line, storeroom_id in receipts:
         # Update line
         line.quantity_received += receive.quantity_received
         if line.quantity_received >= line.quantity_ordered:
@@ -1240,23 +1482,19 @@ async def receive_po_lines(
             line.received_date = datetime.utcnow()
 
         # Update stock
-        result = await db.execute(
-            select(StockLevel)
-            .where(StockLevel.part_id == line.part_id)
-            .where(StockLevel.storeroom_id == storeroom_id)
-        )
-        stock = result.scalar_one_or_none()
-
+        stock = stock_by_key.get((line.part_id, storeroom_id))
         if not stock:
             stock = StockLevel(
                 part_id=line.part_id,
                 storeroom_id=storeroom_id,
                 current_balance=0,
+                reserved_quantity=0,
                 available_quantity=0,
                 created_by_id=current_user.id,
             )
             db.add(stock)
-            await db.flush()
+            # Later lines for the same part/storeroom accumulate onto this row
+            stock_by_key[(line.part_id, storeroom_id)] = stock
 
         stock.current_balance += receive.quantity_received
         stock.update_available()
@@ -1279,19 +1517,34 @@ async def receive_po_lines(
         db.add(transaction)
 
         # Update part average cost
-        result = await db.execute(select(Part).where(Part.id == line.part_id))
-        part = result.scalar_one()
-        part.last_cost = line.unit_cost
+        line.part.last_cost = line.unit_cost
 
-        received_count += 1
+    received_count = len(receipts)
 
-    # Update PO status
-    all_received = all(line.is_received for line in po.lines)
-    if all_received:
-        po.status = POStatus.RECEIVED
-        po.received_date = datetime.utcnow().date()
-    else:
-        po.status = POStatus.PARTIALLY_RECEIVED
+    # Update PO status in the database from the (autoflushed) line flags, so a
+    # large PO is not walked line by line in Python
+    all_received = ~exists().where(
+        PurchaseOrderLine.purchase_order_id == po.id,
+        PurchaseOrderLine.is_received == False,
+    )
+    await db.execute(
+        update(PurchaseOrder)
+        .where(PurchaseOrder.id == po.id)
+        .values(
+            status=cast(
+                case(
+                    (all_received, POStatus.RECEIVED.name),
+                    else_=POStatus.PARTIALLY_RECEIVED.name,
+                ),
+                PurchaseOrder.status.type,
+            ),
+            received_date=case(
+                (all_received, datetime.utcnow().date()),
+                else_=PurchaseOrder.received_date,
+            ),
+        )
+        .execution_options(synchronize_session=False)
+    )
 
     await db.commit()
 
@@ -1302,19 +1555,29 @@ async def receive_po_lines(
 
 @router.get("/categories", response_model=List[PartCategoryResponse])
 async def list_categories(
+    request: Request,
     db: DBSession,
     current_user: CurrentUser,
 ) -> Any:
     """
     List part categories.
+    Served from the Redis cache with an ETag; 304 when the client copy is current.
     """
-    result = await db.execute(
-        select(PartCategory)
-        .where(PartCategory.organization_id == current_user.organization_id)
-        .order_by(PartCategory.code)
-    )
-    categories = result.scalars().all()
-    return categories
+    org_id = current_user.organization_id
+
+    async def load() -> bytes:
+        result = await db.execute(
+            lambda_stmt(
+                lambda: select(PartCategory)
+                .where(PartCategory.organization_id == org_id)
+                .order_by(PartCategory.code)
+            )
+        )
+        return _CATEGORY_LIST_ADAPTER.dump_json(
+            _CATEGORY_LIST_ADAPTER.validate_python(result.scalars().all())
+        )
+
+    return await etag_response(request, "part_categories", org_id, load)
 
 
 @router.post("/categories", response_model=PartCategoryResponse, status_code=status.HTTP_201_CREATED)
@@ -1334,6 +1597,6 @@ async def create_category(
 
     db.add(category)
     await db.commit()
-    await db.refresh(category)
+    await bump_cache_version("part_categories", current_user.organization_id)
 
     return category
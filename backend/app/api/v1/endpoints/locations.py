@@ -4,10 +4,19 @@ Location management endpoints.
 from typing import Any, List
 
 from fastapi import APIRouter, HTTPException, status, Query
-from sqlalchemy import select, func
-from sqlalchemy.orm import selectinload
-
-from app.api.deps import DBSession, CurrentUser, Pagination
+from pydantic import TypeAdapter
+from sqlalchemy import select, update, func, tuple_, literal, exists
+from sqlalchemy.orm import aliased
+
+from app.api.deps import (
+    DBSession,
+    CurrentUser,
+    Pagination,
+    encode_cursor,
+    decode_cursor,
+    search_pattern,
+    serialized_response,
+)
 from app.models.location import Location
 from app.schemas.location import (
     LocationCreate,
@@ -19,6 +28,31 @@ from app.schemas.common import PaginatedResponse, MessageResponse
 
 router = APIRouter()
 
+# Columns backing LocationResponse, so read endpoints skip ORM hydration
+_LOCATION_COLUMNS = (
+    Location.id,
+    Location.organization_id,
+    Location.code,
+    Location.name,
+    Location.description,
+    Location.parent_id,
+    Location.hierarchy_path,
+    Location.hierarchy_level,
+    Location.location_type,
+    Location.is_active,
+    Location.address,
+    Location.latitude,
+    Location.longitude,
+    Location.contact_name,
+    Location.contact_phone,
+    Location.contact_email,
+    Location.created_at,
+    Location.updated_at,
+)
+# Row keys for list_locations, whose rows may carry a trailing window-count column
+_LOCATION_KEYS = tuple(column.key for column in _LOCATION_COLUMNS)
+_LOCATION_PAGE_ADAPTER = TypeAdapter(PaginatedResponse[LocationResponse])
+
 
 @router.get("", response_model=PaginatedResponse[LocationResponse])
 async def list_locations(
@@ -28,11 +62,12 @@ async def list_locations(
     location_type: str = Query(None, description="Filter by location type"),
     is_active: bool = Query(None, description="Filter by active status"),
     search: str = Query(None, description="Search by name or code"),
+    cursor: str = Query(None, description="Keyset cursor from a previous page's next_cursor"),
 ) -> Any:
     """
     List locations in the organization.
     """
-    query = select(Location).where(Location.organization_id == current_user.organization_id)
+    query = select(*_LOCATION_COLUMNS).where(Location.organization_id == current_user.organization_id)
 
     if location_type:
         query = query.where(Location.location_type == location_type)
@@ -40,32 +75,58 @@ async def list_locations(
     if is_active is not None:
         query = query.where(Location.is_active == is_active)
 
-    if search:
-        search_filter = f"%{search}%"
+    search_filter = search_pattern(search)
+    if search_filter:
         query = query.where(
             (Location.code.ilike(search_filter))
             | (Location.name.ilike(search_filter))
         )
 
-    # Count total
-    count_query = select(func.count()).select_from(query.subquery())
-    total = await db.scalar(count_query)
+    filtered = query
+
+    # Keyset pagination when a cursor is supplied; OFFSET is kept as a fallback.
+    # Offset pages carry the filtered total as a window count on every row instead
+    # of a separate COUNT query; cursor pages skip the total entirely.
+    if cursor:
+        last_path, last_id = decode_cursor(cursor, str, int)
+        query = query.where(tuple_(Location.hierarchy_path, Location.id) > tuple_(last_path, last_id))
+    else:
+        query = query.add_columns(func.count().over().label("total_count")).offset(pagination.offset)
 
-    # Get paginated results
-    query = query.order_by(Location.hierarchy_path).offset(pagination.offset).limit(pagination.page_size)
+    # Get paginated results, fetching one extra row to detect another page
+    query = query.order_by(Location.hierarchy_path, Location.id).limit(pagination.page_size + 1)
     result = await db.execute(query)
-    locations = result.scalars().all()
+    rows = result.all()
+    locations = [dict(zip(_LOCATION_KEYS, row)) for row in rows]
 
-    return PaginatedResponse(
+    total = None
+    if not cursor:
+        if rows:
+            total = rows[0].total_count
+        else:
+            total = await db.scalar(select(func.count()).select_from(filtered.subquery())) if pagination.offset else 0
+
+    next_cursor = None
+    if len(locations) > pagination.page_size:
+        locations = locations[:pagination.page_size]
+        last = locations[-1]
+        next_cursor = encode_cursor(last["hierarchy_path"], last["id"])
+
+    return serialized_response(_LOCATION_PAGE_ADAPTER, dict(
         items=locations,
         total=total,
         page=pagination.page,
         page_size=pagination.page_size,
-        pages=(total + pagination.page_size - 1) // pagination.page_size,
-    )
+        pages=pagination.page_count(total),
+        next_cursor=next_cursor,
+    ))
 
 
-@router.get("/tree", response_model=List[LocationTreeResponse])
+@router.get(
+    "/tree",
+    response_model=None,
+    responses={status.HTTP_200_OK: {"model": List[LocationTreeResponse]}},
+)
 async def get_location_tree(
     db: DBSession,
     current_user: CurrentUser,
@@ -73,25 +134,49 @@ async def get_location_tree(
     """
     Get locations as a hierarchical tree.
     """
-    result = await db.execute(
-        select(Location)
-        .where(Location.organization_id == current_user.organization_id)
+    org_id = current_user.organization_id
+
+    # Walk the active hierarchy in one recursive CTE. Roots are active locations
+    # without an active parent, so children of an inactive location surface as
+    # roots. Ordering by depth guarantees parents precede their children.
+    parent = aliased(Location)
+    tree = (
+        select(Location.id, literal(0).label("depth"))
+        .where(Location.organization_id == org_id)
+        .where(Location.is_active == True)
+        .where(
+            ~exists()
+            .where(parent.id == Location.parent_id)
+            .where(parent.organization_id == org_id)
+            .where(parent.is_active == True)
+        )
+        .cte("location_tree", recursive=True)
+    )
+    tree = tree.union_all(
+        select(Location.id, tree.c.depth + 1)
+        .join(tree, Location.parent_id == tree.c.id)
+        .where(Location.organization_id == org_id)
         .where(Location.is_active == True)
-        .order_by(Location.hierarchy_path)
     )
-    all_locations = result.scalars().all()
 
-    # Build tree structure
-    location_map = {loc.id: LocationTreeResponse.model_validate(loc) for loc in all_locations}
+    result = await db.execute(
+        select(*_LOCATION_COLUMNS)
+        .join(tree, tree.c.id == Location.id)
+        .order_by(tree.c.depth, Location.hierarchy_path, Location.id)
+    )
 
+    # Build the tree in one pass over plain dicts; the depth ordering means a
+    # parent node always exists before its children are visited
+    node_by_id = {}
     root_locations = []
-    for loc in all_locations:
-        loc_response = location_map[loc.id]
-        if loc.parent_id and loc.parent_id in location_map:
-            parent = location_map[loc.parent_id]
-            parent.children.append(loc_response)
+    for row in result.mappings():
+        node = {**row, "children": []}
+        node_by_id[node["id"]] = node
+        parent_node = node_by_id.get(node["parent_id"])
+        if parent_node is not None:
+            parent_node["children"].append(node)
         else:
-            root_locations.append(loc_response)
+            root_locations.append(node)
 
     return root_locations
 
@@ -138,14 +223,14 @@ async def create_location(
         **location_data.model_dump(),
     )
 
-    # Set hierarchy info
+    # Set hierarchy info once the INSERT has assigned the id the path is built from
     if parent:
         location.parent = parent
+    db.add(location)
+    await db.flush()
     location.update_hierarchy()
 
-    db.add(location)
     await db.commit()
-    await db.refresh(location)
 
     return location
 
@@ -159,14 +244,10 @@ async def get_location(
     """
     Get location by ID.
     """
-    result = await db.execute(
-        select(Location)
-        .where(Location.id == location_id)
-        .where(Location.organization_id == current_user.organization_id)
-    )
-    location = result.scalar_one_or_none()
+    location = await db.get(Location, location_id)
 
-    if not location:
+    # Another tenant's location is reported as missing rather than forbidden
+    if not location or location.organization_id != current_user.organization_id:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Location not found",
@@ -234,7 +315,6 @@ async def update_location(
     location.update_hierarchy()
 
     await db.commit()
-    await db.refresh(location)
 
     return location
 
@@ -248,30 +328,34 @@ async def delete_location(
     """
     Deactivate location (soft delete).
     """
+    # Tenant check, active-children check and deactivation in one UPDATE;
+    # only a refused delete pays for a second query to explain why.
+    child = aliased(Location)
     result = await db.execute(
-        select(Location)
-        .options(selectinload(Location.children))
+        update(Location)
         .where(Location.id == location_id)
         .where(Location.organization_id == current_user.organization_id)
+        .where(~exists().where(child.parent_id == Location.id).where(child.is_active == True))
+        .values(is_active=False, updated_by_id=current_user.id)
+        .returning(Location.id)
     )
-    location = result.scalar_one_or_none()
 
-    if not location:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Location not found",
+    if result.scalar_one_or_none() is None:
+        found = await db.scalar(
+            select(Location.id)
+            .where(Location.id == location_id)
+            .where(Location.organization_id == current_user.organization_id)
         )
-
-    # Check for active children
-    if location.children:
-        active_children = [c for c in location.children if c.is_active]
-        if active_children:
+        if found is None:
             raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Cannot delete location with active child locations",
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Location not found",
             )
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Cannot delete location with active child locations",
+        )
 
-    location.is_active = False
     await db.commit()
 
     return MessageResponse(message="Location deactivated successfully")
@@ -3,10 +3,11 @@ Organization management endpoints.
 """
 from typing import Any, List
 
-from fastapi import APIRouter, HTTPException, status
+from fastapi import APIRouter, HTTPException, Request, status
 from sqlalchemy import select
 
 from app.api.deps import DBSession, CurrentUser, CurrentSuperuser
+from app.core.cache import etag_response, bump_cache_version
 from app.models.organization import Organization
 from app.schemas.organization import (
     OrganizationCreate,
@@ -20,24 +21,28 @@ router = APIRouter()
 
 @router.get("/current", response_model=OrganizationResponse)
 async def get_current_organization(
+    request: Request,
     db: DBSession,
     current_user: CurrentUser,
 ) -> Any:
     """
     Get current user's organization.
+    Served from the Redis cache with an ETag; 304 when the client copy is current.
     """
-    result = await db.execute(
-        select(Organization).where(Organization.id == current_user.organization_id)
-    )
-    org = result.scalar_one_or_none()
+    org_id = current_user.organization_id
 
-    if not org:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Organization not found",
-        )
+    async def load() -> bytes:
+        org = await db.get(Organization, org_id)
 
-    return org
+        if not org:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Organization not found",
+            )
+
+        return OrganizationResponse.model_validate(org).model_dump_json().encode()
+
+    return await etag_response(request, "organization", org_id, load)
 
 
 @router.put("/current", response_model=OrganizationResponse)
@@ -66,7 +71,7 @@ async def update_current_organization(
         setattr(org, field, value)
 
     await db.commit()
-    await db.refresh(org)
+    await bump_cache_version("organization", org.id)
 
     return org
 
@@ -108,7 +113,6 @@ async def create_organization(
     org = Organization(**org_data.model_dump())
     db.add(org)
     await db.commit()
-    await db.refresh(org)
 
     return org
 
@@ -122,10 +126,7 @@ async def get_organization(
     """
     Get organization by ID (superuser only).
     """
-    result = await db.execute(
-        select(Organization).where(Organization.id == org_id)
-    )
-    org = result.scalar_one_or_none()
+    org = await db.get(Organization, org_id)
 
     if not org:
         raise HTTPException(
@@ -162,6 +163,6 @@ async def update_organization(
         setattr(org, field, value)
 
     await db.commit()
-    await db.refresh(org)
+    await bump_cache_version("organization", org.id)
 
     return org
@@ -5,10 +5,20 @@ from typing import Any, List
 from datetime import datetime, date, timedelta
 
 from fastapi import APIRouter, HTTPException, status, Query
-from sqlalchemy import select, func
-from sqlalchemy.orm import selectinload
-
-from app.api.deps import DBSession, CurrentUser, Pagination
+from pydantic import TypeAdapter
+from sqlalchemy import select, insert, update, func, lambda_stmt
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import selectinload, raiseload
+
+from app.api.deps import (
+    DBSession,
+    ReadDBSession,
+    CurrentUser,
+    Pagination,
+    search_pattern,
+    serialized_response,
+    serialized_partitions_response,
+)
 from app.models.preventive_maintenance import (
     PreventiveMaintenance,
     PMSchedule,
@@ -16,9 +26,8 @@ from app.models.preventive_maintenance import (
     JobPlanTask,
     JobPlanPart,
     PMTriggerType,
-    PMFrequencyUnit,
 )
-from app.models.work_order import WorkOrder, WorkOrderTask, WorkOrderStatus, WorkOrderType
+from app.models.work_order import WorkOrder, WorkOrderStatus, WorkOrderType
 from app.models.scheduler_control import SchedulerControl
 from app.schemas.preventive_maintenance import (
     PMCreate,
@@ -31,53 +40,120 @@ from app.schemas.preventive_maintenance import (
     JobPlanDetailResponse,
 )
 from app.schemas.common import PaginatedResponse, MessageResponse
+from app.services.numbering import next_number
+from app.services.pm_scheduler import add_frequency
+from app.services.work_order_service import WorkOrderService
 
 router = APIRouter()
 
+# Columns backing the list responses; selecting them directly skips ORM
+# instance construction and identity-map bookkeeping for every listed row
+_PM_COLUMNS = (
+    PreventiveMaintenance.id,
+    PreventiveMaintenance.organization_id,
+    PreventiveMaintenance.pm_number,
+    PreventiveMaintenance.name,
+    PreventiveMaintenance.description,
+    PreventiveMaintenance.asset_id,
+    PreventiveMaintenance.location_id,
+    PreventiveMaintenance.job_plan_id,
+    PreventiveMaintenance.trigger_type,
+    PreventiveMaintenance.schedule_type,
+    PreventiveMaintenance.frequency,
+    PreventiveMaintenance.frequency_unit,
+    PreventiveMaintenance.meter_id,
+    PreventiveMaintenance.meter_interval,
+    PreventiveMaintenance.condition_attribute,
+    PreventiveMaintenance.condition_operator,
+    PreventiveMaintenance.condition_value,
+    PreventiveMaintenance.last_wo_date,
+    PreventiveMaintenance.last_wo_id,
+    PreventiveMaintenance.next_due_date,
+    PreventiveMaintenance.last_meter_reading,
+    PreventiveMaintenance.next_meter_reading,
+    PreventiveMaintenance.lead_time_days,
+    PreventiveMaintenance.warning_days,
+    PreventiveMaintenance.assigned_to_id,
+    PreventiveMaintenance.assigned_team,
+    PreventiveMaintenance.priority,
+    PreventiveMaintenance.estimated_hours,
+    PreventiveMaintenance.seasonal_start_month,
+    PreventiveMaintenance.seasonal_end_month,
+    PreventiveMaintenance.excluded_days,
+    PreventiveMaintenance.is_active,
+    PreventiveMaintenance.created_at,
+    PreventiveMaintenance.updated_at,
+)
+_JOB_PLAN_COLUMNS = (
+    JobPlan.id,
+    JobPlan.organization_id,
+    JobPlan.code,
+    JobPlan.name,
+    JobPlan.description,
+    JobPlan.estimated_hours,
+    JobPlan.estimated_cost,
+    JobPlan.category,
+    JobPlan.asset_category,
+    JobPlan.required_craft,
+    JobPlan.skill_level,
+    JobPlan.safety_requirements,
+    JobPlan.lockout_required,
+    JobPlan.permits_required,
+    JobPlan.is_active,
+    JobPlan.revision,
+    JobPlan.created_at,
+    JobPlan.updated_at,
+)
+# Row keys for the paginated lists, whose rows carry a trailing window-count column
+_PM_KEYS = tuple(column.key for column in _PM_COLUMNS)
+_JOB_PLAN_KEYS = tuple(column.key for column in _JOB_PLAN_COLUMNS)
+
+# Prebuilt validators/serializers for list responses, built once at import
+_PM_PAGE_ADAPTER = TypeAdapter(PaginatedResponse[PMResponse])
+_PM_LIST_ADAPTER = TypeAdapter(List[PMResponse])
+_JOB_PLAN_PAGE_ADAPTER = TypeAdapter(PaginatedResponse[JobPlanResponse])
+
+# The due list is unpaginated; rows are fetched in batches and the list is capped
+_DUE_PMS_BATCH_SIZE = 200
+_DUE_PMS_LIMIT = 5000
+
+# Loader options for the detail endpoints, built once so each request reuses them
+_PM_DETAIL_OPTIONS = (selectinload(PreventiveMaintenance.schedules), raiseload("*"))
+_JOB_PLAN_DETAIL_OPTIONS = (selectinload(JobPlan.tasks), selectinload(JobPlan.parts), raiseload("*"))
+
 
 async def generate_pm_number(db, org_id: int) -> str:
-    """Generate next PM number."""
-    result = await db.execute(
+    """Generate next PM number from the organization's counter row."""
+    count = await next_number(
+        db,
+        org_id,
+        "preventive_maintenance",
         select(func.count())
         .select_from(PreventiveMaintenance)
-        .where(PreventiveMaintenance.organization_id == org_id)
+        .where(PreventiveMaintenance.organization_id == org_id),
     )
-    count = result.scalar() + 1
     return f"PM-{count:06d}"
 
 
 def calculate_next_due_date(
     pm: PreventiveMaintenance,
     last_date: date = None,
+    today: date = None,
 ) -> date:
     """Calculate next due date based on PM configuration."""
-    base_date = last_date or date.today()
+    base_date = last_date or today or date.today()
 
     if pm.frequency is None or pm.frequency_unit is None:
         return None
 
-    if pm.frequency_unit == PMFrequencyUnit.DAYS:
-        return base_date + timedelta(days=pm.frequency)
-    elif pm.frequency_unit == PMFrequencyUnit.WEEKS:
-        return base_date + timedelta(weeks=pm.frequency)
-    elif pm.frequency_unit == PMFrequencyUnit.MONTHS:
-        # Add months
-        month = base_date.month + pm.frequency
-        year = base_date.year + (month - 1) // 12
-        month = ((month - 1) % 12) + 1
-        day = min(base_date.day, [31, 29 if year % 4 == 0 else 28, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31][month - 1])
-        return date(year, month, day)
-    elif pm.frequency_unit == PMFrequencyUnit.YEARS:
-        return date(base_date.year + pm.frequency, base_date.month, base_date.day)
-
-    return None
+    return add_frequency(base_date, pm.frequency, pm.frequency_unit)
 
 
 # PM endpoints
 
 @router.get("", response_model=PaginatedResponse[PMResponse])
 async def list_pms(
-    db: DBSession,
+    db: ReadDBSession,
     current_user: CurrentUser,
     pagination: Pagination,
     asset_id: int = Query(None, description="Filter by asset"),
@@ -89,45 +165,69 @@ async def list_pms(
     """
     List preventive maintenance schedules.
     """
-    query = select(PreventiveMaintenance).where(
-        PreventiveMaintenance.organization_id == current_user.organization_id
+    # Lambda statements let SQLAlchemy reuse the compiled SQL across requests;
+    # each optional filter is its own cache-keyed criteria step.
+    org_id = current_user.organization_id
+    query = lambda_stmt(
+        lambda: select(*_PM_COLUMNS).where(PreventiveMaintenance.organization_id == org_id)
+    )
+    count_query = lambda_stmt(
+        lambda: select(func.count())
+        .select_from(PreventiveMaintenance)
+        .where(PreventiveMaintenance.organization_id == org_id)
     )
 
+    filters = []
     if asset_id:
-        query = query.where(PreventiveMaintenance.asset_id == asset_id)
+        filters.append(lambda s: s.where(PreventiveMaintenance.asset_id == asset_id))
 
     if location_id:
-        query = query.where(PreventiveMaintenance.location_id == location_id)
+        filters.append(lambda s: s.where(PreventiveMaintenance.location_id == location_id))
 
     if is_active is not None:
-        query = query.where(PreventiveMaintenance.is_active == is_active)
+        filters.append(lambda s: s.where(PreventiveMaintenance.is_active == is_active))
 
     if due_before:
-        query = query.where(PreventiveMaintenance.next_due_date <= due_before)
-
-    if search:
-        search_filter = f"%{search}%"
-        query = query.where(
-            (PreventiveMaintenance.pm_number.ilike(search_filter))
-            | (PreventiveMaintenance.name.ilike(search_filter))
+        filters.append(lambda s: s.where(PreventiveMaintenance.next_due_date <= due_before))
+
+    search_filter = search_pattern(search)
+    if search_filter:
+        filters.append(
+            lambda s: s.where(
+                (PreventiveMaintenance.pm_number.ilike(search_filter))
+                | (PreventiveMaintenance.name.ilike(search_filter))
+            )
         )
 
-    # Count total
-    count_query = select(func.count()).select_from(query.subquery())
-    total = await db.scalar(count_query)
+    for criteria in filters:
+        query += criteria
+        count_query += criteria
 
-    # Get paginated results
-    query = query.order_by(PreventiveMaintenance.next_due_date).offset(pagination.offset).limit(pagination.page_size)
+    # Get paginated results with the filtered total as a window count on every
+    # row; only a page past the end needs the separate COUNT
+    offset, limit = pagination.offset, pagination.page_size
+    query += lambda s: (
+        s.add_columns(func.count().over().label("total_count"))
+        .order_by(PreventiveMaintenance.next_due_date)
+        .offset(offset)
+        .limit(limit)
+    )
     result = await db.execute(query)
-    pms = result.scalars().all()
+    rows = result.all()
+    pms = [dict(zip(_PM_KEYS, row)) for row in rows]
 
-    return PaginatedResponse(
+    if rows:
+        total = rows[0].total_count
+    else:
+        total = await db.scalar(count_query) if offset else 0
+
+    return serialized_response(_PM_PAGE_ADAPTER, dict(
         items=pms,
         total=total,
         page=pagination.page,
         page_size=pagination.page_size,
-        pages=(total + pagination.page_size - 1) // pagination.page_size,
-    )
+        pages=pagination.page_count(total),
+    ))
 
 
 @router.get("/due", response_model=List[PMResponse])
@@ -141,16 +241,19 @@ async def get_due_pms(
     """
     cutoff_date = date.today() + timedelta(days=days_ahead)
 
-    result = await db.execute(
-        select(PreventiveMaintenance)
+    # Stays on the primary session: server-side cursors need a transaction,
+    # which the autocommit read engine does not open
+    result = await db.stream(
+        select(*_PM_COLUMNS)
         .where(PreventiveMaintenance.organization_id == current_user.organization_id)
         .where(PreventiveMaintenance.is_active == True)
         .where(PreventiveMaintenance.next_due_date <= cutoff_date)
         .order_by(PreventiveMaintenance.next_due_date)
+        .limit(_DUE_PMS_LIMIT)
+        .execution_options(yield_per=_DUE_PMS_BATCH_SIZE)
     )
-    pms = result.scalars().all()
 
-    return pms
+    return await serialized_partitions_response(_PM_LIST_ADAPTER, result.mappings())
 
 
 @router.post("", response_model=PMResponse, status_code=status.HTTP_201_CREATED)
@@ -182,24 +285,21 @@ async def create_pm(
     db.add(pm)
     await db.flush()
 
-    # Add schedule packages
-    for schedule_data in schedules_data:
-        schedule = PMSchedule(
-            pm_id=pm.id,
-            created_by_id=current_user.id,
-            **schedule_data.model_dump(),
-        )
-        db.add(schedule)
+    # Add schedule packages in one executemany round trip
+    if schedules_data:
+        await db.execute(insert(PMSchedule), [
+            {"pm_id": pm.id, "created_by_id": current_user.id, **schedule_data.model_dump()}
+            for schedule_data in schedules_data
+        ])
 
     await db.commit()
-    await db.refresh(pm)
 
     return pm
 
 
 @router.get("/{pm_id}", response_model=PMDetailResponse)
 async def get_pm(
-    db: DBSession,
+    db: ReadDBSession,
     current_user: CurrentUser,
     pm_id: int,
 ) -> Any:
@@ -208,7 +308,7 @@ async def get_pm(
     """
     result = await db.execute(
         select(PreventiveMaintenance)
-        .options(selectinload(PreventiveMaintenance.schedules))
+        .options(*_PM_DETAIL_OPTIONS)
         .where(PreventiveMaintenance.id == pm_id)
         .where(PreventiveMaintenance.organization_id == current_user.organization_id)
     )
@@ -233,10 +333,15 @@ async def update_pm(
     """
     Update PM.
     """
+    update_data = pm_data.model_dump(exclude_unset=True)
+
+    # Tenant check, update and read-back in one UPDATE ... RETURNING
     result = await db.execute(
-        select(PreventiveMaintenance)
+        update(PreventiveMaintenance)
         .where(PreventiveMaintenance.id == pm_id)
         .where(PreventiveMaintenance.organization_id == current_user.organization_id)
+        .values(**update_data, updated_by_id=current_user.id)
+        .returning(PreventiveMaintenance)
     )
     pm = result.scalar_one_or_none()
 
@@ -246,13 +351,7 @@ async def update_pm(
             detail="PM not found",
         )
 
-    update_data = pm_data.model_dump(exclude_unset=True)
-    for field, value in update_data.items():
-        setattr(pm, field, value)
-
-    pm.updated_by_id = current_user.id
     await db.commit()
-    await db.refresh(pm)
 
     return pm
 
@@ -266,20 +365,20 @@ async def delete_pm(
     """
     Deactivate PM (soft delete).
     """
-    result = await db.execute(
-        select(PreventiveMaintenance)
+    deactivated_id = await db.scalar(
+        update(PreventiveMaintenance)
         .where(PreventiveMaintenance.id == pm_id)
         .where(PreventiveMaintenance.organization_id == current_user.organization_id)
+        .values(is_active=False, updated_by_id=current_user.id)
+        .returning(PreventiveMaintenance.id)
     )
-    pm = result.scalar_one_or_none()
 
-    if not pm:
+    if deactivated_id is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="PM not found",
         )
 
-    pm.is_active = False
     await db.commit()
 
     return MessageResponse(message="PM deactivated successfully")
@@ -296,9 +395,10 @@ async def generate_work_order(
     """
     result = await db.execute(
         select(PreventiveMaintenance)
-        .options(selectinload(PreventiveMaintenance.job_plan).selectinload(JobPlan.tasks))
         .where(PreventiveMaintenance.id == pm_id)
         .where(PreventiveMaintenance.organization_id == current_user.organization_id)
+        # Job plan tasks are copied server-side, so no relationship is loaded
+        .options(raiseload("*"))
     )
     pm = result.scalar_one_or_none()
 
@@ -309,12 +409,8 @@ async def generate_work_order(
         )
 
     # Generate WO number
-    wo_count = await db.scalar(
-        select(func.count())
-        .select_from(WorkOrder)
-        .where(WorkOrder.organization_id == current_user.organization_id)
-    )
-    wo_number = f"WO-{wo_count + 1:06d}"
+    wo_service = WorkOrderService(db)
+    wo_number = await wo_service.generate_wo_number(current_user.organization_id)
 
     # Create work order
     work_order = WorkOrder(
@@ -339,29 +435,19 @@ async def generate_work_order(
     await db.flush()
 
     # Copy tasks from job plan
-    if pm.job_plan:
-        for task in pm.job_plan.tasks:
-            wo_task = WorkOrderTask(
-                work_order_id=work_order.id,
-                sequence=task.sequence,
-                description=task.description,
-                instructions=task.instructions,
-                task_type=task.task_type,
-                expected_value=task.expected_value,
-                estimated_hours=task.estimated_hours,
-                created_by_id=current_user.id,
-            )
-            db.add(wo_task)
+    if pm.job_plan_id:
+        await wo_service.copy_job_plan_tasks(work_order.id, pm.job_plan_id, current_user.id)
 
     # Update PM tracking
-    pm.last_wo_date = date.today()
+    today = date.today()
+    pm.last_wo_date = today
     pm.last_wo_id = work_order.id
 
     # Calculate next due date
     if pm.schedule_type.value == "FIXED":
-        pm.next_due_date = calculate_next_due_date(pm, pm.next_due_date)
+        pm.next_due_date = calculate_next_due_date(pm, pm.next_due_date, today)
     else:  # FLOATING
-        pm.next_due_date = calculate_next_due_date(pm, date.today())
+        pm.next_due_date = calculate_next_due_date(pm, today)
 
     await db.commit()
 
@@ -419,7 +505,7 @@ async def get_pm_scheduler_status(
 
 @router.get("/job-plans", response_model=PaginatedResponse[JobPlanResponse])
 async def list_job_plans(
-    db: DBSession,
+    db: ReadDBSession,
     current_user: CurrentUser,
     pagination: Pagination,
     category: str = Query(None, description="Filter by category"),
@@ -428,34 +514,56 @@ async def list_job_plans(
     """
     List job plans.
     """
-    query = select(JobPlan).where(JobPlan.organization_id == current_user.organization_id)
+    org_id = current_user.organization_id
+    query = lambda_stmt(
+        lambda: select(*_JOB_PLAN_COLUMNS).where(JobPlan.organization_id == org_id)
+    )
+    count_query = lambda_stmt(
+        lambda: select(func.count()).select_from(JobPlan).where(JobPlan.organization_id == org_id)
+    )
 
+    filters = []
     if category:
-        query = query.where(JobPlan.category == category)
-
-    if search:
-        search_filter = f"%{search}%"
-        query = query.where(
-            (JobPlan.code.ilike(search_filter))
-            | (JobPlan.name.ilike(search_filter))
+        filters.append(lambda s: s.where(JobPlan.category == category))
+
+    search_filter = search_pattern(search)
+    if search_filter:
+        filters.append(
+            lambda s: s.where(
+                (JobPlan.code.ilike(search_filter))
+                | (JobPlan.name.ilike(search_filter))
+            )
         )
 
-    # Count total
-    count_query = select(func.count()).select_from(query.subquery())
-    total = await db.scalar(count_query)
-
-    # Get paginated results
-    query = query.order_by(JobPlan.code).offset(pagination.offset).limit(pagination.page_size)
+    for criteria in filters:
+        query += criteria
+        count_query += criteria
+
+    # Get paginated results with the filtered total as a window count on every
+    # row; only a page past the end needs the separate COUNT
+    offset, limit = pagination.offset, pagination.page_size
+    query += lambda s: (
+        s.add_columns(func.count().over().label("total_count"))
+        .order_by(JobPlan.code)
+        .offset(offset)
+        .limit(limit)
+    )
     result = await db.execute(query)
-    job_plans = result.scalars().all()
+    rows = result.all()
+    job_plans = [dict(zip(_JOB_PLAN_KEYS, row)) for row in rows]
+
+    if rows:
+        total = rows[0].total_count
+    else:
+        total = await db.scalar(count_query) if offset else 0
 
-    return PaginatedResponse(
+    return serialized_response(_JOB_PLAN_PAGE_ADAPTER, dict(
         items=job_plans,
         total=total,
         page=pagination.page,
         page_size=pagination.page_size,
-        pages=(total + pagination.page_size - 1) // pagination.page_size,
-    )
+        pages=pagination.page_count(total),
+    ))
 
 
 @router.post("/job-plans", response_model=JobPlanResponse, status_code=status.HTTP_201_CREATED)
@@ -467,18 +575,6 @@ async def create_job_plan(
     """
     Create a new job plan.
     """
-    # Check code uniqueness
-    result = await db.execute(
-        select(JobPlan)
-        .where(JobPlan.organization_id == current_user.organization_id)
-        .where(JobPlan.code == jp_data.code)
-    )
-    if result.scalar_one_or_none():
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Job plan code already exists",
-        )
-
     # Extract tasks and parts
     tasks_data = jp_data.tasks
     parts_data = jp_data.parts
@@ -490,36 +586,38 @@ async def create_job_plan(
         **jp_dict,
     )
 
-    db.add(job_plan)
-    await db.flush()
-
-    # Add tasks
-    for task_data in tasks_data:
-        task = JobPlanTask(
-            job_plan_id=job_plan.id,
-            created_by_id=current_user.id,
-            **task_data.model_dump(),
-        )
-        db.add(task)
-
-    # Add parts
-    for part_data in parts_data:
-        part = JobPlanPart(
-            job_plan_id=job_plan.id,
-            created_by_id=current_user.id,
-            **part_data.model_dump(),
+    # The unique index on code rejects a duplicate in the INSERT itself, so there
+    # is no window between a check and the insert for a concurrent request
+    try:
+        async with db.begin_nested():
+            db.add(job_plan)
+    except IntegrityError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Job plan code already exists",
         )
-        db.add(part)
+
+    # Add tasks and parts, one executemany round trip each
+    if tasks_data:
+        await db.execute(insert(JobPlanTask), [
+            {"job_plan_id": job_plan.id, "created_by_id": current_user.id, **task_data.model_dump()}
+            for task_data in tasks_data
+        ])
+
+    if parts_data:
+        await db.execute(insert(JobPlanPart), [
+            {"job_plan_id": job_plan.id, "created_by_id": current_user.id, **part_data.model_dump()}
+            for part_data in parts_data
+        ])
 
     await db.commit()
-    await db.refresh(job_plan)
 
     return job_plan
 
 
 @router.get("/job-plans/{jp_id}", response_model=JobPlanDetailResponse)
 async def get_job_plan(
-    db: DBSession,
+    db: ReadDBSession,
     current_user: CurrentUser,
     jp_id: int,
 ) -> Any:
@@ -528,10 +626,7 @@ async def get_job_plan(
     """
     result = await db.execute(
         select(JobPlan)
-        .options(
-            selectinload(JobPlan.tasks),
-            selectinload(JobPlan.parts),
-        )
+        .options(*_JOB_PLAN_DETAIL_OPTIONS)
         .where(JobPlan.id == jp_id)
         .where(JobPlan.organization_id == current_user.organization_id)
     )
@@ -578,6 +673,5 @@ async def update_job_plan(
     job_plan.updated_by_id = current_user.id
 
     await db.commit()
-    await db.refresh(job_plan)
 
     return job_plan
@@ -1,125 +1,180 @@
 """
 Reporting and analytics endpoints.
 """
-from typing import Any, List, Optional
+import asyncio
+import hashlib
+from typing import Any, Awaitable, Callable, Dict, List, Optional
 from collections import defaultdict
-from datetime import datetime, date, timedelta
+from datetime import datetime, date, time, timedelta
 
-from fastapi import APIRouter, Query
+from fastapi import APIRouter, Body, Query
 from fastapi.responses import Response
-from sqlalchemy import select, func, and_, case, desc, or_
-from sqlalchemy.orm import selectinload
+from sqlalchemy import Executable, Row, select, func, and_, case, desc, lambda_stmt, or_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import raiseload, selectinload
 
 from app.api.deps import DBSession, CurrentUser
+from app.core.cache import cached_json_response
+from app.core.database import read_session_maker
 from app.models.work_order import WorkOrder, WorkOrderStatus, WorkOrderType, WorkOrderPriority, LaborTransaction, MaterialTransaction
 from app.models.asset import Asset, AssetStatus, AssetCriticality
 from app.models.preventive_maintenance import PreventiveMaintenance
 from app.models.inventory import Part, StockLevel, PartTransaction, Storeroom
+from app.models.location import Location
 from app.models.user import User
+from app.schemas.report import DashboardWidgetRequest
 from app.services.report_generator import ReportGenerator, REPORT_TYPES
 
 router = APIRouter()
 
 
+OPEN_WORK_ORDER_STATUSES = (
+    WorkOrderStatus.DRAFT,
+    WorkOrderStatus.WAITING_APPROVAL,
+    WorkOrderStatus.APPROVED,
+    WorkOrderStatus.SCHEDULED,
+    WorkOrderStatus.IN_PROGRESS,
+    WorkOrderStatus.ON_HOLD,
+)
+
+CLOSED_WORK_ORDER_STATUSES = (
+    WorkOrderStatus.COMPLETED,
+    WorkOrderStatus.CLOSED,
+    WorkOrderStatus.CANCELLED,
+)
+
+# Approved and not yet finished
+BACKLOG_WORK_ORDER_STATUSES = (
+    WorkOrderStatus.APPROVED,
+    WorkOrderStatus.SCHEDULED,
+    WorkOrderStatus.IN_PROGRESS,
+    WorkOrderStatus.ON_HOLD,
+)
+
+# Counted towards an assignee's workload
+WORKLOAD_WORK_ORDER_STATUSES = (
+    WorkOrderStatus.APPROVED,
+    WorkOrderStatus.SCHEDULED,
+    WorkOrderStatus.IN_PROGRESS,
+)
+
+# Seconds a widget's data stays cached; writes bump the reports version sooner
+WIDGET_CACHE_TTL = 60
+# Reliability widgets scan every completed work order in the period
+SLOW_WIDGET_CACHE_TTL = 300
+SLOW_WIDGETS = ("data_integrity_score", "mttr", "mtbf")
+
+
+def _within_days(column, start_date: date, end_date: date):
+    """
+    Filter a timestamp column to the whole days from start_date to end_date as a
+    half-open range, so an index on the column can serve it (date() can't).
+    """
+    return and_(
+        column >= datetime.combine(start_date, time.min),
+        column < datetime.combine(end_date + timedelta(days=1), time.min),
+    )
+
+
+def _enum_or_none(enum_cls, raw_value: Optional[str]):
+    """Look up an enum member by name, or None when the value is unset or unknown."""
+    if not raw_value:
+        return None
+    return enum_cls.__members__.get(raw_value)
+
+
+async def _read_concurrently(*statements: Executable) -> List[List[Row]]:
+    """
+    Run independent read-only report queries concurrently.
+    Each statement gets its own read session and pooled connection, so a
+    report waits for its slowest query instead of the sum of all of them.
+    """
+    async def fetch(statement: Executable) -> List[Row]:
+        async with read_session_maker() as session:
+            return (await session.execute(statement)).all()
+
+    return await asyncio.gather(*(fetch(statement) for statement in statements))
+
+
 @router.get("/dashboard")
 async def get_dashboard_metrics(
-    db: DBSession,
     current_user: CurrentUser,
 ) -> Any:
     """
     Get key metrics for dashboard.
+    Cached per organization for a minute; writes to work orders, assets, PMs
+    and inventory invalidate it.
     """
     org_id = current_user.organization_id
+    return await cached_json_response(
+        "reports", org_id, "dashboard", lambda: _dashboard_metrics(org_id), ttl=60
+    )
+
+
+async def _dashboard_metrics(org_id: int) -> dict:
+    """Compute the dashboard metrics for an organization."""
     today = date.today()
     thirty_days_ago = today - timedelta(days=30)
+    first_of_month = today.replace(day=1)
 
-    # Work Order counts by status
-    wo_counts = await db.execute(
+    (
+        wo_counts,
+        pms_due_rows,
+        asset_counts,
+        low_stock_rows,
+        labor_rows,
+        material_rows,
+    ) = await _read_concurrently(
+        # Work Order counts by status, with each status's overdue and
+        # completed-this-month counts, in one scan of the org's work orders
         select(
             WorkOrder.status,
-            func.count(WorkOrder.id).label("count")
+            func.count().label("count"),
+            func.sum(case((WorkOrder.due_date < today, 1), else_=0)).label("overdue"),
+            func.sum(case((WorkOrder.actual_end >= first_of_month, 1), else_=0)).label("ended_this_month"),
         )
         .where(WorkOrder.organization_id == org_id)
-        .group_by(WorkOrder.status)
-    )
-    wo_by_status = {getattr(row[0], 'value', row[0]): row[1] for row in wo_counts}
-
-    # Open work orders
-    open_statuses = [
-        WorkOrderStatus.DRAFT,
-        WorkOrderStatus.WAITING_APPROVAL,
-        WorkOrderStatus.APPROVED,
-        WorkOrderStatus.SCHEDULED,
-        WorkOrderStatus.IN_PROGRESS,
-        WorkOrderStatus.ON_HOLD,
-    ]
-    open_wo_count = sum(wo_by_status.get(s.value, 0) for s in open_statuses)
-
-    # Overdue work orders
-    overdue_count = await db.scalar(
-        select(func.count())
-        .select_from(WorkOrder)
-        .where(WorkOrder.organization_id == org_id)
-        .where(WorkOrder.status.in_(open_statuses))
-        .where(WorkOrder.due_date < today)
-    )
-
-    # Completed this month
-    first_of_month = today.replace(day=1)
-    completed_this_month = await db.scalar(
-        select(func.count())
-        .select_from(WorkOrder)
-        .where(WorkOrder.organization_id == org_id)
-        .where(WorkOrder.status == WorkOrderStatus.COMPLETED)
-        .where(WorkOrder.actual_end >= first_of_month)
-    )
-
-    # PM compliance (completed on time / total due)
-    pms_due = await db.scalar(
+        .group_by(WorkOrder.status),
+        # PM compliance (completed on time / total due)
         select(func.count())
         .select_from(PreventiveMaintenance)
         .where(PreventiveMaintenance.organization_id == org_id)
         .where(PreventiveMaintenance.is_active == True)
-        .where(PreventiveMaintenance.next_due_date <= today)
-    )
-
-    # Assets by status
-    asset_counts = await db.execute(
+        .where(PreventiveMaintenance.next_due_date <= today),
+        # Assets by status
         select(
             Asset.status,
-            func.count(Asset.id).label("count")
+            func.count().label("count")
         )
         .where(Asset.organization_id == org_id)
         .where(Asset.is_active == True)
-        .group_by(Asset.status)
-    )
-    assets_by_status = {getattr(row[0], 'value', row[0]): row[1] for row in asset_counts}
-
-    # Low stock parts count
-    result = await db.execute(
-        select(Part)
-        .options(selectinload(Part.stock_levels))
+        .group_by(Asset.status),
+        # Low stock parts count
+        select(func.count(func.distinct(StockLevel.part_id)))
+        .join(Part, Part.id == StockLevel.part_id)
         .where(Part.organization_id == org_id)
         .where(Part.status == "ACTIVE")
-    )
-    parts = result.scalars().all()
-    low_stock_count = sum(
-        1 for part in parts
-        if any(stock.needs_reorder() for stock in part.stock_levels)
-    )
-
-    # Total costs this month
-    labor_cost_month = await db.scalar(
+        .where(StockLevel.needs_reorder()),
+        # Total costs this month
         select(func.coalesce(func.sum(LaborTransaction.total_cost), 0))
         .where(LaborTransaction.organization_id == org_id)
-        .where(LaborTransaction.created_at >= first_of_month)
-    ) or 0
-
-    material_cost_month = await db.scalar(
+        .where(LaborTransaction.created_at >= first_of_month),
         select(func.coalesce(func.sum(MaterialTransaction.total_cost), 0))
         .where(MaterialTransaction.organization_id == org_id)
-        .where(MaterialTransaction.created_at >= first_of_month)
-    ) or 0
+        .where(MaterialTransaction.created_at >= first_of_month),
+    )
+
+    wo_by_status = {row[0].value: row[1] for row in wo_counts}
+    open_wo_count = sum(wo_by_status.get(s.value, 0) for s in OPEN_WORK_ORDER_STATUSES)
+    overdue_count = sum(row.overdue for row in wo_counts if row.status in OPEN_WORK_ORDER_STATUSES)
+    completed_this_month = sum(
+        row.ended_this_month for row in wo_counts if row.status == WorkOrderStatus.COMPLETED
+    )
+    pms_due = pms_due_rows[0][0]
+    assets_by_status = {row[0].value: row[1] for row in asset_counts}
+    low_stock_count = low_stock_rows[0][0]
+    labor_cost_month = labor_rows[0][0] or 0
+    material_cost_month = material_rows[0][0] or 0
 
     return {
         "work_orders": {
@@ -148,7 +203,6 @@ async def get_dashboard_metrics(
 
 @router.get("/work-orders/summary")
 async def get_work_order_summary(
-    db: DBSession,
     current_user: CurrentUser,
     start_date: date = Query(None),
     end_date: date = Query(None),
@@ -163,80 +217,43 @@ async def get_work_order_summary(
     if not end_date:
         end_date = date.today()
 
-    # Work orders created in period
-    created_count = await db.scalar(
-        select(func.count())
-        .select_from(WorkOrder)
-        .where(WorkOrder.organization_id == org_id)
-        .where(func.date(WorkOrder.created_at) >= start_date)
-        .where(func.date(WorkOrder.created_at) <= end_date)
-    )
-
-    # Work orders completed in period
-    completed_count = await db.scalar(
-        select(func.count())
-        .select_from(WorkOrder)
-        .where(WorkOrder.organization_id == org_id)
-        .where(WorkOrder.status == WorkOrderStatus.COMPLETED)
-        .where(func.date(WorkOrder.actual_end) >= start_date)
-        .where(func.date(WorkOrder.actual_end) <= end_date)
-    )
-
-    # By type
-    by_type = await db.execute(
+    created_rows, completed_rows = await _read_concurrently(
+        # Work orders created in period: counts and costs per type and priority
         select(
             WorkOrder.work_type,
-            func.count(WorkOrder.id).label("count")
-        )
-        .where(WorkOrder.organization_id == org_id)
-        .where(func.date(WorkOrder.created_at) >= start_date)
-        .where(func.date(WorkOrder.created_at) <= end_date)
-        .group_by(WorkOrder.work_type)
-    )
-
-    # By priority
-    by_priority = await db.execute(
-        select(
             WorkOrder.priority,
-            func.count(WorkOrder.id).label("count")
+            func.count().label("count"),
+            func.coalesce(func.sum(WorkOrder.actual_labor_cost), 0).label("labor_cost"),
+            func.coalesce(func.sum(WorkOrder.actual_material_cost), 0).label("material_cost"),
         )
         .where(WorkOrder.organization_id == org_id)
-        .where(func.date(WorkOrder.created_at) >= start_date)
-        .where(func.date(WorkOrder.created_at) <= end_date)
-        .group_by(WorkOrder.priority)
-    )
-
-    # Average completion time (for completed WOs with actual times)
-    avg_completion = await db.execute(
+        .where(_within_days(WorkOrder.created_at, start_date, end_date))
+        .group_by(WorkOrder.work_type, WorkOrder.priority),
+        # Work orders completed in period, with average completion time
+        # for those with actual times
         select(
-            func.avg(
+            func.count().label("count"),
+            func.avg(case((
+                WorkOrder.actual_start.isnot(None),
                 func.extract("epoch", WorkOrder.actual_end) -
-                func.extract("epoch", WorkOrder.actual_start)
-            ) / 3600  # Convert to hours
+                func.extract("epoch", WorkOrder.actual_start),
+            ))).label("avg_seconds"),
         )
         .where(WorkOrder.organization_id == org_id)
         .where(WorkOrder.status == WorkOrderStatus.COMPLETED)
-        .where(WorkOrder.actual_start.isnot(None))
-        .where(WorkOrder.actual_end.isnot(None))
-        .where(func.date(WorkOrder.actual_end) >= start_date)
-        .where(func.date(WorkOrder.actual_end) <= end_date)
+        .where(_within_days(WorkOrder.actual_end, start_date, end_date)),
     )
-    avg_hours = avg_completion.scalar() or 0
 
-    # Total costs
-    total_labor_cost = await db.scalar(
-        select(func.coalesce(func.sum(WorkOrder.actual_labor_cost), 0))
-        .where(WorkOrder.organization_id == org_id)
-        .where(func.date(WorkOrder.created_at) >= start_date)
-        .where(func.date(WorkOrder.created_at) <= end_date)
-    ) or 0
-
-    total_material_cost = await db.scalar(
-        select(func.coalesce(func.sum(WorkOrder.actual_material_cost), 0))
-        .where(WorkOrder.organization_id == org_id)
-        .where(func.date(WorkOrder.created_at) >= start_date)
-        .where(func.date(WorkOrder.created_at) <= end_date)
-    ) or 0
+    by_type = defaultdict(int)
+    by_priority = defaultdict(int)
+    for row in created_rows:
+        by_type[row.work_type.value] += row.count
+        by_priority[row.priority.value] += row.count
+    created_count = sum(row.count for row in created_rows)
+    total_labor_cost = sum(row.labor_cost for row in created_rows)
+    total_material_cost = sum(row.material_cost for row in created_rows)
+    completed_count = completed_rows[0].count
+    avg_hours = (completed_rows[0].avg_seconds or 0) / 3600  # Convert to hours
 
     return {
         "period": {
@@ -247,8 +264,8 @@ async def get_work_order_summary(
             "created": created_count,
             "completed": completed_count,
         },
-        "by_type": {getattr(row[0], 'value', row[0]): row[1] for row in by_type},
-        "by_priority": {getattr(row[0], 'value', row[0]): row[1] for row in by_priority},
+        "by_type": dict(by_type),
+        "by_priority": dict(by_priority),
         "performance": {
             "average_completion_hours": round(float(avg_hours), 2),
         },
@@ -262,7 +279,6 @@ async def get_work_order_summary(
 
 @router.get("/assets/summary")
 async def get_asset_summary(
-    db: DBSession,
     current_user: CurrentUser,
 ) -> Any:
     """
@@ -270,67 +286,55 @@ async def get_asset_summary(
     """
     org_id = current_user.organization_id
 
-    # Total assets
-    total_assets = await db.scalar(
+    total_rows, by_status, by_criticality, by_category, top_assets = await _read_concurrently(
+        # Total assets
         select(func.count())
         .select_from(Asset)
         .where(Asset.organization_id == org_id)
-        .where(Asset.is_active == True)
-    )
-
-    # By status
-    by_status = await db.execute(
+        .where(Asset.is_active == True),
+        # By status
         select(
             Asset.status,
-            func.count(Asset.id).label("count")
+            func.count().label("count")
         )
         .where(Asset.organization_id == org_id)
         .where(Asset.is_active == True)
-        .group_by(Asset.status)
-    )
-
-    # By criticality
-    by_criticality = await db.execute(
+        .group_by(Asset.status),
+        # By criticality
         select(
             Asset.criticality,
-            func.count(Asset.id).label("count")
+            func.count().label("count")
         )
         .where(Asset.organization_id == org_id)
         .where(Asset.is_active == True)
-        .group_by(Asset.criticality)
-    )
-
-    # By category
-    by_category = await db.execute(
+        .group_by(Asset.criticality),
+        # By category
         select(
             Asset.category,
-            func.count(Asset.id).label("count")
+            func.count().label("count")
         )
         .where(Asset.organization_id == org_id)
         .where(Asset.is_active == True)
         .where(Asset.category.isnot(None))
-        .group_by(Asset.category)
-    )
-
-    # Assets with most work orders
-    top_assets = await db.execute(
+        .group_by(Asset.category),
+        # Assets with most work orders, from the trigger-maintained count
         select(
             Asset.id,
             Asset.asset_num,
             Asset.name,
-            func.count(WorkOrder.id).label("wo_count")
+            Asset.work_order_count,
         )
-        .join(WorkOrder, WorkOrder.asset_id == Asset.id)
         .where(Asset.organization_id == org_id)
-        .group_by(Asset.id, Asset.asset_num, Asset.name)
-        .order_by(func.count(WorkOrder.id).desc())
-        .limit(10)
+        .where(Asset.work_order_count > 0)
+        .order_by(Asset.work_order_count.desc())
+        .limit(10),
     )
+    total_assets = total_rows[0][0]
 
     return {
         "total_active": total_assets,
-        "by_status": {getattr(row[0], 'value', row[0]): row[1] for row in by_status},
-        "by_criticality": {getattr(row[0], 'value', row[0]): row[1] for row in by_criticality},
+        "by_status": {row[0].value: row[1] for row in by_status},
+        "by_criticality": {row[0].value: row[1] for row in by_criticality},
         "by_category": {row[0] or "Uncategorized": row[1] for row in by_category},
         "top_by_work_orders": [
             {
@@ -346,7 +350,6 @@ async def get_asset_summary(
 
 @router.get("/pm/compliance")
 async def get_pm_compliance(
-    db: DBSession,
     current_user: CurrentUser,
     start_date: date = Query(None),
     end_date: date = Query(None),
@@ -361,46 +364,46 @@ async def get_pm_compliance(
     if not end_date:
         end_date = date.today()
 
-    # PM work orders completed in period
-    pm_wos = await db.execute(
-        select(WorkOrder)
+    completed = WorkOrder.status == WorkOrderStatus.COMPLETED
+    # Completed without both dates counts as on time
+    ended_late = and_(
+        WorkOrder.due_date.isnot(None),
+        WorkOrder.actual_end.isnot(None),
+        func.date(WorkOrder.actual_end) > WorkOrder.due_date,
+    )
+
+    compliance_rows, upcoming_rows = await _read_concurrently(
+        # PM work orders in period, classified in SQL
+        select(
+            func.count().label("total"),
+            func.sum(case((and_(completed, ~ended_late), 1), else_=0)).label("on_time"),
+            func.sum(case((and_(completed, ended_late), 1), else_=0)).label("late"),
+            func.sum(case((
+                WorkOrder.status.notin_(CLOSED_WORK_ORDER_STATUSES),
+                1,
+            ), else_=0)).label("not_completed"),
+        )
         .where(WorkOrder.organization_id == org_id)
         .where(WorkOrder.work_type == WorkOrderType.PREVENTIVE)
         .where(WorkOrder.pm_id.isnot(None))
-        .where(func.date(WorkOrder.created_at) >= start_date)
-        .where(func.date(WorkOrder.created_at) <= end_date)
-    )
-    pm_work_orders = pm_wos.scalars().all()
-
-    total_pm_wos = len(pm_work_orders)
-    completed_on_time = 0
-    completed_late = 0
-    not_completed = 0
-
-    for wo in pm_work_orders:
-        if wo.status == WorkOrderStatus.COMPLETED:
-            if wo.due_date and wo.actual_end:
-                if wo.actual_end.date() <= wo.due_date:
-                    completed_on_time += 1
-                else:
-                    completed_late += 1
-            else:
-                completed_on_time += 1  # No due date, count as on time
-        elif wo.status not in [WorkOrderStatus.CLOSED, WorkOrderStatus.CANCELLED]:
-            not_completed += 1
-
-    compliance_rate = (completed_on_time / total_pm_wos * 100) if total_pm_wos > 0 else 0
-
-    # Upcoming PMs
-    upcoming_pms = await db.execute(
+        .where(_within_days(WorkOrder.created_at, start_date, end_date)),
+        # Upcoming PMs
         select(PreventiveMaintenance)
+        .options(raiseload("*"))
         .where(PreventiveMaintenance.organization_id == org_id)
         .where(PreventiveMaintenance.is_active == True)
         .where(PreventiveMaintenance.next_due_date.isnot(None))
         .where(PreventiveMaintenance.next_due_date <= end_date + timedelta(days=7))
         .order_by(PreventiveMaintenance.next_due_date)
-        .limit(20)
+        .limit(20),
     )
+    compliance = compliance_rows[0]
+    total_pm_wos = compliance.total
+    completed_on_time = compliance.on_time or 0
+    completed_late = compliance.late or 0
+    not_completed = compliance.not_completed or 0
+
+    compliance_rate = (completed_on_time / total_pm_wos * 100) if total_pm_wos > 0 else 0
 
     return {
         "period": {
@@ -422,14 +425,13 @@ async def get_pm_compliance(
                 "next_due_date": pm.next_due_date.isoformat() if pm.next_due_date else None,
                 "asset_id": pm.asset_id,
             }
-            for pm in upcoming_pms.scalars()
+            for (pm,) in upcoming_rows
         ],
     }
 
 
 @router.get("/inventory/value")
 async def get_inventory_value(
-    db: DBSession,
     current_user: CurrentUser,
 ) -> Any:
     """
@@ -437,64 +439,71 @@ async def get_inventory_value(
     """
     org_id = current_user.organization_id
 
-    # Total inventory value by storeroom
-    result = await db.execute(
-        select(
-            Part,
-        )
-        .options(selectinload(Part.stock_levels))
+    # Stock of active parts, valued at average cost
+    active_stock = (
+        select()
+        .select_from(StockLevel)
+        .join(Part, Part.id == StockLevel.part_id)
         .where(Part.organization_id == org_id)
         .where(Part.status == "ACTIVE")
     )
-    parts = result.scalars().all()
-
-    storeroom_values = {}
-    total_value = 0
-    total_quantity = 0
-
-    for part in parts:
-        for stock in part.stock_levels:
-            value = stock.current_balance * part.average_cost
-            storeroom_id = stock.storeroom_id
-
-            if storeroom_id not in storeroom_values:
-                storeroom_values[storeroom_id] = {"quantity": 0, "value": 0}
-
-            storeroom_values[storeroom_id]["quantity"] += stock.current_balance
-            storeroom_values[storeroom_id]["value"] += value
-            total_value += value
-            total_quantity += stock.current_balance
-
-    # Top value items
-    items_with_value = []
-    for part in parts:
-        total_on_hand = sum(s.current_balance for s in part.stock_levels)
-        if total_on_hand > 0:
-            items_with_value.append({
-                "id": part.id,
-                "part_number": part.part_number,
-                "name": part.name,
-                "quantity": total_on_hand,
-                "unit_cost": part.average_cost,
-                "total_value": total_on_hand * part.average_cost,
-            })
-
-    items_with_value.sort(key=lambda x: x["total_value"], reverse=True)
+    part_quantity = func.sum(StockLevel.current_balance)
+    part_value = part_quantity * Part.average_cost
+
+    storeroom_rows, top_rows, unique_rows = await _read_concurrently(
+        # Total inventory value by storeroom
+        active_stock.add_columns(
+            StockLevel.storeroom_id,
+            func.sum(StockLevel.current_balance).label("quantity"),
+            func.sum(StockLevel.current_balance * Part.average_cost).label("value"),
+        )
+        .group_by(StockLevel.storeroom_id)
+        .order_by(StockLevel.storeroom_id),
+        # Top value items
+        active_stock.add_columns(
+            Part.id,
+            Part.part_number,
+            Part.name,
+            part_quantity.label("quantity"),
+            Part.average_cost,
+            part_value.label("total_value"),
+        )
+        .group_by(Part.id, Part.part_number, Part.name, Part.average_cost)
+        .having(part_quantity > 0)
+        .order_by(part_value.desc(), Part.id)
+        .limit(20),
+        # Parts with stock on hand in any storeroom
+        active_stock.add_columns(func.count(func.distinct(StockLevel.part_id)))
+        .where(StockLevel.current_balance > 0),
+    )
+
+    total_value = sum(row.value for row in storeroom_rows)
+    total_quantity = sum(row.quantity for row in storeroom_rows)
 
     return {
         "summary": {
             "total_value": round(total_value, 2),
             "total_quantity": total_quantity,
-            "unique_parts": len([p for p in parts if any(s.current_balance > 0 for s in p.stock_levels)]),
+            "unique_parts": unique_rows[0][0],
         },
         "by_storeroom": {
-            str(k): {
-                "quantity": v["quantity"],
-                "value": round(v["value"], 2),
+            str(row.storeroom_id): {
+                "quantity": row.quantity,
+                "value": round(row.value, 2),
             }
-            for k, v in storeroom_values.items()
+            for row in storeroom_rows
         },
-        "top_value_items": items_with_value[:20],
+        "top_value_items": [
+            {
+                "id": row.id,
+                "part_number": row.part_number,
+                "name": row.name,
+                "quantity": row.quantity,
+                "unit_cost": row.average_cost,
+                "total_value": row.total_value,
+            }
+            for row in top_rows
+        ],
     }
 
 
@@ -525,18 +534,10 @@ async def get_mtbf_mttr(
     if not end_date:
         end_date = date.today()
 
-    def _enum_or_none(enum_cls, raw_value):
-        if not raw_value:
-            return None
-        try:
-            return enum_cls(raw_value)
-        except ValueError:
-            return None
-
     status_enum = _enum_or_none(AssetStatus, asset_status)
     crit_enum = _enum_or_none(AssetCriticality, criticality)
 
-    asset_query = select(Asset).where(Asset.organization_id == org_id)
+    asset_query = select(Asset).options(raiseload("*")).where(Asset.organization_id == org_id)
     if asset_id:
         asset_query = asset_query.where(Asset.id == asset_id)
     if status_enum:
@@ -559,94 +560,86 @@ async def get_mtbf_mttr(
     asset_lookup = {asset.id: asset for asset in assets}
     asset_ids = list(asset_lookup.keys())
 
-    failure_query = (
+    # Per-failure repair time and gap since the asset's previous repair ended
+    start_epoch = func.extract("epoch", WorkOrder.actual_start)
+    end_epoch = func.extract("epoch", WorkOrder.actual_end)
+    failures = (
         select(
             WorkOrder.asset_id,
-            WorkOrder.actual_start,
             WorkOrder.actual_end,
+            ((end_epoch - start_epoch) / 3600.0).label("repair_hours"),
+            (
+                (start_epoch - func.lag(end_epoch).over(
+                    partition_by=WorkOrder.asset_id,
+                    order_by=(WorkOrder.actual_start, WorkOrder.id),
+                )) / 3600.0
+            ).label("gap_hours"),
+            func.row_number().over(
+                partition_by=WorkOrder.asset_id,
+                order_by=(WorkOrder.actual_start.desc(), WorkOrder.id.desc()),
+            ).label("recency"),
         )
         .where(WorkOrder.organization_id == org_id)
-        .where(WorkOrder.asset_id.isnot(None))
         .where(WorkOrder.asset_id.in_(asset_ids))
         .where(WorkOrder.work_type.in_([WorkOrderType.CORRECTIVE, WorkOrderType.EMERGENCY]))
         .where(WorkOrder.status == WorkOrderStatus.COMPLETED)
         .where(WorkOrder.actual_start.isnot(None))
         .where(WorkOrder.actual_end.isnot(None))
-        .where(func.date(WorkOrder.actual_end) >= start_date)
-        .where(func.date(WorkOrder.actual_end) <= end_date)
-        .order_by(WorkOrder.asset_id, WorkOrder.actual_start)
+        .where(_within_days(WorkOrder.actual_end, start_date, end_date))
+        .subquery()
+    )
+    repaired = failures.c.repair_hours > 0
+    spaced = failures.c.gap_hours > 0
+    result = await db.execute(
+        select(
+            failures.c.asset_id,
+            func.count().label("failure_count"),
+            func.sum(case((repaired, failures.c.repair_hours))).label("repair_total"),
+            func.count(case((repaired, 1))).label("repair_count"),
+            func.sum(case((spaced, failures.c.gap_hours))).label("gap_total"),
+            func.count(case((spaced, 1))).label("gap_count"),
+            func.max(case((failures.c.recency == 1, failures.c.actual_end))).label("last_failure_at"),
+        )
+        .group_by(failures.c.asset_id)
+        .order_by(failures.c.asset_id)
     )
-
-    result = await db.execute(failure_query)
     rows = result.all()
 
-    grouped_events = defaultdict(list)
-    for aid, start_ts, end_ts in rows:
-        if aid is None:
-            continue
-        grouped_events[aid].append((start_ts, end_ts))
-
     asset_metrics = []
-    all_repair_times: List[float] = []
-    all_intervals: List[float] = []
-
-    for aid, events in grouped_events.items():
-        asset = asset_lookup.get(aid)
-        if not asset:
-            continue
-
-        events.sort(key=lambda e: e[0])
-        failure_count = len(events)
-
-        repair_times = []
-        time_between = []
-
-        prev_end = None
-        for start_ts, end_ts in events:
-            if start_ts and end_ts:
-                repair_time = (end_ts - start_ts).total_seconds() / 3600
-                if repair_time > 0:
-                    repair_times.append(repair_time)
-                    all_repair_times.append(repair_time)
-
-            if prev_end and start_ts:
-                delta = (start_ts - prev_end).total_seconds() / 3600
-                if delta > 0:
-                    time_between.append(delta)
-                    all_intervals.append(delta)
-            if end_ts:
-                prev_end = end_ts
-
-        sample_size = len(time_between)
-        has_enough_failures = failure_count >= max(2, min_failures)
+    for row in rows:
+        asset = asset_lookup[row.asset_id]
+        has_enough_failures = row.failure_count >= max(2, min_failures)
 
         if not has_enough_failures and not include_single_failures:
             continue
 
-        mtbf = sum(time_between) / sample_size if sample_size else None
-        mttr = sum(repair_times) / len(repair_times) if repair_times else None
+        mtbf = float(row.gap_total) / row.gap_count if row.gap_count else None
+        mttr = float(row.repair_total) / row.repair_count if row.repair_count else None
         availability = 0
         if mtbf and mttr and (mtbf + mttr) > 0:
             availability = round((mtbf / (mtbf + mttr)) * 100, 2)
 
         asset_metrics.append(
             {
-                "asset_id": aid,
+                "asset_id": row.asset_id,
                 "asset_num": asset.asset_num,
                 "asset_name": asset.name,
                 "status": asset.status.value if asset.status else None,
                 "criticality": asset.criticality.value if asset.criticality else None,
-                "failure_count": failure_count,
+                "failure_count": row.failure_count,
                 "mtbf_hours": round(mtbf, 2) if mtbf is not None else None,
                 "mttr_hours": round(mttr, 2) if mttr is not None else None,
                 "availability": availability,
-                "sample_size": sample_size,
-                "last_failure_at": events[-1][1].isoformat() if events[-1][1] else None,
+                "sample_size": row.gap_count,
+                "last_failure_at": row.last_failure_at.isoformat() if row.last_failure_at else None,
             }
         )
 
-    overall_mttr = sum(all_repair_times) / len(all_repair_times) if all_repair_times else 0
-    overall_mtbf = sum(all_intervals) / len(all_intervals) if all_intervals else 0
+    # Overall averages cover every failure, including assets below min_failures
+    repair_count = sum(row.repair_count for row in rows)
+    gap_count = sum(row.gap_count for row in rows)
+    overall_mttr = float(sum(row.repair_total or 0 for row in rows)) / repair_count if repair_count else 0
+    overall_mtbf = float(sum(row.gap_total or 0 for row in rows)) / gap_count if gap_count else 0
 
     asset_metrics.sort(
         key=lambda entry: (
@@ -662,7 +655,7 @@ async def get_mtbf_mttr(
             "end_date": end_date.isoformat(),
         },
         "overall": {
-            "total_failures": len(rows),
+            "total_failures": sum(row.failure_count for row in rows),
             "average_mtbf_hours": round(overall_mtbf, 2),
             "average_mttr_hours": round(overall_mttr, 2),
         },
@@ -672,37 +665,112 @@ async def get_mtbf_mttr(
 
 @router.get("/notifications")
 async def get_notifications(
-    db: DBSession,
     current_user: CurrentUser,
 ) -> Any:
     """
     Get system notifications/alerts for the current user.
     Returns critical items that need attention.
+    Cached per organization for 30 seconds; writes to work orders, assets, PMs
+    and inventory invalidate it.
     """
     org_id = current_user.organization_id
+    return await cached_json_response(
+        "reports", org_id, "notifications", lambda: _notifications(org_id), ttl=30
+    )
+
+
+async def _notifications(org_id: int) -> dict:
+    """Collect the notifications for an organization."""
     today = date.today()
+    week_ahead = today + timedelta(days=7)
     notifications = []
 
-    # Open work orders status
-    open_statuses = [
-        WorkOrderStatus.DRAFT,
-        WorkOrderStatus.WAITING_APPROVAL,
-        WorkOrderStatus.APPROVED,
-        WorkOrderStatus.SCHEDULED,
-        WorkOrderStatus.IN_PROGRESS,
-        WorkOrderStatus.ON_HOLD,
-    ]
+    # Only the columns the notifications show
+    wo_columns = (
+        WorkOrder.id,
+        WorkOrder.wo_number,
+        WorkOrder.title,
+        WorkOrder.due_date,
+        WorkOrder.created_at,
+        WorkOrder.priority,
+        WorkOrder.status,
+    )
 
-    # 1. Overdue work orders
-    overdue_wos = await db.execute(
-        select(WorkOrder)
+    # Low stock parts, one per part: its storeroom furthest below reorder point
+    low_stock = (
+        select(
+            Part.id,
+            Part.part_number,
+            Part.name,
+            StockLevel.storeroom_id,
+            StockLevel.current_balance,
+            StockLevel.reorder_point,
+            func.row_number().over(
+                partition_by=StockLevel.part_id,
+                order_by=(StockLevel.available_quantity - StockLevel.reorder_point, StockLevel.id),
+            ).label("rank"),
+        )
+        .join(StockLevel, StockLevel.part_id == Part.id)
+        .where(Part.organization_id == org_id)
+        .where(Part.status == "ACTIVE")
+        .where(StockLevel.needs_reorder())
+        .subquery()
+    )
+
+    (
+        overdue_wos,
+        pending_approval,
+        due_pms,
+        low_stock_rows,
+        unassigned,
+        emergency_wos,
+    ) = await _read_concurrently(
+        # Overdue work orders
+        select(*wo_columns)
         .where(WorkOrder.organization_id == org_id)
-        .where(WorkOrder.status.in_(open_statuses))
+        .where(WorkOrder.status.in_(OPEN_WORK_ORDER_STATUSES))
         .where(WorkOrder.due_date < today)
         .order_by(WorkOrder.due_date)
-        .limit(10)
+        .limit(10),
+        # Work orders awaiting approval
+        select(*wo_columns)
+        .where(WorkOrder.organization_id == org_id)
+        .where(WorkOrder.status == WorkOrderStatus.WAITING_APPROVAL)
+        .order_by(WorkOrder.created_at.desc())
+        .limit(10),
+        # PMs due in next 7 days
+        select(
+            PreventiveMaintenance.id,
+            PreventiveMaintenance.pm_number,
+            PreventiveMaintenance.name,
+            PreventiveMaintenance.next_due_date,
+        )
+        .where(PreventiveMaintenance.organization_id == org_id)
+        .where(PreventiveMaintenance.is_active == True)
+        .where(PreventiveMaintenance.next_due_date.isnot(None))
+        .where(PreventiveMaintenance.next_due_date <= week_ahead)
+        .order_by(PreventiveMaintenance.next_due_date)
+        .limit(10),
+        # Low stock
+        select(low_stock).where(low_stock.c.rank == 1).order_by(low_stock.c.id),
+        # Unassigned work orders
+        select(*wo_columns)
+        .where(WorkOrder.organization_id == org_id)
+        .where(WorkOrder.status.in_([WorkOrderStatus.APPROVED, WorkOrderStatus.SCHEDULED]))
+        .where(WorkOrder.assigned_to_id.is_(None))
+        .order_by(WorkOrder.priority.desc(), WorkOrder.due_date)
+        .limit(10),
+        # Emergency work orders in progress
+        select(*wo_columns)
+        .where(WorkOrder.organization_id == org_id)
+        .where(WorkOrder.priority == "EMERGENCY")
+        .where(WorkOrder.status.in_([WorkOrderStatus.IN_PROGRESS, WorkOrderStatus.ON_HOLD]))
+        .order_by(WorkOrder.created_at.desc())
+        .limit(5),
     )
-    for wo in overdue_wos.scalars():
+
+    # 1. Overdue work orders
+    for wo in overdue_wos:
         days_overdue = (today - wo.due_date).days
         notifications.append({
             "id": f"overdue-wo-{wo.id}",
@@ -715,14 +783,7 @@ async def get_notifications(
         })
 
     # 2. Work orders awaiting approval
-    pending_approval = await db.execute(
-        select(WorkOrder)
-        .where(WorkOrder.organization_id == org_id)
-        .where(WorkOrder.status == WorkOrderStatus.WAITING_APPROVAL)
-        .order_by(WorkOrder.created_at.desc())
-        .limit(10)
-    )
-    for wo in pending_approval.scalars():
+    for wo in pending_approval:
         notifications.append({
             "id": f"approval-wo-{wo.id}",
             "type": "pending_approval",
@@ -734,17 +795,7 @@ async def get_notifications(
         })
 
     # 3. PMs due in next 7 days
-    week_ahead = today + timedelta(days=7)
-    due_pms = await db.execute(
-        select(PreventiveMaintenance)
-        .where(PreventiveMaintenance.organization_id == org_id)
-        .where(PreventiveMaintenance.is_active == True)
-        .where(PreventiveMaintenance.next_due_date.isnot(None))
-        .where(PreventiveMaintenance.next_due_date <= week_ahead)
-        .order_by(PreventiveMaintenance.next_due_date)
-        .limit(10)
-    )
-    for pm in due_pms.scalars():
+    for pm in due_pms:
         days_until = (pm.next_due_date - today).days if pm.next_due_date else 0
         severity = "critical" if days_until < 0 else ("warning" if days_until <= 2 else "info")
         notifications.append({
@@ -758,37 +809,19 @@ async def get_notifications(
         })
 
     # 4. Low stock alerts
-    result = await db.execute(
-        select(Part)
-        .options(selectinload(Part.stock_levels))
-        .where(Part.organization_id == org_id)
-        .where(Part.status == "ACTIVE")
-    )
-    parts = result.scalars().all()
-    for part in parts:
-        for stock in part.stock_levels:
-            if stock.needs_reorder():
-                notifications.append({
-                    "id": f"low-stock-{part.id}-{stock.storeroom_id}",
-                    "type": "low_stock",
-                    "severity": "warning" if stock.current_balance > 0 else "critical",
-                    "title": f"Low Stock: {part.part_number}",
-                    "message": f"{part.name} - Current: {stock.current_balance}, Reorder Point: {stock.reorder_point}",
-                    "link": f"/inventory/parts/{part.id}",
-                    "created_at": datetime.utcnow().isoformat(),
-                })
-                break  # Only one notification per part
+    for stock in low_stock_rows:
+        notifications.append({
+            "id": f"low-stock-{stock.id}-{stock.storeroom_id}",
+            "type": "low_stock",
+            "severity": "warning" if stock.current_balance > 0 else "critical",
+            "title": f"Low Stock: {stock.part_number}",
+            "message": f"{stock.name} - Current: {stock.current_balance}, Reorder Point: {stock.reorder_point}",
+            "link": f"/inventory/parts/{stock.id}",
+            "created_at": datetime.utcnow().isoformat(),
+        })
 
     # 5. Unassigned work orders
-    unassigned = await db.execute(
-        select(WorkOrder)
-        .where(WorkOrder.organization_id == org_id)
-        .where(WorkOrder.status.in_([WorkOrderStatus.APPROVED, WorkOrderStatus.SCHEDULED]))
-        .where(WorkOrder.assigned_to_id.is_(None))
-        .order_by(WorkOrder.priority.desc(), WorkOrder.due_date)
-        .limit(10)
-    )
-    for wo in unassigned.scalars():
+    for wo in unassigned:
         notifications.append({
             "id": f"unassigned-wo-{wo.id}",
             "type": "unassigned_work_order",
@@ -800,15 +833,7 @@ async def get_notifications(
         })
 
     # 6. Emergency work orders in progress
-    emergency_wos = await db.execute(
-        select(WorkOrder)
-        .where(WorkOrder.organization_id == org_id)
-        .where(WorkOrder.priority == "EMERGENCY")
-        .where(WorkOrder.status.in_([WorkOrderStatus.IN_PROGRESS, WorkOrderStatus.ON_HOLD]))
-        .order_by(WorkOrder.created_at.desc())
-        .limit(5)
-    )
-    for wo in emergency_wos.scalars():
+    for wo in emergency_wos:
         notifications.append({
             "id": f"emergency-wo-{wo.id}",
             "type": "emergency_work_order",
@@ -839,7 +864,6 @@ async def get_notifications(
 @router.get("/dashboard/widgets")
 @router.get("/dashboard/widgets/")
 async def get_dashboard_widget_data(
-    db: DBSession,
     current_user: CurrentUser,
     widget: str = Query(..., description="Widget type to fetch"),
     start_date: Optional[date] = Query(None),
@@ -858,717 +882,897 @@ async def get_dashboard_widget_data(
     """
     Get data for specific dashboard widgets with custom date ranges.
     Supports various widget types for comprehensive dashboard customization.
+    Cached per organization and filter set for a minute; writes to work orders,
+    assets, PMs and inventory invalidate it.
     """
-    org_id = current_user.organization_id
-
-    if not start_date:
-        start_date = date.today() - timedelta(days=30)
-    if not end_date:
-        end_date = date.today()
-
-    # Helper for date range filter
-    def date_filter(column, use_date_func=True):
-        if use_date_func:
-            return and_(func.date(column) >= start_date, func.date(column) <= end_date)
-        return and_(column >= start_date, column <= end_date)
-
-    def apply_work_order_filters(query):
-        """Apply common work order filters (status/priority/type/assignee)."""
-        if status:
-            try:
-                query = query.where(WorkOrder.status == WorkOrderStatus(status))
-            except ValueError:
-                pass
-        if priority:
-            from app.models.work_order import WorkOrderPriority
-            try:
-                query = query.where(WorkOrder.priority == WorkOrderPriority(priority))
-            except ValueError:
-                pass
-        if work_type:
-            try:
-                query = query.where(WorkOrder.work_type == WorkOrderType(work_type))
-            except ValueError:
-                pass
-        if assigned_to:
-            query = query.where(WorkOrder.assigned_to_id == assigned_to)
-        return query
-
-    # Widget implementations
-    if widget == "wo_by_status":
-        result = await db.execute(
-            apply_work_order_filters(
-                select(WorkOrder.status, func.count(WorkOrder.id))
-                .where(WorkOrder.organization_id == org_id)
-                .where(date_filter(WorkOrder.created_at))
-            ).group_by(WorkOrder.status)
-        )
-        return {"data": {getattr(row[0], 'value', row[0]): row[1] for row in result}}
-
-    elif widget == "wo_by_priority":
-        query = apply_work_order_filters(
-            select(WorkOrder.priority, func.count(WorkOrder.id))
-            .where(WorkOrder.organization_id == org_id)
-            .where(date_filter(WorkOrder.created_at))
-        ).group_by(WorkOrder.priority)
-            
-        if status:
-            if status == "OPEN":
-                query = query.where(WorkOrder.status.in_([
-                    WorkOrderStatus.DRAFT, WorkOrderStatus.WAITING_APPROVAL, 
-                    WorkOrderStatus.APPROVED, WorkOrderStatus.SCHEDULED, 
-                    WorkOrderStatus.IN_PROGRESS, WorkOrderStatus.ON_HOLD
-                ]))
-            elif status == "CLOSED":
-                query = query.where(WorkOrder.status.in_([
-                    WorkOrderStatus.COMPLETED, WorkOrderStatus.CLOSED, 
-                    WorkOrderStatus.CANCELLED
-                ]))
-            else:
-                # Try to match specific status
-                try:
-                    s = WorkOrderStatus(status)
-                    query = query.where(WorkOrder.status == s)
-                except ValueError:
-                    pass
-
-        result = await db.execute(query)
-        return {"data": {getattr(row[0], 'value', row[0]): row[1] for row in result}}
-
-    elif widget == "wo_by_type":
-        query = apply_work_order_filters(
-            select(WorkOrder.work_type, func.count(WorkOrder.id))
-            .where(WorkOrder.organization_id == org_id)
-            .where(date_filter(WorkOrder.created_at))
-        ).group_by(WorkOrder.work_type)
-
-        result = await db.execute(query)
-        return {"data": {getattr(row[0], 'value', row[0]): row[1] for row in result}}
-
-    elif widget == "wo_created_trend":
-        query = select(func.date(WorkOrder.created_at).label("day"), func.count(WorkOrder.id))\
-            .where(WorkOrder.organization_id == org_id)\
-            .where(date_filter(WorkOrder.created_at))
-        if priority:
-            from app.models.work_order import WorkOrderPriority
-            try:
-                query = query.where(WorkOrder.priority == WorkOrderPriority(priority))
-            except ValueError:
-                pass
-        if work_type:
-            try:
-                query = query.where(WorkOrder.work_type == WorkOrderType(work_type))
-            except ValueError:
-                pass
-        if assigned_to:
-            query = query.where(WorkOrder.assigned_to_id == assigned_to)
-        result = await db.execute(
-            query
-            .group_by(func.date(WorkOrder.created_at))
-            .order_by(func.date(WorkOrder.created_at))
-        )
-        return {"data": [{"date": row[0].isoformat(), "count": row[1]} for row in result]}
-
-    elif widget == "wo_completed_trend":
-        query = select(func.date(WorkOrder.actual_end).label("day"), func.count(WorkOrder.id))\
-            .where(WorkOrder.organization_id == org_id)\
-            .where(WorkOrder.status == WorkOrderStatus.COMPLETED)\
-            .where(WorkOrder.actual_end.isnot(None))\
-            .where(date_filter(WorkOrder.actual_end))
-        if priority:
-            from app.models.work_order import WorkOrderPriority
-            try:
-                query = query.where(WorkOrder.priority == WorkOrderPriority(priority))
-            except ValueError:
-                pass
-        if work_type:
-            try:
-                query = query.where(WorkOrder.work_type == WorkOrderType(work_type))
-            except ValueError:
-                pass
-        if assigned_to:
-            query = query.where(WorkOrder.assigned_to_id == assigned_to)
-        result = await db.execute(
-            query
-            .group_by(func.date(WorkOrder.actual_end))
-            .order_by(func.date(WorkOrder.actual_end))
-        )
-        return {"data": [{"date": row[0].isoformat(), "count": row[1]} for row in result]}
-
-    elif widget == "open_wo_by_user":
-        open_statuses = [WorkOrderStatus.IN_PROGRESS, WorkOrderStatus.ON_HOLD, WorkOrderStatus.APPROVED, WorkOrderStatus.SCHEDULED]
-        result = await db.execute(
-            select(User.id, User.first_name, User.last_name, func.count(WorkOrder.id))
-            .join(WorkOrder, WorkOrder.assigned_to_id == User.id)
-            .where(WorkOrder.organization_id == org_id)
-            .where(WorkOrder.status.in_(open_statuses))
-            .group_by(User.id, User.first_name, User.last_name)
-            .order_by(desc(func.count(WorkOrder.id)))
-            .limit(limit)
-        )
-        return {"data": [{"user_id": row[0], "name": f"{row[1]} {row[2]}", "count": row[3]} for row in result]}
+    return await _widget_response(
+        current_user.organization_id,
+        DashboardWidgetRequest(
+            widget=widget, start_date=start_date, end_date=end_date, status=status, priority=priority,
+            work_type=work_type, assigned_to=assigned_to, asset_status=asset_status, criticality=criticality,
+            storeroom=storeroom, craft=craft, labor_type=labor_type, limit=limit,
+        ),
+    )
 
-    elif widget == "completed_wo_by_user":
-        result = await db.execute(
-            select(User.id, User.first_name, User.last_name, func.count(WorkOrder.id))
-            .join(WorkOrder, WorkOrder.assigned_to_id == User.id)
-            .where(WorkOrder.organization_id == org_id)
-            .where(WorkOrder.status == WorkOrderStatus.COMPLETED)
-            .where(date_filter(WorkOrder.actual_end))
-            .group_by(User.id, User.first_name, User.last_name)
-            .order_by(desc(func.count(WorkOrder.id)))
-            .limit(limit)
-        )
-        return {"data": [{"user_id": row[0], "name": f"{row[1]} {row[2]}", "count": row[3]} for row in result]}
-
-    elif widget == "labor_cost_by_user":
-        query = select(User.id, User.first_name, User.last_name,
-                   func.sum(LaborTransaction.total_cost), func.sum(LaborTransaction.hours))\
-            .join(LaborTransaction, LaborTransaction.user_id == User.id)\
-            .where(LaborTransaction.organization_id == org_id)\
-            .where(date_filter(LaborTransaction.created_at))\
-            .group_by(User.id, User.first_name, User.last_name)\
-            .order_by(desc(func.sum(LaborTransaction.total_cost)))\
-            .limit(limit)
-        
-        # Apply labor filters
-        if craft:
-            query = query.where(LaborTransaction.craft == craft)
-        if labor_type:
-            query = query.where(LaborTransaction.labor_type == labor_type)
-            
-        result = await db.execute(query)
-        return {"data": [{"user_id": row[0], "name": f"{row[1]} {row[2]}", "total_cost": float(row[3] or 0), "total_hours": float(row[4] or 0)} for row in result]}
-
-    elif widget == "material_cost_by_part":
-        query = select(Part.id, Part.part_number, Part.name,
-                   func.sum(MaterialTransaction.total_cost), func.sum(MaterialTransaction.quantity))\
-            .join(MaterialTransaction, MaterialTransaction.part_id == Part.id)\
-            .where(MaterialTransaction.organization_id == org_id)\
-            .where(date_filter(MaterialTransaction.created_at))\
-            .group_by(Part.id, Part.part_number, Part.name)\
-            .order_by(desc(func.sum(MaterialTransaction.total_cost)))\
-            .limit(limit)
-        
-        # Apply storeroom filter
-        if storeroom:
-            query = query.where(MaterialTransaction.storeroom_id == storeroom)
-            
-        result = await db.execute(query)
-        return {"data": [{"part_id": row[0], "part_number": row[1], "name": row[2],
-                         "total_cost": float(row[3] or 0), "total_qty": float(row[4] or 0)} for row in result]}
-
-    elif widget == "most_used_parts":
-        query = select(Part.id, Part.part_number, Part.name, func.sum(MaterialTransaction.quantity))\
-            .join(MaterialTransaction, MaterialTransaction.part_id == Part.id)\
-            .where(MaterialTransaction.organization_id == org_id)\
-            .where(MaterialTransaction.transaction_type == "ISSUE")\
-            .where(date_filter(MaterialTransaction.created_at))\
-            .group_by(Part.id, Part.part_number, Part.name)\
-            .order_by(desc(func.sum(MaterialTransaction.quantity)))\
-            .limit(limit)
-        
-        # Apply storeroom filter
-        if storeroom:
-            query = query.where(MaterialTransaction.storeroom_id == storeroom)
-            
-        result = await db.execute(query)
-        return {"data": [{"part_id": row[0], "part_number": row[1], "name": row[2], "quantity": float(row[3] or 0)} for row in result]}
-
-    elif widget == "least_used_parts":
-        query = select(Part.id, Part.part_number, Part.name, func.coalesce(func.sum(MaterialTransaction.quantity), 0))\
-            .outerjoin(MaterialTransaction, and_(
-                MaterialTransaction.part_id == Part.id,
-                MaterialTransaction.transaction_type == "ISSUE",
-                date_filter(MaterialTransaction.created_at),
-                MaterialTransaction.storeroom_id == storeroom if storeroom else True
-            ))\
-            .where(Part.organization_id == org_id)\
-            .where(Part.status == "ACTIVE")\
-            .group_by(Part.id, Part.part_number, Part.name)\
-            .order_by(func.coalesce(func.sum(MaterialTransaction.quantity), 0))\
-            .limit(limit)
-            
-        result = await db.execute(query)
-        return {"data": [{"part_id": row[0], "part_number": row[1], "name": row[2], "quantity": float(row[3] or 0)} for row in result]}
 
-    elif widget == "assets_by_status":
-        result = await db.execute(
-            select(Asset.status, func.count(Asset.id))
-            .where(Asset.organization_id == org_id)
-            .where(Asset.is_active == True)
-            .group_by(Asset.status)
-        )
-        return {"data": {getattr(row[0], 'value', row[0]): row[1] for row in result}}
+@router.post("/dashboard/widgets/batch")
+async def get_dashboard_widgets_batch(
+    current_user: CurrentUser,
+    specs: List[DashboardWidgetRequest] = Body(..., max_length=50),
+) -> Any:
+    """
+    Get data for several dashboard widgets in one request.
+    Widgets load concurrently, each on its own read session, and share the
+    single-widget cache; results come back in request order.
+    """
+    responses = await asyncio.gather(
+        *(_widget_response(current_user.organization_id, spec) for spec in specs)
+    )
+    return Response(
+        content=b"[" + b",".join(response.body for response in responses) + b"]",
+        media_type="application/json",
+    )
 
-    elif widget == "assets_by_criticality":
-        result = await db.execute(
-            select(Asset.criticality, func.count(Asset.id))
-            .where(Asset.organization_id == org_id)
-            .where(Asset.is_active == True)
-            .group_by(Asset.criticality)
-        )
-        return {"data": {getattr(row[0], 'value', row[0]): row[1] for row in result}}
-
-    elif widget == "assets_most_wo":
-        query = select(Asset.id, Asset.asset_num, Asset.name, func.count(WorkOrder.id))\
-            .join(WorkOrder, WorkOrder.asset_id == Asset.id)\
-            .where(Asset.organization_id == org_id)\
-            .where(date_filter(WorkOrder.created_at))\
-            .group_by(Asset.id, Asset.asset_num, Asset.name)\
-            .order_by(desc(func.count(WorkOrder.id)))\
-            .limit(limit)
-        
-        # Apply asset filters
-        if asset_status:
-            from app.models.asset import AssetStatus
+
+async def _widget_response(org_id: int, spec: DashboardWidgetRequest) -> Response:
+    """Serve one widget's data from the organization's reports cache."""
+    spec = spec.model_copy(update={
+        "start_date": spec.start_date or date.today() - timedelta(days=30),
+        "end_date": spec.end_date or date.today(),
+    })
+    filters_key = hashlib.blake2b(spec.model_dump_json().encode(), digest_size=16).hexdigest()
+
+    async def load() -> dict:
+        handler = _WIDGETS.get(spec.widget)
+        if handler is None:
+            return {"error": f"Unknown widget type: {spec.widget}"}
+        async with read_session_maker() as session:
+            return await handler(_WidgetQuery(session, org_id, spec))
+
+    ttl = SLOW_WIDGET_CACHE_TTL if spec.widget in SLOW_WIDGETS else WIDGET_CACHE_TTL
+    return await cached_json_response("reports", org_id, f"widget:{filters_key}", load, ttl=ttl)
+
+
+class _WidgetQuery:
+    """A widget request bound to its session and organization, with the filters widgets share."""
+
+    def __init__(self, db: AsyncSession, org_id: int, spec: DashboardWidgetRequest):
+        self.db = db
+        self.org_id = org_id
+        self.start_date = spec.start_date
+        self.end_date = spec.end_date
+        self.status = spec.status
+        self.priority = spec.priority
+        self.work_type = spec.work_type
+        self.assigned_to = spec.assigned_to
+        self.storeroom = spec.storeroom
+        self.craft = spec.craft
+        self.labor_type = spec.labor_type
+        self.limit = spec.limit
+        self.asset_status = _enum_or_none(AssetStatus, spec.asset_status)
+        self.criticality = _enum_or_none(AssetCriticality, spec.criticality)
+        # Bound values for lambda statements, which can't call helpers per request
+        self.period_start = datetime.combine(spec.start_date, time.min)
+        self.period_end = datetime.combine(spec.end_date + timedelta(days=1), time.min)
+        self.status_enum = _enum_or_none(WorkOrderStatus, spec.status)
+        self.priority_enum = _enum_or_none(WorkOrderPriority, spec.priority)
+        self.work_type_enum = _enum_or_none(WorkOrderType, spec.work_type)
+
+    def date_filter(self, column):
+        """Filter a timestamp column to the requested days."""
+        return _within_days(column, self.start_date, self.end_date)
+
+    def apply_work_order_filters(self, query):
+        """Apply common work order filters (status/priority/type/assignee)."""
+        if self.status:
             try:
-                s = AssetStatus(asset_status)
-                query = query.where(Asset.status == s)
+                query = query.where(WorkOrder.status == WorkOrderStatus(self.status))
             except ValueError:
                 pass
-        if criticality:
-            from app.models.asset import AssetCriticality
+        if self.priority:
             try:
-                c = AssetCriticality(criticality)
-                query = query.where(Asset.criticality == c)
+                query = query.where(WorkOrder.priority == WorkOrderPriority(self.priority))
             except ValueError:
                 pass
-                
-        result = await db.execute(query)
-        return {"data": [{"asset_id": row[0], "asset_num": row[1], "name": row[2], "wo_count": row[3]} for row in result]}
-
-    elif widget == "assets_highest_cost":
-        query = select(Asset.id, Asset.asset_num, Asset.name, func.sum(WorkOrder.total_cost))\
-            .join(WorkOrder, WorkOrder.asset_id == Asset.id)\
-            .where(Asset.organization_id == org_id)\
-            .where(date_filter(WorkOrder.created_at))\
-            .group_by(Asset.id, Asset.asset_num, Asset.name)\
-            .order_by(desc(func.sum(WorkOrder.total_cost)))\
-            .limit(limit)
-        
-        # Apply asset filters
-        if asset_status:
-            from app.models.asset import AssetStatus
+        if self.work_type:
             try:
-                s = AssetStatus(asset_status)
-                query = query.where(Asset.status == s)
+                query = query.where(WorkOrder.work_type == WorkOrderType(self.work_type))
             except ValueError:
                 pass
-                
-        result = await db.execute(query)
-        return {"data": [{"asset_id": row[0], "asset_num": row[1], "name": row[2], "total_cost": float(row[3] or 0)} for row in result]}
+        if self.assigned_to:
+            query = query.where(WorkOrder.assigned_to_id == self.assigned_to)
+        return query
 
-    elif widget == "cost_trend_labor":
-        result = await db.execute(
-            select(func.date(LaborTransaction.created_at), func.sum(LaborTransaction.total_cost))
-            .where(LaborTransaction.organization_id == org_id)
-            .where(date_filter(LaborTransaction.created_at))
-            .group_by(func.date(LaborTransaction.created_at))
-            .order_by(func.date(LaborTransaction.created_at))
+    def work_order_criteria(self) -> list:
+        """
+        The common work order filters as lambda criteria. Each is its own
+        cache-keyed step, so lambda statements reuse their compiled SQL.
+        """
+        status, priority, work_type = self.status_enum, self.priority_enum, self.work_type_enum
+        assigned_to = self.assigned_to
+        criteria = []
+        if status:
+            criteria.append(lambda s: s.where(WorkOrder.status == status))
+        if priority:
+            criteria.append(lambda s: s.where(WorkOrder.priority == priority))
+        if work_type:
+            criteria.append(lambda s: s.where(WorkOrder.work_type == work_type))
+        if assigned_to:
+            criteria.append(lambda s: s.where(WorkOrder.assigned_to_id == assigned_to))
+        return criteria
+
+    def apply_asset_filters(self, query):
+        """Apply common asset filters (status/criticality)."""
+        if self.asset_status:
+            query = query.where(Asset.status == self.asset_status)
+        if self.criticality:
+            query = query.where(Asset.criticality == self.criticality)
+        return query
+
+
+async def _widget_wo_by_status(w: _WidgetQuery) -> dict:
+    """Work orders created in the period, counted by status."""
+    org_id, period_start, period_end = w.org_id, w.period_start, w.period_end
+    query = lambda_stmt(
+        lambda: select(WorkOrder.status, func.count())
+        .where(WorkOrder.organization_id == org_id)
+        .where(WorkOrder.created_at >= period_start, WorkOrder.created_at < period_end)
+    )
+    for criteria in w.work_order_criteria():
+        query += criteria
+    query += lambda s: s.group_by(WorkOrder.status)
+
+    result = await w.db.execute(query)
+    return {"data": {row[0].value: row[1] for row in result}}
+
+
+async def _widget_wo_by_priority(w: _WidgetQuery) -> dict:
+    """Work orders created in the period, counted by priority; status also accepts OPEN and CLOSED."""
+    org_id, period_start, period_end = w.org_id, w.period_start, w.period_end
+    query = lambda_stmt(
+        lambda: select(WorkOrder.priority, func.count())
+        .where(WorkOrder.organization_id == org_id)
+        .where(WorkOrder.created_at >= period_start, WorkOrder.created_at < period_end)
+    )
+    for criteria in w.work_order_criteria():
+        query += criteria
+    if w.status == "OPEN":
+        query += lambda s: s.where(WorkOrder.status.in_(OPEN_WORK_ORDER_STATUSES))
+    elif w.status == "CLOSED":
+        query += lambda s: s.where(WorkOrder.status.in_(CLOSED_WORK_ORDER_STATUSES))
+    query += lambda s: s.group_by(WorkOrder.priority)
+
+    result = await w.db.execute(query)
+    return {"data": {row[0].value: row[1] for row in result}}
+
+
+async def _widget_wo_by_type(w: _WidgetQuery) -> dict:
+    """Work orders created in the period, counted by work type."""
+    org_id, period_start, period_end = w.org_id, w.period_start, w.period_end
+    query = lambda_stmt(
+        lambda: select(WorkOrder.work_type, func.count())
+        .where(WorkOrder.organization_id == org_id)
+        .where(WorkOrder.created_at >= period_start, WorkOrder.created_at < period_end)
+    )
+    for criteria in w.work_order_criteria():
+        query += criteria
+    query += lambda s: s.group_by(WorkOrder.work_type)
+
+    result = await w.db.execute(query)
+    return {"data": {row[0].value: row[1] for row in result}}
+
+
+async def _widget_wo_created_trend(w: _WidgetQuery) -> dict:
+    """Work orders created per day."""
+    query = select(func.date(WorkOrder.created_at).label("day"), func.count())\
+        .where(WorkOrder.organization_id == w.org_id)\
+        .where(w.date_filter(WorkOrder.created_at))
+    if w.priority:
+        try:
+            query = query.where(WorkOrder.priority == WorkOrderPriority(w.priority))
+        except ValueError:
+            pass
+    if w.work_type:
+        try:
+            query = query.where(WorkOrder.work_type == WorkOrderType(w.work_type))
+        except ValueError:
+            pass
+    if w.assigned_to:
+        query = query.where(WorkOrder.assigned_to_id == w.assigned_to)
+    result = await w.db.execute(
+        query
+        .group_by(func.date(WorkOrder.created_at))
+        .order_by(func.date(WorkOrder.created_at))
+    )
+    return {"data": [{"date": row[0], "count": row[1]} for row in result]}
+
+
+async def _widget_wo_completed_trend(w: _WidgetQuery) -> dict:
+    """Work orders completed per day."""
+    query = select(func.date(WorkOrder.actual_end).label("day"), func.count())\
+        .where(WorkOrder.organization_id == w.org_id)\
+        .where(WorkOrder.status == WorkOrderStatus.COMPLETED)\
+        .where(WorkOrder.actual_end.isnot(None))\
+        .where(w.date_filter(WorkOrder.actual_end))
+    if w.priority:
+        try:
+            query = query.where(WorkOrder.priority == WorkOrderPriority(w.priority))
+        except ValueError:
+            pass
+    if w.work_type:
+        try:
+            query = query.where(WorkOrder.work_type == WorkOrderType(w.work_type))
+        except ValueError:
+            pass
+    if w.assigned_to:
+        query = query.where(WorkOrder.assigned_to_id == w.assigned_to)
+    result = await w.db.execute(
+        query
+        .group_by(func.date(WorkOrder.actual_end))
+        .order_by(func.date(WorkOrder.actual_end))
+    )
+    return {"data": [{"date": row[0], "count": row[1]} for row in result]}
+
+
+async def _widget_open_wo_by_user(w: _WidgetQuery) -> dict:
+    """Open work orders per assignee."""
+    result = await w.db.execute(
+        select(User.id, User.full_name, func.count().label("count"))
+        .join(WorkOrder, WorkOrder.assigned_to_id == User.id)
+        .where(WorkOrder.organization_id == w.org_id)
+        .where(WorkOrder.status.in_(BACKLOG_WORK_ORDER_STATUSES))
+        .group_by(User.id, User.first_name, User.last_name)
+        .order_by(desc("count"))
+        .limit(w.limit)
+    )
+    return {"data": [
+        {"user_id": user_id, "name": name, "count": count}
+        for user_id, name, count in result
+    ]}
+
+
+async def _widget_completed_wo_by_user(w: _WidgetQuery) -> dict:
+    """Work orders completed in the period per assignee."""
+    result = await w.db.execute(
+        select(User.id, User.full_name, func.count().label("count"))
+        .join(WorkOrder, WorkOrder.assigned_to_id == User.id)
+        .where(WorkOrder.organization_id == w.org_id)
+        .where(WorkOrder.status == WorkOrderStatus.COMPLETED)
+        .where(w.date_filter(WorkOrder.actual_end))
+        .group_by(User.id, User.first_name, User.last_name)
+        .order_by(desc("count"))
+        .limit(w.limit)
+    )
+    return {"data": [
+        {"user_id": user_id, "name": name, "count": count}
+        for user_id, name, count in result
+    ]}
+
+
+async def _widget_labor_cost_by_user(w: _WidgetQuery) -> dict:
+    """Labor cost and hours per user."""
+    query = select(User.id, User.full_name,
+               func.sum(LaborTransaction.total_cost), func.sum(LaborTransaction.hours))\
+        .join(LaborTransaction, LaborTransaction.user_id == User.id)\
+        .where(LaborTransaction.organization_id == w.org_id)\
+        .where(w.date_filter(LaborTransaction.created_at))\
+        .group_by(User.id, User.first_name, User.last_name)\
+        .order_by(desc(func.sum(LaborTransaction.total_cost)))\
+        .limit(w.limit)
+
+    # Apply labor filters
+    if w.craft:
+        query = query.where(LaborTransaction.craft == w.craft)
+    if w.labor_type:
+        query = query.where(LaborTransaction.labor_type == w.labor_type)
+
+    result = await w.db.execute(query)
+    return {"data": [
+        {"user_id": user_id, "name": name,
+         "total_cost": float(total_cost or 0), "total_hours": float(total_hours or 0)}
+        for user_id, name, total_cost, total_hours in result
+    ]}
+
+
+async def _widget_material_cost_by_part(w: _WidgetQuery) -> dict:
+    """Material cost and quantity per part."""
+    query = select(Part.id, Part.part_number, Part.name,
+               func.sum(MaterialTransaction.total_cost), func.sum(MaterialTransaction.quantity))\
+        .join(MaterialTransaction, MaterialTransaction.part_id == Part.id)\
+        .where(MaterialTransaction.organization_id == w.org_id)\
+        .where(w.date_filter(MaterialTransaction.created_at))\
+        .group_by(Part.id, Part.part_number, Part.name)\
+        .order_by(desc(func.sum(MaterialTransaction.total_cost)))\
+        .limit(w.limit)
+
+    # Apply storeroom filter
+    if w.storeroom:
+        query = query.where(MaterialTransaction.storeroom_id == w.storeroom)
+
+    result = await w.db.execute(query)
+    return {"data": [{"part_id": row[0], "part_number": row[1], "name": row[2],
+                     "total_cost": float(row[3] or 0), "total_qty": float(row[4] or 0)} for row in result]}
+
+
+async def _widget_most_used_parts(w: _WidgetQuery) -> dict:
+    """Parts with the most issued quantity."""
+    query = select(Part.id, Part.part_number, Part.name, func.sum(MaterialTransaction.quantity))\
+        .join(MaterialTransaction, MaterialTransaction.part_id == Part.id)\
+        .where(MaterialTransaction.organization_id == w.org_id)\
+        .where(MaterialTransaction.transaction_type == "ISSUE")\
+        .where(w.date_filter(MaterialTransaction.created_at))\
+        .group_by(Part.id, Part.part_number, Part.name)\
+        .order_by(desc(func.sum(MaterialTransaction.quantity)))\
+        .limit(w.limit)
+
+    # Apply storeroom filter
+    if w.storeroom:
+        query = query.where(MaterialTransaction.storeroom_id == w.storeroom)
+
+    result = await w.db.execute(query)
+    return {"data": [{"part_id": row[0], "part_number": row[1], "name": row[2], "quantity": float(row[3] or 0)} for row in result]}
+
+
+async def _widget_least_used_parts(w: _WidgetQuery) -> dict:
+    """Active parts with the least issued quantity, including unused ones."""
+    issued = [
+        MaterialTransaction.part_id == Part.id,
+        MaterialTransaction.transaction_type == "ISSUE",
+        w.date_filter(MaterialTransaction.created_at),
+    ]
+    if w.storeroom:
+        issued.append(MaterialTransaction.storeroom_id == w.storeroom)
+    query = select(Part.id, Part.part_number, Part.name, func.coalesce(func.sum(MaterialTransaction.quantity), 0))\
+        .outerjoin(MaterialTransaction, and_(*issued))\
+        .where(Part.organization_id == w.org_id)\
+        .where(Part.status == "ACTIVE")\
+        .group_by(Part.id, Part.part_number, Part.name)\
+        .order_by(func.coalesce(func.sum(MaterialTransaction.quantity), 0))\
+        .limit(w.limit)
+
+    result = await w.db.execute(query)
+    return {"data": [{"part_id": row[0], "part_number": row[1], "name": row[2], "quantity": float(row[3] or 0)} for row in result]}
+
+
+async def _widget_assets_by_status(w: _WidgetQuery) -> dict:
+    """Active assets counted by status."""
+    result = await w.db.execute(
+        select(Asset.status, func.count())
+        .where(Asset.organization_id == w.org_id)
+        .where(Asset.is_active == True)
+        .group_by(Asset.status)
+    )
+    return {"data": {row[0].value: row[1] for row in result}}
+
+
+async def _widget_assets_by_criticality(w: _WidgetQuery) -> dict:
+    """Active assets counted by criticality."""
+    result = await w.db.execute(
+        select(Asset.criticality, func.count())
+        .where(Asset.organization_id == w.org_id)
+        .where(Asset.is_active == True)
+        .group_by(Asset.criticality)
+    )
+    return {"data": {row[0].value: row[1] for row in result}}
+
+
+async def _widget_assets_most_wo(w: _WidgetQuery) -> dict:
+    """Assets with the most work orders created in the period."""
+    result = await w.db.execute(
+        w.apply_asset_filters(
+            select(Asset.id, Asset.asset_num, Asset.name, func.count().label("count"))
+            .join(WorkOrder, WorkOrder.asset_id == Asset.id)
+            .where(Asset.organization_id == w.org_id)
+            .where(w.date_filter(WorkOrder.created_at))
         )
-        return {"data": [{"date": row[0].isoformat(), "cost": float(row[1] or 0)} for row in result]}
+        .group_by(Asset.id, Asset.asset_num, Asset.name)
+        .order_by(desc("count"))
+        .limit(w.limit)
+    )
+    return {"data": [{"asset_id": row[0], "asset_num": row[1], "name": row[2], "wo_count": row[3]} for row in result]}
 
-    elif widget == "cost_trend_material":
-        result = await db.execute(
-            select(func.date(MaterialTransaction.created_at), func.sum(MaterialTransaction.total_cost))
-            .where(MaterialTransaction.organization_id == org_id)
-            .where(date_filter(MaterialTransaction.created_at))
-            .group_by(func.date(MaterialTransaction.created_at))
-            .order_by(func.date(MaterialTransaction.created_at))
+
+async def _widget_assets_highest_cost(w: _WidgetQuery) -> dict:
+    """Assets with the highest work order cost."""
+    result = await w.db.execute(
+        w.apply_asset_filters(
+            select(Asset.id, Asset.asset_num, Asset.name, func.sum(WorkOrder.total_cost))
+            .join(WorkOrder, WorkOrder.asset_id == Asset.id)
+            .where(Asset.organization_id == w.org_id)
+            .where(w.date_filter(WorkOrder.created_at))
         )
-        return {"data": [{"date": row[0].isoformat(), "cost": float(row[1] or 0)} for row in result]}
+        .group_by(Asset.id, Asset.asset_num, Asset.name)
+        .order_by(desc(func.sum(WorkOrder.total_cost)))
+        .limit(w.limit)
+    )
+    return {"data": [{"asset_id": row[0], "asset_num": row[1], "name": row[2], "total_cost": float(row[3] or 0)} for row in result]}
 
-    elif widget == "pm_compliance_rate":
-        pm_query = select(WorkOrder)\
-            .where(WorkOrder.organization_id == org_id)\
-            .where(date_filter(WorkOrder.created_at))
-        # Default to preventive, but allow override if a different type is explicitly chosen
-        if work_type:
-            try:
-                pm_query = pm_query.where(WorkOrder.work_type == WorkOrderType(work_type))
-            except ValueError:
-                pm_query = pm_query.where(WorkOrder.work_type == WorkOrderType.PREVENTIVE)
-        else:
+
+async def _widget_cost_trend_labor(w: _WidgetQuery) -> dict:
+    """Labor cost per day."""
+    result = await w.db.execute(
+        select(func.date(LaborTransaction.created_at), func.sum(LaborTransaction.total_cost))
+        .where(LaborTransaction.organization_id == w.org_id)
+        .where(w.date_filter(LaborTransaction.created_at))
+        .group_by(func.date(LaborTransaction.created_at))
+        .order_by(func.date(LaborTransaction.created_at))
+    )
+    return {"data": [{"date": row[0], "cost": float(row[1] or 0)} for row in result]}
+
+
+async def _widget_cost_trend_material(w: _WidgetQuery) -> dict:
+    """Material cost per day."""
+    result = await w.db.execute(
+        select(func.date(MaterialTransaction.created_at), func.sum(MaterialTransaction.total_cost))
+        .where(MaterialTransaction.organization_id == w.org_id)
+        .where(w.date_filter(MaterialTransaction.created_at))
+        .group_by(func.date(MaterialTransaction.created_at))
+        .order_by(func.date(MaterialTransaction.created_at))
+    )
+    return {"data": [{"date": row[0], "cost": float(row[1] or 0)} for row in result]}
+
+
+async def _widget_pm_compliance_rate(w: _WidgetQuery) -> dict:
+    """Share of PM work orders completed by their due date."""
+    # Only completed work orders with both dates can be on time
+    on_time = and_(
+        WorkOrder.status == WorkOrderStatus.COMPLETED,
+        WorkOrder.due_date.isnot(None),
+        WorkOrder.actual_end.isnot(None),
+        func.date(WorkOrder.actual_end) <= WorkOrder.due_date,
+    )
+    pm_query = select(
+        func.count().label("total"),
+        func.sum(case((on_time, 1), else_=0)).label("on_time"),
+    ).where(WorkOrder.organization_id == w.org_id)\
+        .where(w.date_filter(WorkOrder.created_at))
+    # Default to preventive, but allow override if a different type is explicitly chosen
+    if w.work_type:
+        try:
+            pm_query = pm_query.where(WorkOrder.work_type == WorkOrderType(w.work_type))
+        except ValueError:
             pm_query = pm_query.where(WorkOrder.work_type == WorkOrderType.PREVENTIVE)
-        pm_query = apply_work_order_filters(pm_query)
-
-        pm_wos = await db.execute(pm_query)
-        wos = pm_wos.scalars().all()
-        total = len(wos)
-        on_time = sum(1 for wo in wos if wo.status == WorkOrderStatus.COMPLETED and
-                     wo.due_date and wo.actual_end and wo.actual_end.date() <= wo.due_date)
-        rate = (on_time / total * 100) if total > 0 else 0
-        return {"data": {"total": total, "on_time": on_time, "compliance_rate": round(rate, 1)}}
-
-    elif widget == "overdue_wo_count":
-        open_statuses = [WorkOrderStatus.DRAFT, WorkOrderStatus.WAITING_APPROVAL, WorkOrderStatus.APPROVED,
-                        WorkOrderStatus.SCHEDULED, WorkOrderStatus.IN_PROGRESS, WorkOrderStatus.ON_HOLD]
-        count_query = apply_work_order_filters(
-            select(func.count())
-            .select_from(WorkOrder)
-            .where(WorkOrder.organization_id == org_id)
-            .where(WorkOrder.status.in_(open_statuses))
-            .where(WorkOrder.due_date < date.today())
-        )
-        count = await db.scalar(count_query)
-        return {"data": {"count": count}}
-
-    elif widget == "avg_completion_time":
-        result = await db.scalar(
-            apply_work_order_filters(
-                select(func.avg(
-                    func.extract("epoch", WorkOrder.actual_end) - func.extract("epoch", WorkOrder.actual_start)
-                ) / 3600)
-                .where(WorkOrder.organization_id == org_id)
-                .where(WorkOrder.status == WorkOrderStatus.COMPLETED)
-                .where(WorkOrder.actual_start.isnot(None))
-                .where(WorkOrder.actual_end.isnot(None))
-                .where(date_filter(WorkOrder.actual_end))
-            )
-        )
-        return {"data": {"avg_hours": round(float(result or 0), 2)}}
+    else:
+        pm_query = pm_query.where(WorkOrder.work_type == WorkOrderType.PREVENTIVE)
+    pm_query = w.apply_work_order_filters(pm_query)
 
-    elif widget == "wo_by_location":
-        from app.models.location import Location
-        result = await db.execute(
-            apply_work_order_filters(
-                select(Location.id, Location.name, func.count(WorkOrder.id))
-                .join(WorkOrder, WorkOrder.location_id == Location.id)
-                .where(WorkOrder.organization_id == org_id)
-                .where(date_filter(WorkOrder.created_at))
-            )
-            .group_by(Location.id, Location.name)
-            .order_by(desc(func.count(WorkOrder.id)))
-            .limit(limit)
-        )
-        return {"data": [{"location_id": row[0], "name": row[1], "wo_count": row[2]} for row in result]}
+    compliance = (await w.db.execute(pm_query)).one()
+    total = compliance.total
+    on_time_count = compliance.on_time or 0
+    rate = (on_time_count / total * 100) if total > 0 else 0
+    return {"data": {"total": total, "on_time": on_time_count, "compliance_rate": round(rate, 1)}}
 
-    elif widget == "labor_hours_by_craft":
-        result = await db.execute(
-            select(LaborTransaction.craft, func.sum(LaborTransaction.hours))
-            .where(LaborTransaction.organization_id == org_id)
-            .where(LaborTransaction.craft.isnot(None))
-            .where(date_filter(LaborTransaction.created_at))
-            .group_by(LaborTransaction.craft)
-            .order_by(desc(func.sum(LaborTransaction.hours)))
-        )
-        return {"data": {row[0]: float(row[1] or 0) for row in result}}
 
-    elif widget == "labor_type_breakdown":
-        result = await db.execute(
-            select(LaborTransaction.labor_type, func.sum(LaborTransaction.hours), func.sum(LaborTransaction.total_cost))
-            .where(LaborTransaction.organization_id == org_id)
-            .where(date_filter(LaborTransaction.created_at))
-            .group_by(LaborTransaction.labor_type)
+async def _widget_overdue_wo_count(w: _WidgetQuery) -> dict:
+    """Number of open work orders past their due date."""
+    count_query = w.apply_work_order_filters(
+        select(func.count())
+        .select_from(WorkOrder)
+        .where(WorkOrder.organization_id == w.org_id)
+        .where(WorkOrder.status.in_(OPEN_WORK_ORDER_STATUSES))
+        .where(WorkOrder.due_date < date.today())
+    )
+    count = await w.db.scalar(count_query)
+    return {"data": {"count": count}}
+
+
+async def _widget_avg_completion_time(w: _WidgetQuery) -> dict:
+    """Average hours from actual start to actual end of completed work orders."""
+    result = await w.db.scalar(
+        w.apply_work_order_filters(
+            select(func.avg(
+                func.extract("epoch", WorkOrder.actual_end) - func.extract("epoch", WorkOrder.actual_start)
+            ) / 3600)
+            .where(WorkOrder.organization_id == w.org_id)
+            .where(WorkOrder.status == WorkOrderStatus.COMPLETED)
+            .where(WorkOrder.actual_start.isnot(None))
+            .where(WorkOrder.actual_end.isnot(None))
+            .where(w.date_filter(WorkOrder.actual_end))
         )
-        return {"data": [{"type": row[0], "hours": float(row[1] or 0), "cost": float(row[2] or 0)} for row in result]}
+    )
+    return {"data": {"avg_hours": round(float(result or 0), 2)}}
 
-    elif widget == "inventory_value_by_storeroom":
-        from app.models.inventory import Storeroom
-        result = await db.execute(
-            select(Storeroom.id, Storeroom.code, Storeroom.name,
-                   func.sum(StockLevel.current_balance * Part.average_cost))
-            .join(StockLevel, StockLevel.storeroom_id == Storeroom.id)
-            .join(Part, Part.id == StockLevel.part_id)
-            .where(Storeroom.organization_id == org_id)
-            .group_by(Storeroom.id, Storeroom.code, Storeroom.name)
-        )
-        return {"data": [{"storeroom_id": row[0], "code": row[1], "name": row[2], "value": float(row[3] or 0)} for row in result]}
 
-    elif widget == "low_stock_items":
-        result = await db.execute(
-            select(Part)
-            .options(selectinload(Part.stock_levels))
-            .where(Part.organization_id == org_id)
-            .where(Part.status == "ACTIVE")
+async def _widget_wo_by_location(w: _WidgetQuery) -> dict:
+    """Work orders created in the period per location."""
+    result = await w.db.execute(
+        w.apply_work_order_filters(
+            select(Location.id, Location.name, func.count().label("count"))
+            .join(WorkOrder, WorkOrder.location_id == Location.id)
+            .where(WorkOrder.organization_id == w.org_id)
+            .where(w.date_filter(WorkOrder.created_at))
         )
-        parts = result.scalars().all()
-        low_stock = []
-        for part in parts:
-            for stock in part.stock_levels:
-                if stock.needs_reorder():
-                    low_stock.append({
-                        "part_id": part.id,
-                        "part_number": part.part_number,
-                        "name": part.name,
-                        "current": stock.current_balance,
-                        "reorder_point": stock.reorder_point,
-                    })
-                    break
-        return {"data": low_stock[:limit]}
+        .group_by(Location.id, Location.name)
+        .order_by(desc("count"))
+        .limit(w.limit)
+    )
+    return {"data": [{"location_id": row[0], "name": row[1], "wo_count": row[2]} for row in result]}
+
+
+async def _widget_labor_hours_by_craft(w: _WidgetQuery) -> dict:
+    """Labor hours per craft."""
+    result = await w.db.execute(
+        select(LaborTransaction.craft, func.sum(LaborTransaction.hours))
+        .where(LaborTransaction.organization_id == w.org_id)
+        .where(LaborTransaction.craft.isnot(None))
+        .where(w.date_filter(LaborTransaction.created_at))
+        .group_by(LaborTransaction.craft)
+        .order_by(desc(func.sum(LaborTransaction.hours)))
+    )
+    return {"data": {row[0]: float(row[1] or 0) for row in result}}
 
-    elif widget == "upcoming_pms":
-        week_ahead = date.today() + timedelta(days=14)
-        result = await db.execute(
-            select(PreventiveMaintenance)
-            .where(PreventiveMaintenance.organization_id == org_id)
-            .where(PreventiveMaintenance.is_active == True)
-            .where(PreventiveMaintenance.next_due_date.isnot(None))
-            .where(PreventiveMaintenance.next_due_date <= week_ahead)
-            .order_by(PreventiveMaintenance.next_due_date)
-            .limit(limit)
-        )
-        return {"data": [{"pm_id": pm.id, "pm_number": pm.pm_number, "name": pm.name,
-                         "next_due": pm.next_due_date.isoformat() if pm.next_due_date else None}
-                        for pm in result.scalars()]}
 
-    elif widget == "cost_summary":
-        labor = await db.scalar(
-            select(func.sum(LaborTransaction.total_cost))
-            .where(LaborTransaction.organization_id == org_id)
-            .where(date_filter(LaborTransaction.created_at))
-        ) or 0
-        material = await db.scalar(
-            select(func.sum(MaterialTransaction.total_cost))
-            .where(MaterialTransaction.organization_id == org_id)
-            .where(date_filter(MaterialTransaction.created_at))
-        ) or 0
-        return {"data": {"labor": float(labor), "material": float(material), "total": float(labor + material)}}
+async def _widget_labor_type_breakdown(w: _WidgetQuery) -> dict:
+    """Labor hours and cost per labor type."""
+    result = await w.db.execute(
+        select(LaborTransaction.labor_type, func.sum(LaborTransaction.hours), func.sum(LaborTransaction.total_cost))
+        .where(LaborTransaction.organization_id == w.org_id)
+        .where(w.date_filter(LaborTransaction.created_at))
+        .group_by(LaborTransaction.labor_type)
+    )
+    return {"data": [{"type": row[0], "hours": float(row[1] or 0), "cost": float(row[2] or 0)} for row in result]}
+
+
+async def _widget_inventory_value_by_storeroom(w: _WidgetQuery) -> dict:
+    """Stock value per storeroom at average cost."""
+    result = await w.db.execute(
+        select(Storeroom.id, Storeroom.code, Storeroom.name,
+               func.sum(StockLevel.current_balance * Part.average_cost))
+        .join(StockLevel, StockLevel.storeroom_id == Storeroom.id)
+        .join(Part, Part.id == StockLevel.part_id)
+        .where(Storeroom.organization_id == w.org_id)
+        .group_by(Storeroom.id, Storeroom.code, Storeroom.name)
+    )
+    return {"data": [{"storeroom_id": row[0], "code": row[1], "name": row[2], "value": float(row[3] or 0)} for row in result]}
 
-    elif widget == "wo_backlog_age":
-        open_statuses = [WorkOrderStatus.APPROVED, WorkOrderStatus.SCHEDULED, WorkOrderStatus.IN_PROGRESS, WorkOrderStatus.ON_HOLD]
-        result = await db.execute(
-            apply_work_order_filters(
-                select(WorkOrder.id, WorkOrder.wo_number, WorkOrder.title, WorkOrder.created_at, WorkOrder.priority)
-                .where(WorkOrder.organization_id == org_id)
-                .where(WorkOrder.status.in_(open_statuses))
-                .where(date_filter(WorkOrder.created_at))
-            )
-            .order_by(WorkOrder.created_at)
-            .limit(limit)
-        )
-        data = []
-        for row in result:
-            age_days = (date.today() - row[3].date()).days
-            data.append({"wo_id": row[0], "wo_number": row[1], "title": row[2], "age_days": age_days, "priority": row[4].value})
-        return {"data": data}
-
-    elif widget == "reactive_vs_preventive":
-        reactive_query = apply_work_order_filters(
-            select(func.count())
-            .select_from(WorkOrder)
-            .where(WorkOrder.organization_id == org_id)
-            .where(WorkOrder.work_type.in_([WorkOrderType.CORRECTIVE, WorkOrderType.EMERGENCY]))
-            .where(date_filter(WorkOrder.created_at))
-        )
-        preventive_query = apply_work_order_filters(
-            select(func.count())
-            .select_from(WorkOrder)
-            .where(WorkOrder.organization_id == org_id)
-            .where(WorkOrder.work_type == WorkOrderType.PREVENTIVE)
-            .where(date_filter(WorkOrder.created_at))
-        )
-        reactive_count = await db.scalar(reactive_query) or 0
-        preventive_count = await db.scalar(preventive_query) or 0
-        total = reactive_count + preventive_count
-        return {"data": {"reactive": reactive_count, "preventive": preventive_count,
-                        "reactive_pct": round(reactive_count / total * 100, 1) if total > 0 else 0,
-                        "preventive_pct": round(preventive_count / total * 100, 1) if total > 0 else 0}}
-
-    elif widget == "user_workload":
-        open_statuses = [WorkOrderStatus.IN_PROGRESS, WorkOrderStatus.APPROVED, WorkOrderStatus.SCHEDULED]
-        result = await db.execute(
-            select(User.id, User.first_name, User.last_name,
-                   func.count(WorkOrder.id),
-                   func.sum(WorkOrder.estimated_hours))
-            .join(WorkOrder, WorkOrder.assigned_to_id == User.id)
-            .where(WorkOrder.organization_id == org_id)
-            .where(WorkOrder.status.in_(open_statuses))
-            .group_by(User.id, User.first_name, User.last_name)
-            .order_by(desc(func.count(WorkOrder.id)))
-        )
-        return {"data": [{"user_id": row[0], "name": f"{row[1]} {row[2]}",
-                         "wo_count": row[3], "est_hours": float(row[4] or 0)} for row in result]}
 
-    elif widget == "recent_completions":
-        result = await db.execute(
-            select(WorkOrder)
-            .where(WorkOrder.organization_id == org_id)
-            .where(WorkOrder.status == WorkOrderStatus.COMPLETED)
-            .order_by(desc(WorkOrder.actual_end))
-            .limit(limit)
-        )
-        return {"data": [{"wo_id": wo.id, "wo_number": wo.wo_number, "title": wo.title,
-                         "completed_at": wo.actual_end.isoformat() if wo.actual_end else None,
-                         "total_cost": float(wo.total_cost)} for wo in result.scalars()]}
+async def _widget_low_stock_items(w: _WidgetQuery) -> dict:
+    """Active parts below their reorder point."""
+    # One row per part: its first stock level below reorder point
+    low_stock = (
+        select(
+            Part.id,
+            Part.part_number,
+            Part.name,
+            StockLevel.current_balance,
+            StockLevel.reorder_point,
+            func.row_number().over(partition_by=StockLevel.part_id, order_by=StockLevel.id).label("rank"),
+        )
+        .join(StockLevel, StockLevel.part_id == Part.id)
+        .where(Part.organization_id == w.org_id)
+        .where(Part.status == "ACTIVE")
+        .where(StockLevel.needs_reorder())
+        .subquery()
+    )
+    result = await w.db.execute(
+        select(low_stock).where(low_stock.c.rank == 1).order_by(low_stock.c.id).limit(w.limit)
+    )
+    return {"data": [{"part_id": row.id, "part_number": row.part_number, "name": row.name,
+                      "current": row.current_balance, "reorder_point": row.reorder_point}
+                     for row in result]}
 
-    elif widget == "downtime_by_asset":
-        query = apply_work_order_filters(
-            select(Asset.id, Asset.asset_num, Asset.name, func.sum(WorkOrder.downtime_hours))
-            .join(WorkOrder, WorkOrder.asset_id == Asset.id)
-            .where(Asset.organization_id == org_id)
-            .where(WorkOrder.downtime_hours.isnot(None))
-            .where(date_filter(WorkOrder.created_at))
+
+async def _widget_upcoming_pms(w: _WidgetQuery) -> dict:
+    """Active PMs due in the next two weeks."""
+    week_ahead = date.today() + timedelta(days=14)
+    result = await w.db.execute(
+        select(
+            PreventiveMaintenance.id,
+            PreventiveMaintenance.pm_number,
+            PreventiveMaintenance.name,
+            PreventiveMaintenance.next_due_date,
         )
-        if asset_status:
-            from app.models.asset import AssetStatus
-            try:
-                query = query.where(Asset.status == AssetStatus(asset_status))
-            except ValueError:
-                pass
-        if criticality:
-            from app.models.asset import AssetCriticality
-            try:
-                query = query.where(Asset.criticality == AssetCriticality(criticality))
-            except ValueError:
-                pass
-        result = await db.execute(
-            query
-            .group_by(Asset.id, Asset.asset_num, Asset.name)
-            .order_by(desc(func.sum(WorkOrder.downtime_hours)))
-            .limit(limit)
+        .where(PreventiveMaintenance.organization_id == w.org_id)
+        .where(PreventiveMaintenance.is_active == True)
+        .where(PreventiveMaintenance.next_due_date.isnot(None))
+        .where(PreventiveMaintenance.next_due_date <= week_ahead)
+        .order_by(PreventiveMaintenance.next_due_date)
+        .limit(w.limit)
+    )
+    return {"data": [{"pm_id": pm.id, "pm_number": pm.pm_number, "name": pm.name,
+                     "next_due": pm.next_due_date}
+                    for pm in result]}
+
+
+async def _widget_cost_summary(w: _WidgetQuery) -> dict:
+    """Labor, material and total cost for the period."""
+    labor_rows, material_rows = await _read_concurrently(
+        select(func.sum(LaborTransaction.total_cost))
+        .where(LaborTransaction.organization_id == w.org_id)
+        .where(w.date_filter(LaborTransaction.created_at)),
+        select(func.sum(MaterialTransaction.total_cost))
+        .where(MaterialTransaction.organization_id == w.org_id)
+        .where(w.date_filter(MaterialTransaction.created_at)),
+    )
+    labor = labor_rows[0][0] or 0
+    material = material_rows[0][0] or 0
+    return {"data": {"labor": float(labor), "material": float(material), "total": float(labor + material)}}
+
+
+async def _widget_wo_backlog_age(w: _WidgetQuery) -> dict:
+    """Oldest open work orders and their age in days."""
+    result = await w.db.execute(
+        w.apply_work_order_filters(
+            select(WorkOrder.id, WorkOrder.wo_number, WorkOrder.title, WorkOrder.created_at, WorkOrder.priority)
+            .where(WorkOrder.organization_id == w.org_id)
+            .where(WorkOrder.status.in_(BACKLOG_WORK_ORDER_STATUSES))
+            .where(w.date_filter(WorkOrder.created_at))
         )
-        return {"data": [{"asset_id": row[0], "asset_num": row[1], "name": row[2],
-                         "downtime_hours": float(row[3] or 0)} for row in result]}
+        .order_by(WorkOrder.created_at)
+        .limit(w.limit)
+    )
+    today = date.today()
+    return {"data": [
+        {"wo_id": wo_id, "wo_number": wo_number, "title": title,
+         "age_days": (today - created_at.date()).days, "priority": priority.value}
+        for wo_id, wo_number, title, created_at, priority in result
+    ]}
+
+
+async def _widget_reactive_vs_preventive(w: _WidgetQuery) -> dict:
+    """Reactive (corrective and emergency) against preventive work order counts."""
+    reactive_types = [WorkOrderType.CORRECTIVE, WorkOrderType.EMERGENCY]
+    counts = (await w.db.execute(
+        w.apply_work_order_filters(
+            select(
+                func.sum(case((WorkOrder.work_type.in_(reactive_types), 1), else_=0)).label("reactive"),
+                func.sum(case((WorkOrder.work_type == WorkOrderType.PREVENTIVE, 1), else_=0)).label("preventive"),
+            )
+            .where(WorkOrder.organization_id == w.org_id)
+            .where(WorkOrder.work_type.in_([*reactive_types, WorkOrderType.PREVENTIVE]))
+            .where(w.date_filter(WorkOrder.created_at))
+        )
+    )).one()
+    reactive_count = counts.reactive or 0
+    preventive_count = counts.preventive or 0
+    total = reactive_count + preventive_count
+    return {"data": {"reactive": reactive_count, "preventive": preventive_count,
+                    "reactive_pct": round(reactive_count / total * 100, 1) if total > 0 else 0,
+                    "preventive_pct": round(preventive_count / total * 100, 1) if total > 0 else 0}}
+
+
+async def _widget_user_workload(w: _WidgetQuery) -> dict:
+    """Open work orders and estimated hours per assignee."""
+    result = await w.db.execute(
+        select(User.id, User.full_name,
+               func.count().label("count"),
+               func.sum(WorkOrder.estimated_hours))
+        .join(WorkOrder, WorkOrder.assigned_to_id == User.id)
+        .where(WorkOrder.organization_id == w.org_id)
+        .where(WorkOrder.status.in_(WORKLOAD_WORK_ORDER_STATUSES))
+        .group_by(User.id, User.first_name, User.last_name)
+        .order_by(desc("count"))
+    )
+    return {"data": [
+        {"user_id": user_id, "name": name,
+         "wo_count": wo_count, "est_hours": float(est_hours or 0)}
+        for user_id, name, wo_count, est_hours in result
+    ]}
+
+
+async def _widget_recent_completions(w: _WidgetQuery) -> dict:
+    """Most recently completed work orders."""
+    result = await w.db.execute(
+        select(WorkOrder.id, WorkOrder.wo_number, WorkOrder.title, WorkOrder.actual_end, WorkOrder.total_cost)
+        .where(WorkOrder.organization_id == w.org_id)
+        .where(WorkOrder.status == WorkOrderStatus.COMPLETED)
+        .order_by(desc(WorkOrder.actual_end))
+        .limit(w.limit)
+    )
+    return {"data": [{"wo_id": wo.id, "wo_number": wo.wo_number, "title": wo.title,
+                     "completed_at": wo.actual_end.isoformat() if wo.actual_end else None,
+                     "total_cost": float(wo.total_cost)} for wo in result]}
 
-    elif widget == "failure_codes":
-        result = await db.execute(
-            select(WorkOrder.failure_code, func.count(WorkOrder.id))
-            .where(WorkOrder.organization_id == org_id)
-            .where(WorkOrder.failure_code.isnot(None))
-            .where(date_filter(WorkOrder.created_at))
-            .group_by(WorkOrder.failure_code)
-            .order_by(desc(func.count(WorkOrder.id)))
-            .limit(limit)
+
+async def _widget_downtime_by_asset(w: _WidgetQuery) -> dict:
+    """Downtime hours per asset."""
+    query = w.apply_asset_filters(w.apply_work_order_filters(
+        select(Asset.id, Asset.asset_num, Asset.name, func.sum(WorkOrder.downtime_hours))
+        .join(WorkOrder, WorkOrder.asset_id == Asset.id)
+        .where(Asset.organization_id == w.org_id)
+        .where(WorkOrder.downtime_hours.isnot(None))
+        .where(w.date_filter(WorkOrder.created_at))
+    ))
+    result = await w.db.execute(
+        query
+        .group_by(Asset.id, Asset.asset_num, Asset.name)
+        .order_by(desc(func.sum(WorkOrder.downtime_hours)))
+        .limit(w.limit)
+    )
+    return {"data": [{"asset_id": row[0], "asset_num": row[1], "name": row[2],
+                     "downtime_hours": float(row[3] or 0)} for row in result]}
+
+
+async def _widget_failure_codes(w: _WidgetQuery) -> dict:
+    """Most frequent failure codes."""
+    result = await w.db.execute(
+        select(WorkOrder.failure_code, func.count().label("count"))
+        .where(WorkOrder.organization_id == w.org_id)
+        .where(WorkOrder.failure_code.isnot(None))
+        .where(w.date_filter(WorkOrder.created_at))
+        .group_by(WorkOrder.failure_code)
+        .order_by(desc("count"))
+        .limit(w.limit)
+    )
+    return {"data": {row[0]: row[1] for row in result}}
+
+
+async def _widget_bad_actors(w: _WidgetQuery) -> dict:
+    """Assets with the highest work order cost."""
+    result = await w.db.execute(
+        w.apply_asset_filters(
+            select(Asset.id, Asset.asset_num, Asset.name, func.sum(WorkOrder.total_cost))
+            .join(WorkOrder, WorkOrder.asset_id == Asset.id)
+            .where(Asset.organization_id == w.org_id)
+            .where(w.date_filter(WorkOrder.created_at))
         )
-        return {"data": {row[0]: row[1] for row in result}}
-
-    elif widget == "bad_actors":
-        query = select(Asset.id, Asset.asset_num, Asset.name, func.sum(WorkOrder.total_cost))\
-            .join(WorkOrder, WorkOrder.asset_id == Asset.id)\
-            .where(Asset.organization_id == org_id)\
-            .where(date_filter(WorkOrder.created_at))\
-            .group_by(Asset.id, Asset.asset_num, Asset.name)\
-            .order_by(desc(func.sum(WorkOrder.total_cost)))\
-            .limit(limit)
-
-        if asset_status:
-            from app.models.asset import AssetStatus
-            try:
-                query = query.where(Asset.status == AssetStatus(asset_status))
-            except ValueError:
-                pass
-        if criticality:
-            from app.models.asset import AssetCriticality
-            try:
-                query = query.where(Asset.criticality == AssetCriticality(criticality))
-            except ValueError:
-                pass
+        .group_by(Asset.id, Asset.asset_num, Asset.name)
+        .order_by(desc(func.sum(WorkOrder.total_cost)))
+        .limit(w.limit)
+    )
+    return {"data": [{"asset_id": row[0], "asset_num": row[1], "name": row[2],
+                     "total_cost": float(row[3] or 0)} for row in result]}
 
-        result = await db.execute(query)
-        return {"data": [{"asset_id": row[0], "asset_num": row[1], "name": row[2],
-                         "total_cost": float(row[3] or 0)} for row in result]}
 
-    elif widget == "waiting_for_parts":
-        query = apply_work_order_filters(
-            select(WorkOrder.id, WorkOrder.wo_number, WorkOrder.title, WorkOrder.created_at, WorkOrder.priority)
-            .where(WorkOrder.organization_id == org_id)
-            .where(WorkOrder.status == WorkOrderStatus.ON_HOLD)
-            .where(date_filter(WorkOrder.created_at))
-        ).order_by(WorkOrder.created_at)
-
-        result = await db.execute(query.limit(limit))
-        data = []
-        for row in result:
-            created = row[3].date() if row[3] else date.today()
-            age_days = (date.today() - created).days
-            data.append({
-                "wo_id": row[0],
-                "wo_number": row[1],
-                "title": row[2],
-                "priority": row[4].value if hasattr(row[4], "value") else row[4],
-                "age_days": age_days,
-            })
-        return {"data": data}
-
-    elif widget == "overtime_hours":
-        lt_filter = labor_type or "OVERTIME"
-        query = select(User.id, User.first_name, User.last_name,
-                       func.sum(LaborTransaction.hours), func.sum(LaborTransaction.total_cost))\
-            .join(User, User.id == LaborTransaction.user_id)\
-            .where(LaborTransaction.organization_id == org_id)\
-            .where(LaborTransaction.labor_type == lt_filter)\
-            .where(date_filter(LaborTransaction.created_at))\
-            .group_by(User.id, User.first_name, User.last_name)\
-            .order_by(desc(func.sum(LaborTransaction.hours)))\
-            .limit(limit)
-        if craft:
-            query = query.where(LaborTransaction.craft == craft)
-        result = await db.execute(query)
-        return {"data": [{"user_id": row[0], "name": f"{row[1]} {row[2]}", "hours": float(row[3] or 0),
-                         "cost": float(row[4] or 0)} for row in result]}
+async def _widget_waiting_for_parts(w: _WidgetQuery) -> dict:
+    """Work orders on hold, oldest first."""
+    query = w.apply_work_order_filters(
+        select(WorkOrder.id, WorkOrder.wo_number, WorkOrder.title, WorkOrder.created_at, WorkOrder.priority)
+        .where(WorkOrder.organization_id == w.org_id)
+        .where(WorkOrder.status == WorkOrderStatus.ON_HOLD)
+        .where(w.date_filter(WorkOrder.created_at))
+    ).order_by(WorkOrder.created_at)
 
-    elif widget == "data_integrity_score":
-        result = await db.execute(
-            apply_work_order_filters(
-                select(WorkOrder)
-                .where(WorkOrder.organization_id == org_id)
-                .where(WorkOrder.status == WorkOrderStatus.COMPLETED)
-                .where(WorkOrder.actual_end.isnot(None))
-                .where(date_filter(WorkOrder.actual_end))
+    result = await w.db.execute(query.limit(w.limit))
+    today = date.today()
+    return {"data": [
+        {"wo_id": wo_id, "wo_number": wo_number, "title": title,
+         "priority": priority.value, "age_days": (today - created_at.date()).days}
+        for wo_id, wo_number, title, created_at, priority in result
+    ]}
+
+
+async def _widget_overtime_hours(w: _WidgetQuery) -> dict:
+    """Overtime hours and cost per user (or another labor type when given)."""
+    lt_filter = w.labor_type or "OVERTIME"
+    query = select(User.id, User.full_name,
+                   func.sum(LaborTransaction.hours), func.sum(LaborTransaction.total_cost))\
+        .join(User, User.id == LaborTransaction.user_id)\
+        .where(LaborTransaction.organization_id == w.org_id)\
+        .where(LaborTransaction.labor_type == lt_filter)\
+        .where(w.date_filter(LaborTransaction.created_at))\
+        .group_by(User.id, User.first_name, User.last_name)\
+        .order_by(desc(func.sum(LaborTransaction.hours)))\
+        .limit(w.limit)
+    if w.craft:
+        query = query.where(LaborTransaction.craft == w.craft)
+    result = await w.db.execute(query)
+    return {"data": [
+        {"user_id": user_id, "name": name,
+         "hours": float(hours or 0), "cost": float(cost or 0)}
+        for user_id, name, hours, cost in result
+    ]}
+
+
+async def _widget_data_integrity_score(w: _WidgetQuery) -> dict:
+    """Share of completed work orders with failure code, cause and remedy recorded."""
+    # Valid when failure code, cause and remedy are all filled in
+    recorded = and_(*(
+        and_(column.isnot(None), column != "")
+        for column in (WorkOrder.failure_code, WorkOrder.failure_cause, WorkOrder.failure_remedy)
+    ))
+    counts = (await w.db.execute(
+        w.apply_work_order_filters(
+            select(
+                func.count().label("total"),
+                func.sum(case((recorded, 1), else_=0)).label("valid"),
             )
-        )
-        work_orders = result.scalars().all()
-        total = len(work_orders)
-        valid = sum(1 for wo in work_orders if wo.failure_code and wo.failure_cause and wo.failure_remedy)
-        score = round((valid / total) * 100, 1) if total else 0
-        return {"data": {"score": score, "valid": valid, "total": total}}
-
-    elif widget == "mttr":
-        failures_query = apply_work_order_filters(
-            select(WorkOrder.actual_start, WorkOrder.actual_end)
-            .where(WorkOrder.organization_id == org_id)
+            .where(WorkOrder.organization_id == w.org_id)
             .where(WorkOrder.status == WorkOrderStatus.COMPLETED)
-            .where(WorkOrder.actual_start.isnot(None))
-            .where(WorkOrder.actual_end.isnot(None))
-            .where(date_filter(WorkOrder.actual_end))
-        )
-        # Default to reactive work only if no explicit type filter provided
-        if not work_type:
-            failures_query = failures_query.where(WorkOrder.work_type.in_([WorkOrderType.CORRECTIVE, WorkOrderType.EMERGENCY]))
-
-        rows = await db.execute(failures_query)
-        repair_times = []
-        for row in rows:
-            repair_time = (row[1] - row[0]).total_seconds() / 3600
-            if repair_time > 0:
-                repair_times.append(repair_time)
-        avg_hours = round(sum(repair_times) / len(repair_times), 2) if repair_times else 0
-        return {"data": {"avg_hours": avg_hours, "sample_size": len(repair_times)}}
-
-    elif widget == "mtbf":
-        failure_query = apply_work_order_filters(
-            select(WorkOrder.asset_id, WorkOrder.actual_start, WorkOrder.actual_end)
-            .where(WorkOrder.organization_id == org_id)
-            .where(WorkOrder.status == WorkOrderStatus.COMPLETED)
-            .where(WorkOrder.asset_id.isnot(None))
-            .where(WorkOrder.actual_start.isnot(None))
             .where(WorkOrder.actual_end.isnot(None))
-            .where(date_filter(WorkOrder.actual_end))
-        )
-        if not work_type:
-            failure_query = failure_query.where(WorkOrder.work_type.in_([WorkOrderType.CORRECTIVE, WorkOrderType.EMERGENCY]))
-
-        rows = await db.execute(failure_query.order_by(WorkOrder.asset_id, WorkOrder.actual_start))
-        failures_by_asset = {}
-        for asset_id, start_time, end_time in rows:
-            failures_by_asset.setdefault(asset_id, []).append((start_time, end_time))
-
-        intervals = []
-        for events in failures_by_asset.values():
-            if len(events) < 2:
-                continue
-            events.sort(key=lambda x: x[0])
-            for i in range(1, len(events)):
-                delta = (events[i][0] - events[i - 1][1]).total_seconds() / 3600
-                if delta > 0:
-                    intervals.append(delta)
-        avg_mtbf = round(sum(intervals) / len(intervals), 2) if intervals else 0
-        return {"data": {"avg_hours": avg_mtbf, "sample_size": len(intervals)}}
-
-    else:
-        return {"error": f"Unknown widget type: {widget}"}
+            .where(w.date_filter(WorkOrder.actual_end))
+        )
+    )).one()
+    total = counts.total
+    valid = counts.valid or 0
+    score = round((valid / total) * 100, 1) if total else 0
+    return {"data": {"score": score, "valid": valid, "total": total}}
+
+
+async def _widget_mttr(w: _WidgetQuery) -> dict:
+    """Mean time to repair across completed failure work orders."""
+    repair_hours = (
+        func.extract("epoch", WorkOrder.actual_end) - func.extract("epoch", WorkOrder.actual_start)
+    ) / 3600.0
+    failures_query = w.apply_work_order_filters(
+        select(func.avg(repair_hours).label("avg_hours"), func.count().label("sample_size"))
+        .where(WorkOrder.organization_id == w.org_id)
+        .where(WorkOrder.status == WorkOrderStatus.COMPLETED)
+        .where(WorkOrder.actual_start.isnot(None))
+        .where(WorkOrder.actual_end.isnot(None))
+        .where(WorkOrder.actual_end > WorkOrder.actual_start)
+        .where(w.date_filter(WorkOrder.actual_end))
+    )
+    # Default to reactive work only if no explicit type filter provided
+    if not w.work_type:
+        failures_query = failures_query.where(WorkOrder.work_type.in_([WorkOrderType.CORRECTIVE, WorkOrderType.EMERGENCY]))
+
+    repairs = (await w.db.execute(failures_query)).one()
+    avg_hours = round(float(repairs.avg_hours), 2) if repairs.sample_size else 0
+    return {"data": {"avg_hours": avg_hours, "sample_size": repairs.sample_size}}
+
+
+async def _widget_mtbf(w: _WidgetQuery) -> dict:
+    """Mean time between failures across assets."""
+    # Hours from the end of each asset's previous failure to the start of the next
+    gap_hours = (
+        (func.extract("epoch", WorkOrder.actual_start) - func.lag(func.extract("epoch", WorkOrder.actual_end)).over(
+            partition_by=WorkOrder.asset_id,
+            order_by=(WorkOrder.actual_start, WorkOrder.id),
+        )) / 3600.0
+    ).label("gap_hours")
+    failure_query = w.apply_work_order_filters(
+        select(gap_hours)
+        .where(WorkOrder.organization_id == w.org_id)
+        .where(WorkOrder.status == WorkOrderStatus.COMPLETED)
+        .where(WorkOrder.asset_id.isnot(None))
+        .where(WorkOrder.actual_start.isnot(None))
+        .where(WorkOrder.actual_end.isnot(None))
+        .where(w.date_filter(WorkOrder.actual_end))
+    )
+    if not w.work_type:
+        failure_query = failure_query.where(WorkOrder.work_type.in_([WorkOrderType.CORRECTIVE, WorkOrderType.EMERGENCY]))
+
+    failures = failure_query.subquery()
+    intervals = (await w.db.execute(
+        select(func.avg(failures.c.gap_hours).label("avg_hours"), func.count().label("sample_size"))
+        .where(failures.c.gap_hours > 0)
+    )).one()
+    avg_mtbf = round(float(intervals.avg_hours), 2) if intervals.sample_size else 0
+    return {"data": {"avg_hours": avg_mtbf, "sample_size": intervals.sample_size}}
+
+
+_WIDGETS: Dict[str, Callable[[_WidgetQuery], Awaitable[dict]]] = {
+    "wo_by_status": _widget_wo_by_status,
+    "wo_by_priority": _widget_wo_by_priority,
+    "wo_by_type": _widget_wo_by_type,
+    "wo_created_trend": _widget_wo_created_trend,
+    "wo_completed_trend": _widget_wo_completed_trend,
+    "open_wo_by_user": _widget_open_wo_by_user,
+    "completed_wo_by_user": _widget_completed_wo_by_user,
+    "labor_cost_by_user": _widget_labor_cost_by_user,
+    "material_cost_by_part": _widget_material_cost_by_part,
+    "most_used_parts": _widget_most_used_parts,
+    "least_used_parts": _widget_least_used_parts,
+    "assets_by_status": _widget_assets_by_status,
+    "assets_by_criticality": _widget_assets_by_criticality,
+    "assets_most_wo": _widget_assets_most_wo,
+    "assets_highest_cost": _widget_assets_highest_cost,
+    "cost_trend_labor": _widget_cost_trend_labor,
+    "cost_trend_material": _widget_cost_trend_material,
+    "pm_compliance_rate": _widget_pm_compliance_rate,
+    "overdue_wo_count": _widget_overdue_wo_count,
+    "avg_completion_time": _widget_avg_completion_time,
+    "wo_by_location": _widget_wo_by_location,
+    "labor_hours_by_craft": _widget_labor_hours_by_craft,
+    "labor_type_breakdown": _widget_labor_type_breakdown,
+    "inventory_value_by_storeroom": _widget_inventory_value_by_storeroom,
+    "low_stock_items": _widget_low_stock_items,
+    "upcoming_pms": _widget_upcoming_pms,
+    "cost_summary": _widget_cost_summary,
+    "wo_backlog_age": _widget_wo_backlog_age,
+    "reactive_vs_preventive": _widget_reactive_vs_preventive,
+    "user_workload": _widget_user_workload,
+    "recent_completions": _widget_recent_completions,
+    "downtime_by_asset": _widget_downtime_by_asset,
+    "failure_codes": _widget_failure_codes,
+    "bad_actors": _widget_bad_actors,
+    "waiting_for_parts": _widget_waiting_for_parts,
+    "overtime_hours": _widget_overtime_hours,
+    "data_integrity_score": _widget_data_integrity_score,
+    "mttr": _widget_mttr,
+    "mtbf": _widget_mtbf,
+}
 
 
 # ============================================================================
@@ -1628,10 +1832,8 @@ async def generate_report(
     subtitle = f"Period: {start_date.strftime('%b %d, %Y')} - {end_date.strftime('%b %d, %Y')}"
 
     # Helper function for date filtering
-    def date_filter(column, use_date_func=True):
-        if use_date_func:
-            return and_(func.date(column) >= start_date, func.date(column) <= end_date)
-        return and_(column >= start_date, column <= end_date)
+    def date_filter(column):
+        return _within_days(column, start_date, end_date)
 
     # Helper function to apply common work order filters
     def apply_wo_filters(query):
@@ -1662,14 +1864,12 @@ async def generate_report(
     if report_type == 'wo_summary':
         # Work Order Summary Report
         # Use scheduled_start for date filtering (falls back to created_at if null)
-        wo_date_filter = and_(
-            func.coalesce(func.date(WorkOrder.scheduled_start), func.date(WorkOrder.created_at)) >= start_date,
-            func.coalesce(func.date(WorkOrder.scheduled_start), func.date(WorkOrder.created_at)) <= end_date
-        )
+        wo_date_filter = _within_days(func.coalesce(WorkOrder.scheduled_start, WorkOrder.created_at), start_date, end_date)
 
         # Base query with filters
         base_query = (
             select(WorkOrder)
+            .options(raiseload("*"))
             .where(WorkOrder.organization_id == org_id)
             .where(wo_date_filter)
         )
@@ -1677,30 +1877,30 @@ async def generate_report(
 
         # Get counts by status
         status_query = apply_wo_filters(
-            select(WorkOrder.status, func.count(WorkOrder.id))
+            select(WorkOrder.status, func.count())
             .where(WorkOrder.organization_id == org_id)
             .where(wo_date_filter)
         ).group_by(WorkOrder.status)
         status_result = await db.execute(status_query)
-        by_status = {getattr(row[0], 'value', str(row[0])): row[1] for row in status_result}
+        by_status = {row[0].value: row[1] for row in status_result}
 
         # Get counts by type
         type_query = apply_wo_filters(
-            select(WorkOrder.work_type, func.count(WorkOrder.id))
+            select(WorkOrder.work_type, func.count())
             .where(WorkOrder.organization_id == org_id)
             .where(wo_date_filter)
         ).group_by(WorkOrder.work_type)
         type_result = await db.execute(type_query)
-        by_type = {getattr(row[0], 'value', str(row[0])): row[1] for row in type_result}
+        by_type = {row[0].value: row[1] for row in type_result}
 
         # Get counts by priority
         priority_query = apply_wo_filters(
-            select(WorkOrder.priority, func.count(WorkOrder.id))
+            select(WorkOrder.priority, func.count())
             .where(WorkOrder.organization_id == org_id)
             .where(wo_date_filter)
         ).group_by(WorkOrder.priority)
         priority_result = await db.execute(priority_query)
-        by_priority = {getattr(row[0], 'value', str(row[0])): row[1] for row in priority_result}
+        by_priority = {row[0].value: row[1] for row in priority_result}
 
         # Get totals
         total_created = sum(by_status.values())
@@ -1766,12 +1966,10 @@ async def generate_report(
     elif report_type == 'wo_completion':
         # Work Order Completion Report
         # Use actual_end or scheduled_start for date filtering
-        completion_date_filter = and_(
-            func.coalesce(func.date(WorkOrder.actual_end), func.date(WorkOrder.scheduled_start)) >= start_date,
-            func.coalesce(func.date(WorkOrder.actual_end), func.date(WorkOrder.scheduled_start)) <= end_date
-        )
+        completion_date_filter = _within_days(func.coalesce(WorkOrder.actual_end, WorkOrder.scheduled_start), start_date, end_date)
         query = (
             select(WorkOrder)
+            .options(raiseload("*"))
             .where(WorkOrder.organization_id == org_id)
             .where(WorkOrder.status.in_([WorkOrderStatus.COMPLETED, WorkOrderStatus.CLOSED]))
             .where(completion_date_filter)
@@ -1855,16 +2053,11 @@ async def generate_report(
 
     elif report_type == 'wo_backlog':
         # Work Order Backlog Report
-        open_statuses = [
-            WorkOrderStatus.DRAFT, WorkOrderStatus.WAITING_APPROVAL,
-            WorkOrderStatus.APPROVED, WorkOrderStatus.SCHEDULED,
-            WorkOrderStatus.IN_PROGRESS, WorkOrderStatus.ON_HOLD
-        ]
-
         query = (
             select(WorkOrder)
+            .options(raiseload("*"))
             .where(WorkOrder.organization_id == org_id)
-            .where(WorkOrder.status.in_(open_statuses))
+            .where(WorkOrder.status.in_(OPEN_WORK_ORDER_STATUSES))
             .order_by(WorkOrder.created_at)
         )
         # Apply all relevant filters
@@ -1963,12 +2156,10 @@ async def generate_report(
     elif report_type == 'wo_cost_analysis':
         # Work Order Cost Analysis
         # Use scheduled_start for date filtering (falls back to created_at if null)
-        cost_date_filter = and_(
-            func.coalesce(func.date(WorkOrder.scheduled_start), func.date(WorkOrder.created_at)) >= start_date,
-            func.coalesce(func.date(WorkOrder.scheduled_start), func.date(WorkOrder.created_at)) <= end_date
-        )
+        cost_date_filter = _within_days(func.coalesce(WorkOrder.scheduled_start, WorkOrder.created_at), start_date, end_date)
         query = (
             select(WorkOrder)
+            .options(raiseload("*"))
             .where(WorkOrder.organization_id == org_id)
             .where(cost_date_filter)
             .where(WorkOrder.total_cost > 0)
@@ -2100,23 +2291,23 @@ async def generate_report(
     elif report_type == 'asset_summary':
         # Asset Summary Report
         by_status_result = await db.execute(
-            select(Asset.status, func.count(Asset.id))
+            select(Asset.status, func.count())
             .where(Asset.organization_id == org_id)
             .where(Asset.is_active == True)
             .group_by(Asset.status)
         )
-        by_status = {getattr(row[0], 'value', str(row[0])): row[1] for row in by_status_result}
+        by_status = {row[0].value: row[1] for row in by_status_result}
 
         by_crit_result = await db.execute(
-            select(Asset.criticality, func.count(Asset.id))
+            select(Asset.criticality, func.count())
             .where(Asset.organization_id == org_id)
             .where(Asset.is_active == True)
             .group_by(Asset.criticality)
         )
-        by_criticality = {getattr(row[0], 'value', str(row[0])): row[1] for row in by_crit_result}
+        by_criticality = {row[0].value: row[1] for row in by_crit_result}
 
         by_cat_result = await db.execute(
-            select(Asset.category, func.count(Asset.id))
+            select(Asset.category, func.count())
             .where(Asset.organization_id == org_id)
             .where(Asset.is_active == True)
             .where(Asset.category.isnot(None))
@@ -2150,7 +2341,12 @@ async def generate_report(
     elif report_type == 'asset_reliability':
         # Asset Reliability Report (MTBF/MTTR)
         # Reuse the mtbf-mttr logic
-        asset_query = select(Asset).where(Asset.organization_id == org_id).where(Asset.is_active == True)
+        asset_query = (
+            select(Asset)
+            .options(raiseload("*"))
+            .where(Asset.organization_id == org_id)
+            .where(Asset.is_active == True)
+        )
         if criticality:
             try:
                 asset_query = asset_query.where(Asset.criticality == AssetCriticality(criticality))
@@ -2167,8 +2363,20 @@ async def generate_report(
             summary_metrics = [{'label': 'No assets found', 'value': '-'}]
             sections = []
         else:
-            failure_query = (
-                select(WorkOrder.asset_id, WorkOrder.actual_start, WorkOrder.actual_end)
+            # Per-failure repair time and gap since the asset's previous repair ended
+            start_epoch = func.extract("epoch", WorkOrder.actual_start)
+            end_epoch = func.extract("epoch", WorkOrder.actual_end)
+            failures = (
+                select(
+                    WorkOrder.asset_id,
+                    ((end_epoch - start_epoch) / 3600.0).label("repair_hours"),
+                    (
+                        (start_epoch - func.lag(end_epoch).over(
+                            partition_by=WorkOrder.asset_id,
+                            order_by=(WorkOrder.actual_start, WorkOrder.id),
+                        )) / 3600.0
+                    ).label("gap_hours"),
+                )
                 .where(WorkOrder.organization_id == org_id)
                 .where(WorkOrder.asset_id.in_(asset_ids))
                 .where(WorkOrder.work_type.in_([WorkOrderType.CORRECTIVE, WorkOrderType.EMERGENCY]))
@@ -2176,68 +2384,50 @@ async def generate_report(
                 .where(WorkOrder.actual_start.isnot(None))
                 .where(WorkOrder.actual_end.isnot(None))
                 .where(date_filter(WorkOrder.actual_end))
-                .order_by(WorkOrder.asset_id, WorkOrder.actual_start)
+                .subquery()
+            )
+            repaired = failures.c.repair_hours > 0
+            spaced = failures.c.gap_hours > 0
+            result = await db.execute(
+                select(
+                    failures.c.asset_id,
+                    func.count().label("failure_count"),
+                    func.sum(case((repaired, failures.c.repair_hours))).label("repair_total"),
+                    func.count(case((repaired, 1))).label("repair_count"),
+                    func.sum(case((spaced, failures.c.gap_hours))).label("gap_total"),
+                    func.count(case((spaced, 1))).label("gap_count"),
+                )
+                .group_by(failures.c.asset_id)
+                .order_by(failures.c.asset_id)
             )
-
-            result = await db.execute(failure_query)
             rows_data = result.all()
 
-            grouped_events = defaultdict(list)
-            for aid, start_ts, end_ts in rows_data:
-                if aid:
-                    grouped_events[aid].append((start_ts, end_ts))
-
             asset_metrics = []
-            all_repair_times = []
-            all_intervals = []
-
-            for aid, events in grouped_events.items():
-                asset = asset_lookup.get(aid)
-                if not asset:
-                    continue
-
-                events.sort(key=lambda e: e[0])
-                failure_count = len(events)
-
-                repair_times = []
-                time_between = []
-                prev_end = None
-
-                for start_ts, end_ts in events:
-                    if start_ts and end_ts:
-                        repair_time = (end_ts - start_ts).total_seconds() / 3600
-                        if repair_time > 0:
-                            repair_times.append(repair_time)
-                            all_repair_times.append(repair_time)
-
-                    if prev_end and start_ts:
-                        delta = (start_ts - prev_end).total_seconds() / 3600
-                        if delta > 0:
-                            time_between.append(delta)
-                            all_intervals.append(delta)
-                    if end_ts:
-                        prev_end = end_ts
-
-                mtbf = sum(time_between) / len(time_between) if time_between else None
-                mttr = sum(repair_times) / len(repair_times) if repair_times else None
+            for row in rows_data:
+                asset = asset_lookup[row.asset_id]
+                mtbf = float(row.gap_total) / row.gap_count if row.gap_count else None
+                mttr = float(row.repair_total) / row.repair_count if row.repair_count else None
                 availability = round((mtbf / (mtbf + mttr)) * 100, 2) if mtbf and mttr and (mtbf + mttr) > 0 else 0
 
                 asset_metrics.append({
                     'asset_num': asset.asset_num,
                     'asset_name': asset.name,
                     'criticality': asset.criticality.value if asset.criticality else '-',
-                    'failures': failure_count,
+                    'failures': row.failure_count,
                     'mtbf_hours': round(mtbf, 1) if mtbf else '-',
                     'mttr_hours': round(mttr, 1) if mttr else '-',
                     'availability': f'{availability}%',
                 })
 
-            overall_mttr = round(sum(all_repair_times) / len(all_repair_times), 1) if all_repair_times else 0
-            overall_mtbf = round(sum(all_intervals) / len(all_intervals), 1) if all_intervals else 0
+            total_failures = sum(row.failure_count for row in rows_data)
+            repair_count = sum(row.repair_count for row in rows_data)
+            gap_count = sum(row.gap_count for row in rows_data)
+            overall_mttr = round(float(sum(row.repair_total or 0 for row in rows_data)) / repair_count, 1) if repair_count else 0
+            overall_mtbf = round(float(sum(row.gap_total or 0 for row in rows_data)) / gap_count, 1) if gap_count else 0
 
             summary_metrics = [
                 {'label': 'Assets Analyzed', 'value': len(asset_metrics)},
-                {'label': 'Total Failures', 'value': len(rows_data)},
+                {'label': 'Total Failures', 'value': total_failures},
                 {'label': 'Avg MTBF (hrs)', 'value': overall_mtbf},
                 {'label': 'Avg MTTR (hrs)', 'value': overall_mttr},
             ]
@@ -2255,7 +2445,7 @@ async def generate_report(
                 'report': report_info,
                 'period': {'start': start_date.isoformat(), 'end': end_date.isoformat()},
                 'overall': {
-                    'total_failures': len(rows_data) if asset_ids else 0,
+                    'total_failures': total_failures if asset_ids else 0,
                     'average_mtbf_hours': overall_mtbf if asset_ids else 0,
                     'average_mttr_hours': overall_mttr if asset_ids else 0,
                 },
@@ -2319,7 +2509,7 @@ async def generate_report(
         query = (
             select(
                 Asset.id, Asset.asset_num, Asset.name, Asset.criticality,
-                func.count(WorkOrder.id),
+                func.count(),
                 func.sum(WorkOrder.total_cost)
             )
             .join(WorkOrder, WorkOrder.asset_id == Asset.id)
@@ -2369,6 +2559,7 @@ async def generate_report(
         # PM Compliance Report
         pm_query = (
             select(WorkOrder)
+            .options(raiseload("*"))
             .where(WorkOrder.organization_id == org_id)
             .where(WorkOrder.work_type == WorkOrderType.PREVENTIVE)
             .where(date_filter(WorkOrder.created_at))
@@ -2434,7 +2625,7 @@ async def generate_report(
         # PM Schedule Report
         upcoming_query = (
             select(PreventiveMaintenance)
-            .options(selectinload(PreventiveMaintenance.asset))
+            .options(selectinload(PreventiveMaintenance.asset), raiseload("*"))
             .where(PreventiveMaintenance.organization_id == org_id)
             .where(PreventiveMaintenance.is_active == True)
             .where(PreventiveMaintenance.next_due_date.isnot(None))
@@ -2687,7 +2878,7 @@ async def generate_report(
         # Inventory Value Report
         result = await db.execute(
             select(Part)
-            .options(selectinload(Part.stock_levels))
+            .options(selectinload(Part.stock_levels), raiseload("*"))
             .where(Part.organization_id == org_id)
             .where(Part.status == 'ACTIVE')
         )
@@ -2800,7 +2991,7 @@ async def generate_report(
         # Reorder Report
         result = await db.execute(
             select(Part)
-            .options(selectinload(Part.stock_levels))
+            .options(selectinload(Part.stock_levels), raiseload("*"))
             .where(Part.organization_id == org_id)
             .where(Part.status == 'ACTIVE')
         )
@@ -33,24 +33,30 @@ async def list_user_groups(
     """
     List user groups in the organization with search and pagination.
     """
-    query = select(UserGroup).where(UserGroup.organization_id == current_user.organization_id)
+    criteria = [UserGroup.organization_id == current_user.organization_id]
 
     if not include_inactive:
-        query = query.where(UserGroup.is_active == True)
+        criteria.append(UserGroup.is_active == True)
 
     if search:
         search_filter = f"%{search}%"
-        query = query.where(
+        criteria.append(
             (UserGroup.name.ilike(search_filter))
             | (UserGroup.description.ilike(search_filter))
         )
 
-    # Count total
-    count_query = select(func.count()).select_from(query.subquery())
+    # Count total over the same criteria, without wrapping the query in a subquery
+    count_query = select(func.count()).select_from(UserGroup).where(*criteria)
     total = await db.scalar(count_query)
 
     # Get paginated results
-    query = query.order_by(UserGroup.name).offset(pagination.offset).limit(pagination.page_size)
+    query = (
+        select(UserGroup)
+        .where(*criteria)
+        .order_by(UserGroup.name)
+        .offset(pagination.offset)
+        .limit(pagination.page_size)
+    )
     result = await db.execute(query)
     groups = result.scalars().all()
 
@@ -84,7 +90,7 @@ async def list_user_groups(
         total=total,
         page=pagination.page,
         page_size=pagination.page_size,
-        pages=(total + pagination.page_size - 1) // pagination.page_size if total else 0,
+        pages=pagination.page_count(total),
     )
 
 
@@ -37,25 +37,25 @@ async def list_users(
     """
     List users in the organization.
     """
-    query = select(User).where(User.organization_id == current_user.organization_id)
+    criteria = [User.organization_id == current_user.organization_id]
 
     if is_active is not None:
-        query = query.where(User.is_active == is_active)
+        criteria.append(User.is_active == is_active)
 
     if search:
         search_filter = f"%{search}%"
-        query = query.where(
+        criteria.append(
             (User.email.ilike(search_filter))
             | (User.first_name.ilike(search_filter))
             | (User.last_name.ilike(search_filter))
         )
 
-    # Count total
-    count_query = select(func.count()).select_from(query.subquery())
+    # Count total over the same criteria, without wrapping the query in a subquery
+    count_query = select(func.count()).select_from(User).where(*criteria)
     total = await db.scalar(count_query)
 
     # Get paginated results
-    query = query.offset(pagination.offset).limit(pagination.page_size)
+    query = select(User).where(*criteria).offset(pagination.offset).limit(pagination.page_size)
     result = await db.execute(query)
     users = result.scalars().all()
 
@@ -64,7 +64,7 @@ async def list_users(
         total=total,
         page=pagination.page,
         page_size=pagination.page_size,
-        pages=(total + pagination.page_size - 1) // pagination.page_size,
+        pages=pagination.page_count(total),
     )
 
 
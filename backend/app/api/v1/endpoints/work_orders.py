@@ -146,13 +146,7 @@ STATUS_TRANSITIONS = {
 
 async def generate_wo_number(db, org_id: int) -> str:
     """Generate next work order number."""
-    result = await db.execute(
-        select(func.count())
-        .select_from(WorkOrder)
-        .where(WorkOrder.organization_id == org_id)
-    )
-    count = result.scalar() + 1
-    return f"WO-{count:06d}"
+    return await WorkOrderService(db).generate_wo_number(org_id)
 
 
 @router.get("", response_model=PaginatedResponse[WorkOrderResponse])
@@ -365,7 +359,7 @@ async def list_work_orders(
         total=total,
         page=pagination.page,
         page_size=pagination.page_size,
-        pages=(total + pagination.page_size - 1) // pagination.page_size,
+        pages=pagination.page_count(total),
     )
 
 
@@ -1,7 +1,9 @@
 """
 API v1 router aggregating all endpoints.
 """
-from fastapi import APIRouter
+from fastapi import APIRouter, Depends
+
+from app.api.deps import invalidate_reports_cache
 
 from app.api.v1.endpoints import (
     auth,
@@ -19,14 +21,17 @@ from app.api.v1.endpoints import (
 
 api_router = APIRouter()
 
+# Writes to these resources change dashboard and notification figures
+reports_writes = [Depends(invalidate_reports_cache)]
+
 api_router.include_router(auth.router, prefix="/auth", tags=["Authentication"])
 api_router.include_router(users.router, prefix="/users", tags=["Users"])
 api_router.include_router(organizations.router, prefix="/organizations", tags=["Organizations"])
 api_router.include_router(locations.router, prefix="/locations", tags=["Locations"])
-api_router.include_router(assets.router, prefix="/assets", tags=["Assets"])
-api_router.include_router(work_orders.router, prefix="/work-orders", tags=["Work Orders"])
-api_router.include_router(preventive_maintenance.router, prefix="/pm", tags=["Preventive Maintenance"])
-api_router.include_router(inventory.router, prefix="/inventory", tags=["Inventory"])
+api_router.include_router(assets.router, prefix="/assets", tags=["Assets"], dependencies=reports_writes)
+api_router.include_router(work_orders.router, prefix="/work-orders", tags=["Work Orders"], dependencies=reports_writes)
+api_router.include_router(preventive_maintenance.router, prefix="/pm", tags=["Preventive Maintenance"], dependencies=reports_writes)
+api_router.include_router(inventory.router, prefix="/inventory", tags=["Inventory"], dependencies=reports_writes)
 api_router.include_router(reports.router, prefix="/reports", tags=["Reports"])
 api_router.include_router(audit_logs.router, prefix="/audit-logs", tags=["Audit Logs"])
 api_router.include_router(user_groups.router, prefix="/user-groups", tags=["User Groups"])
\ No newline at end of file
@@ -0,0 +1,142 @@
+"""
+Redis-backed response caching.
+
+Caching is best effort: when REDIS_URL is unset or Redis is unreachable every
+lookup is a miss and writes are dropped, so callers always fall back to the
+database.
+"""
+import asyncio
+import hashlib
+import logging
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from fastapi import Request, Response
+from pydantic_core import to_json
+from redis import asyncio as aioredis
+from redis.exceptions import RedisError
+
+from app.core.config import get_settings
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+_redis: Optional[aioredis.Redis] = None
+
+# Bodies being computed in this process, so concurrent misses share one load
+_inflight: Dict[str, "asyncio.Future[bytes]"] = {}
+
+
+def get_redis() -> Optional[aioredis.Redis]:
+    """Return the shared Redis client, or None when caching is disabled."""
+    global _redis
+    if _redis is None and settings.REDIS_URL:
+        _redis = aioredis.from_url(settings.REDIS_URL)
+    return _redis
+
+
+async def cache_get(key: str) -> Optional[bytes]:
+    """Get a cached value, treating Redis errors as a miss."""
+    client = get_redis()
+    if client is None:
+        return None
+    try:
+        return await client.get(key)
+    except (RedisError, OSError) as exc:
+        logger.warning("Cache get failed for %s: %s", key, exc)
+        return None
+
+
+async def cache_set(key: str, value: bytes, ttl: Optional[int] = None) -> None:
+    """Store a value with a TTL, ignoring Redis errors."""
+    client = get_redis()
+    if client is None:
+        return
+    try:
+        await client.set(key, value, ex=ttl or settings.CACHE_TTL_SECONDS)
+    except (RedisError, OSError) as exc:
+        logger.warning("Cache set failed for %s: %s", key, exc)
+
+
+async def cache_version(namespace: str, org_id: int) -> int:
+    """Current version of an organization's cached namespace (0 if never bumped)."""
+    value = await cache_get(f"{namespace}:{org_id}:version")
+    return int(value) if value is not None else 0
+
+
+async def bump_cache_version(namespace: str, org_id: int) -> None:
+    """
+    Invalidate an organization's cached namespace.
+    Entries are keyed by version, so readers holding the old version can't
+    repopulate the cache with stale data after a write.
+    """
+    client = get_redis()
+    if client is None:
+        return
+    try:
+        await client.incr(f"{namespace}:{org_id}:version")
+    except (RedisError, OSError) as exc:
+        logger.warning("Cache invalidation failed for %s:%s: %s", namespace, org_id, exc)
+
+
+async def cached_json_response(
+    namespace: str,
+    org_id: int,
+    name: str,
+    loader: Callable[[], Awaitable[Any]],
+    ttl: int,
+) -> Response:
+    """
+    Serve a JSON body from the organization's versioned cache, computing and
+    encoding it for `ttl` seconds on a miss. Hits return the stored bytes as
+    is, with no decode and re-encode. Concurrent misses for the same key in
+    this process wait on the first one's load instead of running their own.
+    """
+    version = await cache_version(namespace, org_id)
+    key = f"{namespace}:{org_id}:{version}:{name}"
+    body = await cache_get(key)
+    if body is None:
+        load = _inflight.get(key)
+        if load is None:
+            load = asyncio.ensure_future(_load_and_store(key, loader, ttl))
+            _inflight[key] = load
+            load.add_done_callback(lambda _: _inflight.pop(key, None))
+        # A cancelled caller must not cancel the load the others are waiting on
+        body = await asyncio.shield(load)
+    return Response(content=body, media_type="application/json")
+
+
+async def _load_and_store(key: str, loader: Callable[[], Awaitable[Any]], ttl: int) -> bytes:
+    """Compute and encode a body, caching it under `key`."""
+    body = to_json(await loader())
+    await cache_set(key, body, ttl)
+    return body
+
+
+def make_etag(body: bytes) -> str:
+    """Strong ETag for a response body."""
+    return f'"{hashlib.md5(body).hexdigest()}"'
+
+
+async def etag_response(
+    request: Request,
+    namespace: str,
+    org_id: int,
+    loader: Callable[[], Awaitable[bytes]],
+    max_age: int = 30,
+) -> Response:
+    """
+    Serve a JSON body from the versioned cache (loading it on a miss) with an
+    ETag, answering 304 Not Modified when it matches If-None-Match.
+    """
+    version = await cache_version(namespace, org_id)
+    key = f"{namespace}:{org_id}:{version}"
+    body = await cache_get(key)
+    if body is None:
+        body = await loader()
+        await cache_set(key, body)
+
+    etag = make_etag(body)
+    headers = {"ETag": etag, "Cache-Control": f"private, max-age={max_age}"}
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
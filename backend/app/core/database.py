@@ -3,6 +3,7 @@ Database configuration and session management.
 """
 from typing import AsyncGenerator
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
+from sqlalchemy.pool import NullPool
 from sqlalchemy.orm import DeclarativeBase
 from sqlalchemy import MetaData, event
 
@@ -27,6 +28,32 @@ class Base(DeclarativeBase):
     metadata = metadata
 
 
+def _postgres_engine_options(pool_size: int, max_overflow: int) -> dict:
+    """Pool and driver options for a PostgreSQL engine."""
+    if settings.DATABASE_PGBOUNCER:
+        # pgbouncer transaction pooling owns the connection pool and may hand each
+        # transaction a different server connection, so prepared statements must
+        # not be cached across transactions
+        return {
+            "poolclass": NullPool,
+            "connect_args": {"statement_cache_size": 0, "prepared_statement_cache_size": 0},
+        }
+
+    # Pre-ping and recycle drop connections the server or a firewall has closed
+    # instead of failing the request that checks them out
+    return {
+        "pool_size": pool_size,
+        "max_overflow": max_overflow,
+        "pool_timeout": settings.DATABASE_POOL_TIMEOUT,
+        "pool_recycle": settings.DATABASE_POOL_RECYCLE,
+        "pool_pre_ping": True,
+        "connect_args": {
+            "statement_cache_size": settings.DATABASE_STATEMENT_CACHE_SIZE,
+            "prepared_statement_cache_size": settings.DATABASE_STATEMENT_CACHE_SIZE,
+        },
+    }
+
+
 # Determine if using SQLite (for development) or PostgreSQL (for production)
 is_sqlite = settings.DATABASE_URL.startswith("sqlite")
 
@@ -46,20 +73,36 @@ if is_sqlite:
         cursor.execute("PRAGMA foreign_keys=ON")
         cursor.close()
 else:
-    # PostgreSQL settings
     engine = create_async_engine(
         settings.DATABASE_URL,
         echo=settings.DEBUG,
-        pool_size=settings.DATABASE_POOL_SIZE,
-        max_overflow=settings.DATABASE_MAX_OVERFLOW,
+        **_postgres_engine_options(settings.DATABASE_POOL_SIZE, settings.DATABASE_MAX_OVERFLOW),
+    )
+
+# Read engine for read-only endpoints: a separate pool, optionally on a replica,
+# in autocommit mode so reads skip the BEGIN/COMMIT round trips
+if is_sqlite:
+    # A single SQLite file has no replica to read from
+    read_engine = engine
+else:
+    read_engine = create_async_engine(
+        settings.DATABASE_READ_URL or settings.DATABASE_URL,
+        echo=settings.DEBUG,
+        isolation_level="AUTOCOMMIT",
+        **_postgres_engine_options(settings.DATABASE_READ_POOL_SIZE, settings.DATABASE_READ_MAX_OVERFLOW),
     )
 
-# Session factory
+# Session factories
 async_session_maker = async_sessionmaker(
     engine,
     class_=AsyncSession,
     expire_on_commit=False,
 )
+read_session_maker = async_sessionmaker(
+    read_engine,
+    class_=AsyncSession,
+    expire_on_commit=False,
+)
 
 
 async def get_db() -> AsyncGenerator[AsyncSession, None]:
@@ -75,6 +118,12 @@ async def get_db() -> AsyncGenerator[AsyncSession, None]:
             await session.close()
 
 
+async def get_read_db() -> AsyncGenerator[AsyncSession, None]:
+    """Dependency for read-only database sessions on the read engine."""
+    async with read_session_maker() as session:
+        yield session
+
+
 async def init_db() -> None:
     """Initialize database tables."""
     # Import all model modules so that metadata is populated before create_all
@@ -89,6 +138,7 @@ async def init_db() -> None:
         audit_log,  # noqa: F401
         user_group,  # noqa: F401
         user_group_member,  # noqa: F401
+        number_counter,  # noqa: F401
     )
 
     async with engine.begin() as conn:
@@ -35,6 +35,7 @@ from app.models.inventory import (
     CycleCountPlan,
 )
 from app.models.scheduler_control import SchedulerControl
+from app.models.number_counter import NumberCounter
 from app.models.audit_log import AuditLog
 from app.models.user_group import UserGroup
 from app.models.user_group_member import UserGroupMember
@@ -76,6 +77,7 @@ __all__ = [
     "CycleCountLine",
     "CycleCountPlan",
     "SchedulerControl",
+    "NumberCounter",
     "AuditLog",
     "UserGroup",
     "UserGroupMember",
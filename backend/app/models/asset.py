@@ -3,7 +3,7 @@ Asset models including specifications, meters, and documents.
 """
 from datetime import datetime, date
 from typing import Optional, List, TYPE_CHECKING
-from sqlalchemy import String, Boolean, Text, Integer, ForeignKey, Float, Date, DateTime, Enum as SQLEnum, JSON
+from sqlalchemy import String, Boolean, Text, Integer, ForeignKey, Float, Date, DateTime, Enum as SQLEnum, JSON, Index
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 import enum
 
@@ -46,6 +46,12 @@ class Asset(Base, AuditMixin, TenantMixin):
     """
 
     __tablename__ = "assets"
+    __table_args__ = (
+        # Dashboard and asset summary counts by status
+        Index("ix_asset_org_active_status", "organization_id", "is_active", "status"),
+        # Top assets by work order count, read in index order
+        Index("ix_asset_org_work_order_count", "organization_id", "work_order_count"),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
     asset_num: Mapped[str] = mapped_column(String(50), nullable=False, index=True)
@@ -101,6 +107,9 @@ class Asset(Base, AuditMixin, TenantMixin):
     # FMEA Risk Priority Number
     rpn_score: Mapped[Optional[int]] = mapped_column(Integer, nullable=True, index=True)  # 1-1000 scale
 
+    # Work orders raised against this asset, maintained by triggers on work_orders
+    work_order_count: Mapped[int] = mapped_column(Integer, default=0, server_default="0", nullable=False)
+
     # Relationships
     organization: Mapped["Organization"] = relationship("Organization", back_populates="assets")
     location: Mapped[Optional["Location"]] = relationship("Location", back_populates="assets")
@@ -10,7 +10,14 @@ from app.core.database import Base
 
 
 class TimestampMixin:
-    """Mixin for created_at and updated_at timestamps."""
+    """
+    Mixin for created_at and updated_at timestamps.
+
+    Both are filled in by the database. Mappers whose writes return the row
+    without a refresh() set `__mapper_args__ = {"eager_defaults": True}` to
+    fetch them via RETURNING; it is set per mapper rather than here so other
+    models' writes don't pay for it.
+    """
 
     created_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True),
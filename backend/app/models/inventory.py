@@ -3,7 +3,11 @@ Inventory models including parts, storerooms, and purchase orders.
 """
 from datetime import datetime, date
 from typing import Optional, List, TYPE_CHECKING
-from sqlalchemy import String, Boolean, Text, Integer, ForeignKey, Float, Date, DateTime, Enum as SQLEnum, JSON
+from sqlalchemy import (
+    String, Boolean, Text, Integer, ForeignKey, Float, Date, DateTime, Enum as SQLEnum, JSON, Index,
+    Computed, DDL, event,
+)
+from sqlalchemy.ext.hybrid import hybrid_method
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 import enum
 
@@ -65,6 +69,7 @@ class PartCategory(Base, AuditMixin, TenantMixin):
     """
 
     __tablename__ = "part_categories"
+    __mapper_args__ = {"eager_defaults": True}
 
     id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
     name: Mapped[str] = mapped_column(String(100), nullable=False)
@@ -91,6 +96,11 @@ class Vendor(Base, AuditMixin, TenantMixin):
     """
 
     __tablename__ = "vendors"
+    __mapper_args__ = {"eager_defaults": True}
+    __table_args__ = (
+        # Keyset pagination: WHERE organization_id = ? AND code > ? ORDER BY code
+        Index("ix_vendors_organization_id_code", "organization_id", "code"),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
     code: Mapped[str] = mapped_column(String(50), nullable=False, unique=True, index=True)
@@ -136,6 +146,7 @@ class Part(Base, AuditMixin, TenantMixin):
     """
 
     __tablename__ = "parts"
+    __mapper_args__ = {"eager_defaults": True}
 
     id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
     part_number: Mapped[str] = mapped_column(String(100), nullable=False, unique=True, index=True)
@@ -202,6 +213,7 @@ class Storeroom(Base, AuditMixin, TenantMixin):
     """
 
     __tablename__ = "storerooms"
+    __mapper_args__ = {"eager_defaults": True}
 
     id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
     code: Mapped[str] = mapped_column(String(50), nullable=False, unique=True, index=True)
@@ -233,6 +245,11 @@ class StockLevel(Base, AuditMixin):
     """
 
     __tablename__ = "stock_levels"
+    __table_args__ = (
+        # Low-stock checks (needs_reorder) answered from the index per part
+        Index("ix_stock_level_part_reorder", "part_id", "available_quantity", "reorder_point"),
+    )
+    __mapper_args__ = {"eager_defaults": True}
 
     id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
     part_id: Mapped[int] = mapped_column(
@@ -273,12 +290,18 @@ class StockLevel(Base, AuditMixin):
         """Update available quantity."""
         self.available_quantity = self.current_balance - self.reserved_quantity
 
+    @hybrid_method
     def needs_reorder(self) -> bool:
         """Check if reorder is needed."""
         if self.reorder_point is None:
             return False
         return self.available_quantity <= self.reorder_point
 
+    @needs_reorder.expression
+    def needs_reorder(cls):
+        """SQL form of needs_reorder; a NULL reorder point never compares true."""
+        return cls.available_quantity <= cls.reorder_point
+
 
 class PartTransaction(Base, AuditMixin, TenantMixin):
     """
@@ -336,6 +359,11 @@ class PurchaseOrder(Base, AuditMixin, TenantMixin):
     """
 
     __tablename__ = "purchase_orders"
+    __mapper_args__ = {"eager_defaults": True}
+    __table_args__ = (
+        # Keyset pagination on id DESC; scanned backwards by the planner
+        Index("ix_purchase_orders_organization_id_id", "organization_id", "id"),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
     po_number: Mapped[str] = mapped_column(String(50), nullable=False, unique=True, index=True)
@@ -363,11 +391,13 @@ class PurchaseOrder(Base, AuditMixin, TenantMixin):
     shipping_method: Mapped[Optional[str]] = mapped_column(String(100), nullable=True)
     tracking_number: Mapped[Optional[str]] = mapped_column(String(255), nullable=True)
 
-    # Totals
+    # Totals; subtotal is kept in sync with the lines by database triggers
     subtotal: Mapped[float] = mapped_column(Float, default=0, nullable=False)
     tax: Mapped[float] = mapped_column(Float, default=0, nullable=False)
     shipping_cost: Mapped[float] = mapped_column(Float, default=0, nullable=False)
-    total: Mapped[float] = mapped_column(Float, default=0, nullable=False)
+    total: Mapped[float] = mapped_column(
+        Float, Computed("subtotal + tax + shipping_cost", persisted=True), nullable=False
+    )
 
     # Currency
     currency: Mapped[str] = mapped_column(String(3), default="USD", nullable=False)
@@ -393,11 +423,6 @@ class PurchaseOrder(Base, AuditMixin, TenantMixin):
     def __repr__(self) -> str:
         return f"<PurchaseOrder(po_number='{self.po_number}', status={self.status})>"
 
-    def calculate_totals(self) -> None:
-        """Recalculate PO totals from lines."""
-        self.subtotal = sum(line.total_cost for line in self.lines)
-        self.total = self.subtotal + self.tax + self.shipping_cost
-
 
 class PurchaseOrderLine(Base, AuditMixin):
     """
@@ -405,6 +430,7 @@ class PurchaseOrderLine(Base, AuditMixin):
     """
 
     __tablename__ = "purchase_order_lines"
+    __mapper_args__ = {"eager_defaults": True}
 
     id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
     purchase_order_id: Mapped[int] = mapped_column(
@@ -424,7 +450,9 @@ class PurchaseOrderLine(Base, AuditMixin):
 
     # Pricing
     unit_cost: Mapped[float] = mapped_column(Float, nullable=False)
-    total_cost: Mapped[float] = mapped_column(Float, nullable=False)
+    total_cost: Mapped[float] = mapped_column(
+        Float, Computed("quantity_ordered * unit_cost", persisted=True), nullable=False
+    )
 
     # Storeroom for this line (override PO default)
     storeroom_id: Mapped[Optional[int]] = mapped_column(
@@ -446,12 +474,67 @@ class PurchaseOrderLine(Base, AuditMixin):
         return f"<PurchaseOrderLine(po_id={self.purchase_order_id}, line={self.line_number})>"
 
 
+# Recompute purchase_orders.subtotal whenever a line is added, removed or repriced,
+# so totals stay correct however the lines are written. Mirrored by the
+# add_po_total_triggers migration for databases managed through Alembic.
+_PO_SUBTOTAL_SQL = (
+    "UPDATE purchase_orders SET subtotal = ("
+    "SELECT COALESCE(SUM(total_cost), 0) FROM purchase_order_lines "
+    "WHERE purchase_order_id = {row}.purchase_order_id"
+    ") WHERE id = {row}.purchase_order_id"
+)
+
+event.listen(
+    PurchaseOrderLine.__table__,
+    "after_create",
+    DDL(
+        "CREATE OR REPLACE FUNCTION recompute_po_subtotal() RETURNS trigger AS $$\n"
+        "BEGIN\n"
+        "    IF TG_OP <> 'INSERT' THEN\n"
+        f"        {_PO_SUBTOTAL_SQL.format(row='OLD')};\n"
+        "    END IF;\n"
+        "    IF TG_OP <> 'DELETE' THEN\n"
+        f"        {_PO_SUBTOTAL_SQL.format(row='NEW')};\n"
+        "    END IF;\n"
+        "    RETURN NULL;\n"
+        "END;\n"
+        "$$ LANGUAGE plpgsql"
+    ).execute_if(dialect="postgresql"),
+)
+event.listen(
+    PurchaseOrderLine.__table__,
+    "after_create",
+    DDL(
+        "CREATE TRIGGER trg_purchase_order_lines_subtotal "
+        "AFTER INSERT OR DELETE OR UPDATE OF quantity_ordered, unit_cost, purchase_order_id "
+        "ON purchase_order_lines FOR EACH ROW EXECUTE FUNCTION recompute_po_subtotal()"
+    ).execute_if(dialect="postgresql"),
+)
+# SQLite triggers fire for a single event and have no TG_OP, so one per event
+for _name, _event, _rows in [
+    ("insert", "INSERT", ("NEW",)),
+    ("delete", "DELETE", ("OLD",)),
+    ("update", "UPDATE OF quantity_ordered, unit_cost, purchase_order_id", ("OLD", "NEW")),
+]:
+    event.listen(
+        PurchaseOrderLine.__table__,
+        "after_create",
+        DDL(
+            f"CREATE TRIGGER trg_purchase_order_lines_subtotal_{_name} "
+            f"AFTER {_event} ON purchase_order_lines BEGIN "
+            + "".join(f"{_PO_SUBTOTAL_SQL.format(row=row)}; " for row in _rows)
+            + "END"
+        ).execute_if(dialect="sqlite"),
+    )
+
+
 class CycleCount(Base, AuditMixin, TenantMixin):
     """
     Cycle count session for storerooms.
     """
 
     __tablename__ = "cycle_counts"
+    __mapper_args__ = {"eager_defaults": True}
 
     id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
     name: Mapped[str] = mapped_column(String(255), nullable=False)
@@ -538,6 +621,7 @@ class CycleCountPlan(Base, AuditMixin, TenantMixin):
     """
 
     __tablename__ = "cycle_count_plans"
+    __mapper_args__ = {"eager_defaults": True}
 
     id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
     name: Mapped[str] = mapped_column(String(255), nullable=False)
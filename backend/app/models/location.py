@@ -2,7 +2,7 @@
 Location model for hierarchical location management.
 """
 from typing import Optional, List, TYPE_CHECKING
-from sqlalchemy import String, Boolean, Text, Integer, ForeignKey, Float
+from sqlalchemy import String, Boolean, Text, Integer, ForeignKey, Float, Index
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.core.database import Base
@@ -21,6 +21,11 @@ class Location(Base, AuditMixin, TenantMixin):
     """
 
     __tablename__ = "locations"
+    __mapper_args__ = {"eager_defaults": True}
+    __table_args__ = (
+        # Keyset pagination: ORDER BY hierarchy_path, id within an organization
+        Index("ix_locations_organization_id_hierarchy_path_id", "organization_id", "hierarchy_path", "id"),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
     code: Mapped[str] = mapped_column(String(50), nullable=False, index=True)
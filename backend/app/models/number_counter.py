@@ -0,0 +1,22 @@
+"""
+Per-organization counters for human-readable document numbers.
+"""
+from sqlalchemy import BigInteger, Integer, String, ForeignKey
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.core.database import Base
+
+
+class NumberCounter(Base):
+    """
+    Last issued number of a document sequence (e.g. PO numbers) for an organization.
+    """
+
+    __tablename__ = "number_counters"
+
+    organization_id: Mapped[int] = mapped_column(Integer, ForeignKey("organizations.id"), primary_key=True)
+    name: Mapped[str] = mapped_column(String(50), primary_key=True)
+    last_value: Mapped[int] = mapped_column(BigInteger, default=0, nullable=False)
+
+    def __repr__(self) -> str:
+        return f"<NumberCounter(org={self.organization_id}, name='{self.name}', last_value={self.last_value})>"
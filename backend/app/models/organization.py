@@ -22,6 +22,7 @@ class Organization(Base, TimestampMixin):
     """
 
     __tablename__ = "organizations"
+    __mapper_args__ = {"eager_defaults": True}
 
     id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
     name: Mapped[str] = mapped_column(String(255), nullable=False)
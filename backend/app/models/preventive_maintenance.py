@@ -3,7 +3,7 @@ Preventive Maintenance models including schedules and job plans.
 """
 from datetime import datetime, date
 from typing import Optional, List, TYPE_CHECKING
-from sqlalchemy import String, Boolean, Text, Integer, ForeignKey, Float, Date, DateTime, Enum as SQLEnum, JSON
+from sqlalchemy import String, Boolean, Text, Integer, ForeignKey, Float, Date, DateTime, Enum as SQLEnum, JSON, Index, text
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 import enum
 
@@ -46,6 +46,18 @@ class PreventiveMaintenance(Base, AuditMixin, TenantMixin):
     """
 
     __tablename__ = "preventive_maintenance"
+    __mapper_args__ = {"eager_defaults": True}
+    __table_args__ = (
+        # Due list: WHERE organization_id = ? AND is_active AND next_due_date <= ? ORDER BY next_due_date
+        Index(
+            "ix_pm_org_due_active",
+            "organization_id",
+            "next_due_date",
+            postgresql_where=text("is_active"),
+            sqlite_where=text("is_active"),
+        ),
+        Index("ix_pm_organization_id_pm_number", "organization_id", "pm_number"),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
     pm_number: Mapped[str] = mapped_column(String(50), nullable=False, unique=True, index=True)
@@ -170,6 +182,7 @@ class JobPlan(Base, AuditMixin, TenantMixin):
     """
 
     __tablename__ = "job_plans"
+    __mapper_args__ = {"eager_defaults": True}
 
     id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
     code: Mapped[str] = mapped_column(String(50), nullable=False, unique=True, index=True)
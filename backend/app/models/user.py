@@ -4,6 +4,7 @@ User, Role, and Permission models for authentication and authorization.
 from datetime import datetime
 from typing import Optional, List, TYPE_CHECKING
 from sqlalchemy import String, Boolean, Text, Integer, ForeignKey, Table, Column, DateTime, func
+from sqlalchemy.ext.hybrid import hybrid_property
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.core.database import Base
@@ -107,10 +108,15 @@ class User(Base, TimestampMixin, TenantMixin):
     group_memberships: Mapped[List["UserGroupMember"]] = relationship("UserGroupMember", back_populates="user", cascade="all, delete-orphan", foreign_keys="UserGroupMember.user_id")
     groups: Mapped[List["UserGroup"]] = relationship("UserGroup", secondary="user_group_members", primaryjoin="User.id == UserGroupMember.user_id", secondaryjoin="UserGroup.id == UserGroupMember.group_id", viewonly=True)
 
-    @property
+    @hybrid_property
     def full_name(self) -> str:
         return f"{self.first_name} {self.last_name}"
 
+    @full_name.expression
+    def full_name(cls):
+        """SQL expression for the full name."""
+        return cls.first_name + " " + cls.last_name
+
     def __repr__(self) -> str:
         return f"<User(id={self.id}, email='{self.email}')>"
 
@@ -3,7 +3,7 @@ Work Order models including tasks, labor, materials, and status history.
 """
 from datetime import datetime, date
 from typing import Optional, List, TYPE_CHECKING
-from sqlalchemy import String, Boolean, Text, Integer, ForeignKey, Float, Date, DateTime, Enum as SQLEnum, JSON
+from sqlalchemy import String, Boolean, Text, Integer, ForeignKey, Float, Date, DateTime, Enum as SQLEnum, JSON, Index, text, DDL, event
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 import enum
 
@@ -55,6 +55,26 @@ class WorkOrder(Base, AuditMixin, TenantMixin):
     """
 
     __tablename__ = "work_orders"
+    __table_args__ = (
+        # Report predicates: open/overdue counts, period ranges, per-asset failures
+        Index("ix_wo_org_status_due", "organization_id", "status", "due_date"),
+        Index(
+            "ix_wo_org_actual_end", "organization_id", "actual_end",
+            postgresql_where=text("status = 'COMPLETED'"),
+            sqlite_where=text("status = 'COMPLETED'"),
+        ),
+        Index("ix_wo_org_created", "organization_id", "created_at"),
+        Index("ix_wo_org_asset_worktype_status", "organization_id", "asset_id", "work_type", "status"),
+        # Dashboard widget group-bys over a created_at range
+        Index("ix_wo_org_status_created", "organization_id", "status", "created_at"),
+        Index("ix_wo_org_priority_created", "organization_id", "priority", "created_at"),
+        Index("ix_wo_org_worktype_created", "organization_id", "work_type", "created_at"),
+        Index(
+            "ix_wo_org_failure_code_created", "organization_id", "failure_code", "created_at",
+            postgresql_where=text("failure_code IS NOT NULL"),
+            sqlite_where=text("failure_code IS NOT NULL"),
+        ),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
     wo_number: Mapped[str] = mapped_column(String(50), nullable=False, unique=True, index=True)
@@ -221,6 +241,10 @@ class LaborTransaction(Base, AuditMixin, TenantMixin):
     """
 
     __tablename__ = "labor_transactions"
+    __table_args__ = (
+        # Labor hours by craft widget
+        Index("ix_labor_org_craft_created", "organization_id", "craft", "created_at"),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
     work_order_id: Mapped[int] = mapped_column(
@@ -338,5 +362,59 @@ class WorkOrderStatusHistory(Base, AuditMixin):
         return f"<WorkOrderStatusHistory(wo_id={self.work_order_id}, {self.from_status}->{self.to_status})>"
 
 
+# Recount assets.work_order_count whenever a work order is added, removed or
+# moved to another asset, so the count stays correct however work orders are
+# written. Mirrored by the add_asset_work_order_count migration for databases
+# managed through Alembic.
+_ASSET_WO_COUNT_SQL = (
+    "UPDATE assets SET work_order_count = ("
+    "SELECT COUNT(*) FROM work_orders WHERE asset_id = {row}.asset_id"
+    ") WHERE id = {row}.asset_id"
+)
+
+event.listen(
+    WorkOrder.__table__,
+    "after_create",
+    DDL(
+        "CREATE OR REPLACE FUNCTION recount_asset_work_orders() RETURNS trigger AS $$\n"
+        "BEGIN\n"
+        "    IF TG_OP <> 'INSERT' THEN\n"
+        f"        {_ASSET_WO_COUNT_SQL.format(row='OLD')};\n"
+        "    END IF;\n"
+        "    IF TG_OP <> 'DELETE' THEN\n"
+        f"        {_ASSET_WO_COUNT_SQL.format(row='NEW')};\n"
+        "    END IF;\n"
+        "    RETURN NULL;\n"
+        "END;\n"
+        "$$ LANGUAGE plpgsql"
+    ).execute_if(dialect="postgresql"),
+)
+event.listen(
+    WorkOrder.__table__,
+    "after_create",
+    DDL(
+        "CREATE TRIGGER trg_work_orders_asset_count "
+        "AFTER INSERT OR DELETE OR UPDATE OF asset_id "
+        "ON work_orders FOR EACH ROW EXECUTE FUNCTION recount_asset_work_orders()"
+    ).execute_if(dialect="postgresql"),
+)
+# SQLite triggers fire for a single event and have no TG_OP, so one per event
+for _name, _event, _rows in [
+    ("insert", "INSERT", ("NEW",)),
+    ("delete", "DELETE", ("OLD",)),
+    ("update", "UPDATE OF asset_id", ("OLD", "NEW")),
+]:
+    event.listen(
+        WorkOrder.__table__,
+        "after_create",
+        DDL(
+            f"CREATE TRIGGER trg_work_orders_asset_count_{_name} "
+            f"AFTER {_event} ON work_orders BEGIN "
+            + "".join(f"{_ASSET_WO_COUNT_SQL.format(row=row)}; " for row in _rows)
+            + "END"
+        ).execute_if(dialect="sqlite"),
+    )
+
+
 # Import Location for type hints
 from app.models.location import Location
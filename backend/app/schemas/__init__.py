@@ -27,6 +27,7 @@ from app.schemas.inventory import (
     StoreroomCreate, StoreroomUpdate, StoreroomResponse,
     PurchaseOrderCreate, PurchaseOrderUpdate, PurchaseOrderResponse,
 )
+from app.schemas.report import DashboardWidgetRequest
 
 __all__ = [
     "PaginatedResponse",
@@ -81,4 +82,5 @@ __all__ = [
     "PurchaseOrderCreate",
     "PurchaseOrderUpdate",
     "PurchaseOrderResponse",
+    "DashboardWidgetRequest",
 ]
@@ -16,10 +16,11 @@ class BaseSchema(BaseModel):
 class PaginatedResponse(BaseModel, Generic[T]):
     """Generic paginated response wrapper."""
     items: List[T]
-    total: int
+    total: Optional[int] = None  # None on keyset (cursor) pages
     page: int
     page_size: int
-    pages: int
+    pages: Optional[int] = None
+    next_cursor: Optional[str] = None
 
     model_config = ConfigDict(from_attributes=True)
 
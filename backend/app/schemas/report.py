@@ -0,0 +1,23 @@
+"""
+Report schemas.
+"""
+from typing import Optional
+from datetime import date
+from pydantic import BaseModel, Field
+
+
+class DashboardWidgetRequest(BaseModel):
+    """One widget in a batched dashboard request, with the same filters as GET /dashboard/widgets."""
+    widget: str
+    start_date: Optional[date] = None
+    end_date: Optional[date] = None
+    status: Optional[str] = None
+    priority: Optional[str] = None
+    work_type: Optional[str] = None
+    assigned_to: Optional[int] = None
+    asset_status: Optional[str] = None
+    criticality: Optional[str] = None
+    storeroom: Optional[int] = None
+    craft: Optional[str] = None
+    labor_type: Optional[str] = None
+    limit: int = Field(10, ge=1, le=100)
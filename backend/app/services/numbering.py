@@ -0,0 +1,38 @@
+"""
+Document numbering backed by per-organization counter rows.
+"""
+from sqlalchemy import Select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.number_counter import NumberCounter
+
+
+async def next_number(db: AsyncSession, org_id: int, name: str, seed: Select) -> int:
+    """
+    Atomically increment and return the organization's `name` counter.
+
+    The steady state is a single UPDATE ... RETURNING; the row lock it takes
+    serializes concurrent callers until their transaction ends. The first call
+    for an organization seeds the counter from `seed` (a count of existing rows).
+    """
+    result = await db.execute(
+        update(NumberCounter)
+        .where(NumberCounter.organization_id == org_id)
+        .where(NumberCounter.name == name)
+        .values(last_value=NumberCounter.last_value + 1)
+        .returning(NumberCounter.last_value)
+        .execution_options(synchronize_session=False)
+    )
+    value = result.scalar_one_or_none()
+    if value is not None:
+        return value
+
+    value = (await db.scalar(seed)) + 1
+    try:
+        async with db.begin_nested():
+            db.add(NumberCounter(organization_id=org_id, name=name, last_value=value))
+    except IntegrityError:
+        # Another request created the counter first; take the next value from it
+        return await next_number(db, org_id, name, seed)
+    return value
@@ -6,24 +6,42 @@ from datetime import datetime, date, timedelta
 from typing import List, Optional
 import logging
 
+from dateutil.relativedelta import relativedelta
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
-from sqlalchemy.orm import selectinload
 
 from app.models.preventive_maintenance import (
     PreventiveMaintenance,
     PMTriggerType,
     PMScheduleType,
     PMFrequencyUnit,
-    JobPlan,
 )
-from app.models.work_order import WorkOrder, WorkOrderTask, WorkOrderStatus, WorkOrderType
+from app.models.work_order import WorkOrder, WorkOrderStatus, WorkOrderType
 from app.models.asset import Meter
 from app.models.scheduler_control import SchedulerControl
-from sqlalchemy import func
+from app.services.work_order_service import WorkOrderService
 
 logger = logging.getLogger(__name__)
 
+# relativedelta clamps month/year steps to the last day of the target month
+# (Jan 31 + 1 month -> Feb 28/29, Feb 29 + 1 year -> Feb 28)
+_FREQUENCY_DELTAS = {
+    PMFrequencyUnit.DAYS: lambda n: relativedelta(days=n),
+    PMFrequencyUnit.WEEKS: lambda n: relativedelta(weeks=n),
+    PMFrequencyUnit.MONTHS: lambda n: relativedelta(months=n),
+    PMFrequencyUnit.YEARS: lambda n: relativedelta(years=n),
+}
+
+
+def add_frequency(base_date: date, frequency: int, frequency_unit: PMFrequencyUnit) -> Optional[date]:
+    """
+    Step a date forward by a PM frequency, or return None for an unknown unit.
+    """
+    delta = _FREQUENCY_DELTAS.get(frequency_unit)
+    if delta is None:
+        return None
+    return base_date + delta(frequency)
+
 
 class PMScheduler:
     """
@@ -52,10 +70,6 @@ class PMScheduler:
 
             result = await db.execute(
                 select(PreventiveMaintenance)
-                .options(
-                    selectinload(PreventiveMaintenance.job_plan)
-                    .selectinload(JobPlan.tasks)
-                )
                 .where(PreventiveMaintenance.is_active == True)
                 .where(PreventiveMaintenance.next_due_date.isnot(None))
             )
@@ -68,7 +82,7 @@ class PMScheduler:
                 should_generate = await self._should_generate_wo(pm, today, db)
 
                 if should_generate:
-                    wo_id = await self._generate_work_order(pm, db)
+                    wo_id = await self._generate_work_order(pm, db, today)
                     if wo_id:
                         generated_wos.append(wo_id)
                         logger.info(f"Generated WO {wo_id} for PM {pm.pm_number}")
@@ -183,18 +197,16 @@ class PMScheduler:
         self,
         pm: PreventiveMaintenance,
         db: AsyncSession,
+        today: Optional[date] = None,
     ) -> Optional[int]:
         """
         Generate a work order from the PM.
+        `today` is passed by a scheduler run so every PM it processes shares one date.
         """
+        today = today or date.today()
         try:
             # Generate WO number
-            wo_count = await db.scalar(
-                select(func.count())
-                .select_from(WorkOrder)
-                .where(WorkOrder.organization_id == pm.organization_id)
-            )
-            wo_number = f"WO-{wo_count + 1:06d}"
+            wo_number = await WorkOrderService(db).generate_wo_number(pm.organization_id)
 
             # Create work order
             work_order = WorkOrder(
@@ -218,25 +230,15 @@ class PMScheduler:
             await db.flush()
 
             # Copy tasks from job plan
-            if pm.job_plan:
-                for task in pm.job_plan.tasks:
-                    wo_task = WorkOrderTask(
-                        work_order_id=work_order.id,
-                        sequence=task.sequence,
-                        description=task.description,
-                        instructions=task.instructions,
-                        task_type=task.task_type,
-                        expected_value=task.expected_value,
-                        estimated_hours=task.estimated_hours,
-                    )
-                    db.add(wo_task)
+            if pm.job_plan_id:
+                await WorkOrderService(db).copy_job_plan_tasks(work_order.id, pm.job_plan_id)
 
             # Update PM tracking
-            pm.last_wo_date = date.today()
+            pm.last_wo_date = today
             pm.last_wo_id = work_order.id
 
             # Calculate next due date
-            pm.next_due_date = self._calculate_next_due_date(pm)
+            pm.next_due_date = self._calculate_next_due_date(pm, today)
 
             # Update meter tracking if applicable
             if pm.meter_id and pm.meter_interval:
@@ -257,6 +259,7 @@ class PMScheduler:
     def _calculate_next_due_date(
         self,
         pm: PreventiveMaintenance,
+        today: Optional[date] = None,
     ) -> Optional[date]:
         """
         Calculate the next due date based on PM configuration.
@@ -266,35 +269,11 @@ class PMScheduler:
 
         # Determine base date
         if pm.schedule_type == PMScheduleType.FIXED:
-            base_date = pm.next_due_date or date.today()
+            base_date = pm.next_due_date or today or date.today()
         else:  # FLOATING
-            base_date = date.today()
-
-        # Add frequency
-        if pm.frequency_unit == PMFrequencyUnit.DAYS:
-            return base_date + timedelta(days=pm.frequency)
-
-        elif pm.frequency_unit == PMFrequencyUnit.WEEKS:
-            return base_date + timedelta(weeks=pm.frequency)
-
-        elif pm.frequency_unit == PMFrequencyUnit.MONTHS:
-            month = base_date.month + pm.frequency
-            year = base_date.year + (month - 1) // 12
-            month = ((month - 1) % 12) + 1
-            # Handle day overflow
-            import calendar
-            max_day = calendar.monthrange(year, month)[1]
-            day = min(base_date.day, max_day)
-            return date(year, month, day)
-
-        elif pm.frequency_unit == PMFrequencyUnit.YEARS:
-            try:
-                return date(base_date.year + pm.frequency, base_date.month, base_date.day)
-            except ValueError:
-                # Handle Feb 29 in non-leap years
-                return date(base_date.year + pm.frequency, base_date.month, 28)
+            base_date = today or date.today()
 
-        return None
+        return add_frequency(base_date, pm.frequency, pm.frequency_unit)
 
 
 async def run_pm_scheduler(session_maker: async_sessionmaker[AsyncSession]):
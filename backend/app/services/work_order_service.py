@@ -4,9 +4,11 @@ Work Order service for business logic.
 from datetime import datetime
 from typing import Optional
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import select, insert, func, literal
 
-from app.models.work_order import WorkOrder, WorkOrderStatus, WorkOrderStatusHistory
+from app.models.preventive_maintenance import JobPlanTask
+from app.models.work_order import WorkOrder, WorkOrderStatus, WorkOrderStatusHistory, WorkOrderTask
+from app.services.numbering import next_number
 
 
 class WorkOrderService:
@@ -15,6 +17,56 @@ class WorkOrderService:
     def __init__(self, db: AsyncSession):
         self.db = db
 
+    async def generate_wo_number(self, org_id: int) -> str:
+        """
+        Generate the next work order number from the organization's counter row.
+        Shared by manual creation, PM generation and the PM scheduler.
+        """
+        count = await next_number(
+            self.db,
+            org_id,
+            "work_order",
+            select(func.count()).select_from(WorkOrder).where(WorkOrder.organization_id == org_id),
+        )
+        return f"WO-{count:06d}"
+
+    async def copy_job_plan_tasks(
+        self,
+        work_order_id: int,
+        job_plan_id: int,
+        created_by_id: Optional[int] = None,
+    ) -> None:
+        """
+        Copy a job plan's tasks onto a work order with one INSERT ... SELECT,
+        so the task rows never leave the database.
+        """
+        await self.db.execute(
+            insert(WorkOrderTask).from_select(
+                [
+                    "work_order_id",
+                    "sequence",
+                    "description",
+                    "instructions",
+                    "task_type",
+                    "expected_value",
+                    "estimated_hours",
+                    "created_by_id",
+                ],
+                select(
+                    literal(work_order_id),
+                    JobPlanTask.sequence,
+                    JobPlanTask.description,
+                    JobPlanTask.instructions,
+                    JobPlanTask.task_type,
+                    JobPlanTask.expected_value,
+                    JobPlanTask.estimated_hours,
+                    literal(created_by_id, WorkOrderTask.created_by_id.type),
+                )
+                .where(JobPlanTask.job_plan_id == job_plan_id)
+                .order_by(JobPlanTask.sequence),
+            )
+        )
+
     async def change_status(
         self,
         work_order: WorkOrder,
@@ -46,6 +46,8 @@ async def test_engine():
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.drop_all)
 
+    await engine.dispose()
+
 
 @pytest.fixture(scope="session")
 async def test_session_maker(test_engine):
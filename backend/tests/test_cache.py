@@ -0,0 +1,107 @@
+"""
+Test response caching helpers
+"""
+import asyncio
+
+import pytest
+from starlette.requests import Request
+
+from app.core import cache
+from app.core.cache import bump_cache_version, cached_json_response, etag_response, make_etag
+
+
+class _FakeRedis:
+    """In-memory stand-in for the few Redis commands the cache uses."""
+
+    def __init__(self):
+        self.values = {}
+        self.ttls = {}
+
+    async def get(self, key):
+        return self.values.get(key)
+
+    async def set(self, key, value, ex=None):
+        self.values[key] = value
+        self.ttls[key] = ex
+
+    async def incr(self, key):
+        self.values[key] = str(int(self.values.get(key, 0)) + 1).encode()
+
+
+def _request(headers: dict) -> Request:
+    """Build a bare GET request carrying `headers`."""
+    return Request({
+        "type": "http",
+        "method": "GET",
+        "path": "/",
+        "headers": [(key.lower().encode(), value.encode()) for key, value in headers.items()],
+    })
+
+
+class TestETagResponse:
+    """Test ETag handling when Redis caching is disabled."""
+
+    @pytest.mark.asyncio
+    async def test_returns_body_with_etag(self):
+        """A fresh request gets the loaded body and its ETag."""
+        async def load() -> bytes:
+            return b'[{"id": 1}]'
+
+        response = await etag_response(_request({}), "test", 1, load)
+
+        assert response.status_code == 200
+        assert response.body == b'[{"id": 1}]'
+        assert response.headers["etag"] == make_etag(b'[{"id": 1}]')
+        assert response.headers["cache-control"] == "private, max-age=30"
+
+    @pytest.mark.asyncio
+    async def test_matching_if_none_match_is_not_modified(self):
+        """A client holding the current ETag gets 304 with no body."""
+        async def load() -> bytes:
+            return b'{"id": 1}'
+
+        response = await etag_response(_request({"If-None-Match": make_etag(b'{"id": 1}')}), "test", 1, load)
+
+        assert response.status_code == 304
+        assert response.body == b""
+
+
+class TestCachedJSONResponse:
+    """Test versioned JSON response caching."""
+
+    @pytest.mark.asyncio
+    async def test_hit_skips_loader_until_invalidated(self, monkeypatch):
+        """Cached bodies are reused until the namespace version is bumped."""
+        client = _FakeRedis()
+        monkeypatch.setattr(cache, "get_redis", lambda: client)
+        calls = []
+
+        async def load() -> dict:
+            calls.append(1)
+            return {"open": len(calls)}
+
+        for expected in (b'{"open":1}', b'{"open":1}'):
+            response = await cached_json_response("test", 1, "dash", load, ttl=60)
+            assert response.body == expected
+            assert response.media_type == "application/json"
+        await bump_cache_version("test", 1)
+        response = await cached_json_response("test", 1, "dash", load, ttl=60)
+        assert response.body == b'{"open":2}'
+
+    @pytest.mark.asyncio
+    async def test_concurrent_misses_share_one_load(self, monkeypatch):
+        """Requests missing the same key together run the loader once."""
+        monkeypatch.setattr(cache, "get_redis", lambda: None)
+        calls = []
+
+        async def load() -> dict:
+            calls.append(1)
+            await asyncio.sleep(0.01)
+            return {"open": len(calls)}
+
+        responses = await asyncio.gather(*(
+            cached_json_response("test", 1, "dash", load, ttl=60) for _ in range(3)
+        ))
+        assert [response.body for response in responses] == [b'{"open":1}'] * 3
+        response = await cached_json_response("test", 1, "dash", load, ttl=60)
+        assert response.body == b'{"open":2}'
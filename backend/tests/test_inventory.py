@@ -0,0 +1,359 @@
+"""
+Test inventory management functionality
+"""
+import json
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import event, select
+
+from app.api.deps import PaginationParams, encode_cursor, decode_cursor, search_pattern
+from app.api.v1.endpoints.inventory import (
+    receive_po_lines,
+    list_parts,
+    list_vendors,
+    list_purchase_orders,
+    generate_po_number,
+)
+from app.core.security import get_password_hash
+from app.models.number_counter import NumberCounter
+from app.models.organization import Organization
+from app.models.user import User
+from app.models.inventory import (
+    Part,
+    Vendor,
+    Storeroom,
+    PurchaseOrder,
+    PurchaseOrderLine,
+    POStatus,
+)
+from app.schemas.inventory import ReceiveLineRequest
+
+
+class TestPurchaseOrderReceiving:
+    """Test purchase order receiving."""
+
+    async def _create_ordered_po(self, db_session, suffix: str, line_count: int):
+        """Create an org, user, storeroom and an ORDERED PO with `line_count` lines."""
+        org = Organization(code=f"RCV-{suffix}", name="Receiving Org")
+        db_session.add(org)
+        await db_session.flush()
+
+        user = User(
+            organization_id=org.id,
+            email=f"receiver-{suffix}@example.com",
+            username=f"receiver-{suffix}",
+            hashed_password=get_password_hash("password"),
+            first_name="Test",
+            last_name="Receiver",
+            is_active=True
+        )
+        storeroom = Storeroom(organization_id=org.id, code=f"SR-{suffix}", name="Main Stores")
+        vendor = Vendor(organization_id=org.id, code=f"VEN-{suffix}", name="Vendor")
+        db_session.add_all([user, storeroom, vendor])
+        await db_session.flush()
+
+        po = PurchaseOrder(
+            organization_id=org.id,
+            po_number=f"PO-{suffix}",
+            vendor_id=vendor.id,
+            status=POStatus.ORDERED,
+            ship_to_storeroom_id=storeroom.id,
+        )
+        db_session.add(po)
+        await db_session.flush()
+
+        for number in range(1, line_count + 1):
+            part = Part(organization_id=org.id, part_number=f"P-{suffix}-{number}", name=f"Part {number}")
+            db_session.add(part)
+            await db_session.flush()
+            db_session.add(PurchaseOrderLine(
+                purchase_order_id=po.id,
+                line_number=number,
+                part_id=part.id,
+                quantity_ordered=2,
+                unit_cost=5.0,
+            ))
+
+        await db_session.commit()
+        return user, po
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("line_count", [1, 8])
+    async def test_receive_query_count_is_constant(self, db_session, test_engine, line_count):
+        """Receiving issues a fixed number of SELECTs regardless of PO size."""
+        user, po = await self._create_ordered_po(db_session, f"QC{line_count}", line_count)
+        result = await db_session.scalars(
+            select(PurchaseOrderLine.id).where(PurchaseOrderLine.purchase_order_id == po.id)
+        )
+        line_ids = result.all()
+        db_session.expunge_all()
+
+        statements = []
+
+        def count_selects(conn, cursor, statement, parameters, context, executemany):
+            if statement.lstrip().upper().startswith("SELECT"):
+                statements.append(statement)
+
+        event.listen(test_engine.sync_engine, "before_cursor_execute", count_selects)
+        try:
+            response = await receive_po_lines(
+                db=db_session,
+                current_user=user,
+                po_id=po.id,
+                receive_data=[
+                    ReceiveLineRequest(line_id=line_id, quantity_received=2)
+                    for line_id in line_ids
+                ],
+            )
+        finally:
+            event.remove(test_engine.sync_engine, "before_cursor_execute", count_selects)
+
+        assert response.message == f"Received {line_count} line(s)"
+        # PO, lines joined with parts, stock levels
+        assert len(statements) <= 3
+
+    @pytest.mark.asyncio
+    async def test_status_follows_line_receipts(self, db_session):
+        """A PO is partially received until its last open line is received."""
+        user, po = await self._create_ordered_po(db_session, "STAT", 2)
+        result = await db_session.scalars(
+            select(PurchaseOrderLine.id)
+            .where(PurchaseOrderLine.purchase_order_id == po.id)
+            .order_by(PurchaseOrderLine.line_number)
+        )
+        first_line, second_line = result.all()
+
+        for line_id, expected in [
+            (first_line, POStatus.PARTIALLY_RECEIVED),
+            (second_line, POStatus.RECEIVED),
+        ]:
+            db_session.expunge_all()
+            await receive_po_lines(
+                db=db_session,
+                current_user=user,
+                po_id=po.id,
+                receive_data=[ReceiveLineRequest(line_id=line_id, quantity_received=2)],
+            )
+            row = (await db_session.execute(
+                select(PurchaseOrder.status, PurchaseOrder.received_date)
+                .where(PurchaseOrder.id == po.id)
+            )).one()
+            assert row.status == expected
+            assert (row.received_date is not None) == (expected == POStatus.RECEIVED)
+
+
+class TestPurchaseOrderTotals:
+    """Test database-maintained purchase order totals."""
+
+    @pytest.mark.asyncio
+    async def test_totals_follow_line_changes(self, db_session):
+        """Line costs and PO totals are recomputed as lines are added, repriced and removed."""
+        org = Organization(code="TOT-PO", name="Totals Org")
+        db_session.add(org)
+        await db_session.flush()
+        vendor = Vendor(organization_id=org.id, code="VEN-TOT", name="Vendor")
+        part = Part(organization_id=org.id, part_number="P-TOT", name="Part")
+        db_session.add_all([vendor, part])
+        await db_session.flush()
+        po = PurchaseOrder(
+            organization_id=org.id, po_number="PO-TOT", vendor_id=vendor.id, tax=1.5, shipping_cost=2,
+        )
+        db_session.add(po)
+        await db_session.flush()
+
+        first = PurchaseOrderLine(
+            purchase_order_id=po.id, line_number=1, part_id=part.id, quantity_ordered=4, unit_cost=3,
+        )
+        second = PurchaseOrderLine(
+            purchase_order_id=po.id, line_number=2, part_id=part.id, quantity_ordered=2, unit_cost=5,
+        )
+        db_session.add_all([first, second])
+        await db_session.flush()
+        assert (first.total_cost, second.total_cost) == (12, 10)
+
+        async def totals():
+            return tuple((await db_session.execute(
+                select(PurchaseOrder.subtotal, PurchaseOrder.total).where(PurchaseOrder.id == po.id)
+            )).one())
+
+        assert await totals() == (22, 25.5)
+
+        second.unit_cost = 6
+        await db_session.flush()
+        assert await totals() == (24, 27.5)
+
+        await db_session.delete(first)
+        await db_session.flush()
+        assert await totals() == (12, 15.5)
+
+
+class TestKeysetPagination:
+    """Test cursor and offset pagination on vendor and purchase order lists."""
+
+    async def _create_org_with_vendors(self, db_session, suffix: str, vendor_count: int):
+        """Create an org, user and `vendor_count` vendors, returning the user and vendors."""
+        org = Organization(code=f"PAGE-{suffix}", name="Paging Org")
+        db_session.add(org)
+        await db_session.flush()
+
+        user = User(
+            organization_id=org.id,
+            email=f"pager-{suffix}@example.com",
+            username=f"pager-{suffix}",
+            hashed_password=get_password_hash("password"),
+            first_name="Test",
+            last_name="Pager",
+            is_active=True
+        )
+        vendors = [
+            Vendor(organization_id=org.id, code=f"V{suffix}-{number:02d}", name=f"Vendor {number}")
+            for number in range(vendor_count)
+        ]
+        db_session.add(user)
+        db_session.add_all(vendors)
+        await db_session.commit()
+        return user, vendors
+
+    @pytest.mark.asyncio
+    async def test_vendor_cursor_walks_every_row_once(self, db_session):
+        """Following next_cursor visits each vendor once, in code order, then stops."""
+        user, vendors = await self._create_org_with_vendors(db_session, "CUR", 5)
+
+        first = json.loads((await list_vendors(
+            db=db_session, current_user=user, pagination=PaginationParams(page=1, page_size=2),
+            is_active=None, search=None, cursor=None,
+        )).body)
+        assert first["total"] == 5
+        assert first["pages"] == 3
+        assert first["next_cursor"] is not None
+
+        codes = [vendor["code"] for vendor in first["items"]]
+        cursor = first["next_cursor"]
+        while cursor:
+            page = json.loads((await list_vendors(
+                db=db_session, current_user=user, pagination=PaginationParams(page=1, page_size=2),
+                is_active=None, search=None, cursor=cursor,
+            )).body)
+            assert page["total"] is None
+            assert page["pages"] is None
+            codes.extend(vendor["code"] for vendor in page["items"])
+            cursor = page["next_cursor"]
+
+        assert codes == sorted(vendor.code for vendor in vendors)
+
+    @pytest.mark.asyncio
+    async def test_offset_page_past_end_keeps_total(self, db_session):
+        """An empty offset page past the end still reports the filtered total."""
+        user, _ = await self._create_org_with_vendors(db_session, "END", 3)
+
+        page = json.loads((await list_vendors(
+            db=db_session, current_user=user, pagination=PaginationParams(page=5, page_size=2),
+            is_active=None, search=None, cursor=None,
+        )).body)
+        assert page["items"] == []
+        assert page["total"] == 3
+        assert page["pages"] == 2
+        assert page["next_cursor"] is None
+
+    @pytest.mark.asyncio
+    async def test_part_pages_report_filtered_total(self, db_session):
+        """Part pages carry the filtered total, including a page past the end."""
+        user, _ = await self._create_org_with_vendors(db_session, "PART", 0)
+        db_session.add_all([
+            Part(organization_id=user.organization_id, part_number=f"PG-{number}", name=name)
+            for number, name in enumerate(["Bolt", "Bolt long", "Nut"])
+        ])
+        await db_session.commit()
+
+        for page_number, expected_items in [(1, ["Bolt"]), (3, [])]:
+            page = json.loads((await list_parts(
+                db=db_session, current_user=user, pagination=PaginationParams(page=page_number, page_size=1),
+                category_id=None, status=None, low_stock=False, search="bo",
+            )).body)
+            assert [part["name"] for part in page["items"]] == expected_items
+            assert page["total"] == 2
+            assert page["pages"] == 2
+
+    @pytest.mark.asyncio
+    async def test_purchase_order_cursor_with_shared_timestamps(self, db_session):
+        """POs created in the same instant page through without repeats."""
+        user, vendors = await self._create_org_with_vendors(db_session, "PO", 1)
+        db_session.add_all([
+            PurchaseOrder(
+                organization_id=user.organization_id,
+                po_number=f"PO-PAGE-{number}",
+                vendor_id=vendors[0].id,
+            )
+            for number in range(5)
+        ])
+        await db_session.commit()
+
+        numbers = []
+        cursor = None
+        for _ in range(5):
+            page = json.loads((await list_purchase_orders(
+                db=db_session, current_user=user, pagination=PaginationParams(page=1, page_size=2),
+                status=None, vendor_id=None, search=None, cursor=cursor,
+            )).body)
+            numbers.extend(po["po_number"] for po in page["items"])
+            cursor = page["next_cursor"]
+            if not cursor:
+                break
+
+        assert cursor is None
+        assert numbers == [f"PO-PAGE-{number}" for number in reversed(range(5))]
+
+    @pytest.mark.parametrize("cursor, types", [
+        ("garbage", (str,)),
+        (encode_cursor({"a": 1}), (str,)),
+        (encode_cursor(1, 2), (str, int)),
+        (encode_cursor("/L1", "x"), (str, int)),
+        (encode_cursor("x", 2), (int,)),
+        (encode_cursor(True), (int,)),
+    ])
+    def test_malformed_cursor_is_rejected(self, cursor, types):
+        """Cursors of the wrong shape or element types are a 400, not a server error."""
+        with pytest.raises(HTTPException) as exc_info:
+            decode_cursor(cursor, *types)
+        assert exc_info.value.status_code == 400
+
+
+class TestPurchaseOrderNumbering:
+    """Test counter-backed PO numbering."""
+
+    @pytest.mark.asyncio
+    async def test_po_numbers_continue_from_existing_orders(self, db_session):
+        """The counter is seeded from existing POs and then increments per call."""
+        org = Organization(code="NUM-PO", name="Numbering Org")
+        db_session.add(org)
+        await db_session.flush()
+        vendor = Vendor(organization_id=org.id, code="VEN-NUM", name="Vendor")
+        db_session.add(vendor)
+        await db_session.flush()
+        db_session.add_all([
+            PurchaseOrder(organization_id=org.id, po_number=f"NUM-{number}", vendor_id=vendor.id)
+            for number in range(2)
+        ])
+        await db_session.flush()
+
+        assert await generate_po_number(db_session, org.id) == "PO-000003"
+        assert await generate_po_number(db_session, org.id) == "PO-000004"
+
+        counter = await db_session.get(NumberCounter, (org.id, "purchase_order"))
+        assert counter.last_value == 4
+
+
+class TestSearchPattern:
+    """Test ILIKE pattern building for list searches."""
+
+    @pytest.mark.parametrize("search, expected", [
+        (None, None),
+        ("   ", None),
+        ("b", "b%"),
+        (" bo ", "bo%"),
+        ("bolt", "%bolt%"),
+    ])
+    def test_search_pattern(self, search, expected):
+        """Blank searches skip the filter and short terms match as a prefix."""
+        assert search_pattern(search) == expected
@@ -0,0 +1,83 @@
+"""
+Test location hierarchy functionality
+"""
+import pytest
+from fastapi import HTTPException
+
+from app.api.v1.endpoints.locations import get_location, get_location_tree
+from app.core.security import get_password_hash
+from app.models.location import Location
+from app.models.organization import Organization
+from app.models.user import User
+
+
+class TestLocationTree:
+    """Test the location tree endpoint."""
+
+    @pytest.mark.asyncio
+    async def test_tree_nests_active_locations(self, db_session):
+        """Children nest under active parents; children of inactive parents become roots."""
+        org = Organization(code="TREE", name="Tree Org")
+        db_session.add(org)
+        await db_session.flush()
+
+        user = User(
+            organization_id=org.id,
+            email="tree@example.com",
+            username="treeuser",
+            hashed_password=get_password_hash("password"),
+            first_name="Test",
+            last_name="Tree",
+            is_active=True
+        )
+        db_session.add(user)
+
+        plant = Location(organization_id=org.id, code="PLANT", name="Plant")
+        db_session.add(plant)
+        await db_session.flush()
+        line = Location(organization_id=org.id, code="LINE", name="Line", parent_id=plant.id)
+        closed = Location(organization_id=org.id, code="CLOSED", name="Closed", is_active=False)
+        db_session.add_all([line, closed])
+        await db_session.flush()
+        cell = Location(organization_id=org.id, code="CELL", name="Cell", parent_id=line.id)
+        orphan = Location(organization_id=org.id, code="ORPHAN", name="Orphan", parent_id=closed.id)
+        db_session.add_all([cell, orphan])
+        await db_session.commit()
+
+        roots = await get_location_tree(db=db_session, current_user=user)
+
+        assert sorted(root["code"] for root in roots) == ["ORPHAN", "PLANT"]
+        plant_node = next(root for root in roots if root["code"] == "PLANT")
+        assert [child["code"] for child in plant_node["children"]] == ["LINE"]
+        assert [child["code"] for child in plant_node["children"][0]["children"]] == ["CELL"]
+
+
+class TestLocationAccess:
+    """Test tenant isolation on location lookups."""
+
+    @pytest.mark.asyncio
+    async def test_other_tenant_location_is_not_found(self, db_session):
+        """Fetching another organization's location by id is a 404."""
+        home = Organization(code="HOME", name="Home Org")
+        away = Organization(code="AWAY", name="Away Org")
+        db_session.add_all([home, away])
+        await db_session.flush()
+
+        user = User(
+            organization_id=home.id,
+            email="tenant@example.com",
+            username="tenantuser",
+            hashed_password=get_password_hash("password"),
+            first_name="Test",
+            last_name="Tenant",
+            is_active=True
+        )
+        own = Location(organization_id=home.id, code="OWN", name="Own")
+        foreign = Location(organization_id=away.id, code="FOREIGN", name="Foreign")
+        db_session.add_all([user, own, foreign])
+        await db_session.commit()
+
+        assert (await get_location(db=db_session, current_user=user, location_id=own.id)).code == "OWN"
+        with pytest.raises(HTTPException) as exc_info:
+            await get_location(db=db_session, current_user=user, location_id=foreign.id)
+        assert exc_info.value.status_code == 404
@@ -0,0 +1,398 @@
+"""
+Test preventive maintenance functionality
+"""
+import json
+from datetime import date, timedelta
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import select
+
+from app.api.deps import PaginationParams
+from app.api.v1.endpoints import preventive_maintenance as pm_endpoints
+from app.api.v1.endpoints.preventive_maintenance import (
+    list_pms,
+    list_job_plans,
+    generate_pm_number,
+    generate_work_order,
+    create_pm,
+    get_pm,
+    create_job_plan,
+    get_job_plan,
+    update_job_plan,
+    get_due_pms,
+    update_pm,
+    delete_pm,
+    calculate_next_due_date,
+)
+from app.api.v1.endpoints.work_orders import generate_wo_number
+from app.core.security import get_password_hash
+from app.models.inventory import Part
+from app.models.number_counter import NumberCounter
+from app.models.organization import Organization
+from app.models.preventive_maintenance import PreventiveMaintenance, JobPlan, JobPlanTask
+from app.models.user import User
+from app.models.work_order import WorkOrder, WorkOrderTask
+from app.schemas.preventive_maintenance import (
+    PMCreate,
+    PMUpdate,
+    PMResponse,
+    JobPlanCreate,
+    JobPlanUpdate,
+    JobPlanResponse,
+)
+from app.services.pm_scheduler import PMScheduler, add_frequency
+
+
+async def _create_org_user(db_session, suffix: str):
+    """Create an org and a user in it, returning the user."""
+    org = Organization(code=f"PM-{suffix}", name="PM Org")
+    db_session.add(org)
+    await db_session.flush()
+
+    user = User(
+        organization_id=org.id,
+        email=f"planner-{suffix}@example.com",
+        username=f"planner-{suffix}",
+        hashed_password=get_password_hash("password"),
+        first_name="Test",
+        last_name="Planner",
+        is_active=True
+    )
+    db_session.add(user)
+    await db_session.flush()
+    return user
+
+
+class TestPMList:
+    """Test PM list pagination and filtering."""
+
+    @pytest.mark.asyncio
+    async def test_pages_report_filtered_total(self, db_session):
+        """PM pages carry the filtered total, including a page past the end."""
+        user = await _create_org_user(db_session, "LIST")
+        db_session.add_all([
+            PreventiveMaintenance(
+                organization_id=user.organization_id,
+                pm_number=f"PM-LIST-{number}",
+                name=f"Lube {number}",
+                is_active=number != 2,
+                next_due_date=date.today() + timedelta(days=number),
+            )
+            for number in range(3)
+        ])
+        await db_session.commit()
+
+        for page_number, expected_items in [(1, ["PM-LIST-0"]), (2, ["PM-LIST-1"]), (3, [])]:
+            page = json.loads((await list_pms(
+                db=db_session, current_user=user, pagination=PaginationParams(page=page_number, page_size=1),
+                asset_id=None, location_id=None, is_active=True, due_before=None, search=None,
+            )).body)
+            assert [pm["pm_number"] for pm in page["items"]] == expected_items
+            assert page["total"] == 2
+            assert page["pages"] == 2
+
+    @pytest.mark.asyncio
+    async def test_cached_filters_bind_each_call(self, db_session):
+        """Reusing the cached list statement still applies each call's filter values."""
+        user = await _create_org_user(db_session, "FILT")
+        db_session.add_all([
+            PreventiveMaintenance(
+                organization_id=user.organization_id,
+                pm_number=f"PM-FILT-{number}",
+                name=name,
+                is_active=number % 2 == 0,
+            )
+            for number, name in enumerate(["Grease pump", "Grease fan", "Inspect belt"])
+        ])
+        await db_session.commit()
+
+        async def numbers(is_active, search):
+            page = json.loads((await list_pms(
+                db=db_session, current_user=user, pagination=PaginationParams(page=1, page_size=10),
+                asset_id=None, location_id=None, is_active=is_active, due_before=None, search=search,
+            )).body)
+            return sorted(pm["pm_number"] for pm in page["items"])
+
+        assert await numbers(True, "grease") == ["PM-FILT-0"]
+        assert await numbers(False, "grease") == ["PM-FILT-1"]
+        assert await numbers(True, "belt") == ["PM-FILT-2"]
+        assert await numbers(None, None) == ["PM-FILT-0", "PM-FILT-1", "PM-FILT-2"]
+
+    @pytest.mark.asyncio
+    async def test_short_search_matches_prefix(self, db_session):
+        """Search terms below the trigram length match as a prefix, not a substring."""
+        user = await _create_org_user(db_session, "SHORT")
+        db_session.add_all([
+            PreventiveMaintenance(organization_id=user.organization_id, pm_number=number, name=name)
+            for number, name in [("PM-SHORT-1", "Oil pump"), ("PM-SHORT-2", "Boil tank")]
+        ])
+        await db_session.commit()
+
+        page = json.loads((await list_pms(
+            db=db_session, current_user=user, pagination=PaginationParams(page=1, page_size=10),
+            asset_id=None, location_id=None, is_active=None, due_before=None, search="oi",
+        )).body)
+        assert [pm["name"] for pm in page["items"]] == ["Oil pump"]
+
+    @pytest.mark.asyncio
+    async def test_job_plan_filters(self, db_session):
+        """Job plans filter by category and code/name search."""
+        user = await _create_org_user(db_session, "JP")
+        db_session.add_all([
+            JobPlan(organization_id=user.organization_id, code=code, name=name, category=category)
+            for code, name, category in [
+                ("JP-A", "Pump service", "MECH"),
+                ("JP-B", "Panel check", "ELEC"),
+                ("JP-C", "Pump align", "MECH"),
+            ]
+        ])
+        await db_session.commit()
+
+        for category, search, expected in [
+            ("MECH", None, ["JP-A", "JP-C"]),
+            (None, "panel", ["JP-B"]),
+            ("MECH", "align", ["JP-C"]),
+        ]:
+            page = json.loads((await list_job_plans(
+                db=db_session, current_user=user, pagination=PaginationParams(page=1, page_size=10),
+                category=category, search=search,
+            )).body)
+            assert [job_plan["code"] for job_plan in page["items"]] == expected
+            assert page["total"] == len(expected)
+
+    @pytest.mark.asyncio
+    async def test_due_list_serializes_active_due_pms(self, db_session, monkeypatch):
+        """The due list joins its fetch batches into one array of active PMs, soonest first."""
+        monkeypatch.setattr(pm_endpoints, "_DUE_PMS_BATCH_SIZE", 1)
+        user = await _create_org_user(db_session, "DUE")
+        db_session.add_all([
+            PreventiveMaintenance(
+                organization_id=user.organization_id, pm_number=number, name="Check",
+                is_active=is_active, next_due_date=date.today() + timedelta(days=days),
+            )
+            for number, is_active, days in [
+                ("PM-DUE-LATE", True, 30), ("PM-DUE-2", True, 2), ("PM-DUE-OFF", False, 1), ("PM-DUE-1", True, 1),
+            ]
+        ])
+        await db_session.commit()
+
+        due = json.loads((await get_due_pms(db=db_session, current_user=user, days_ahead=7)).body)
+        assert [pm["pm_number"] for pm in due] == ["PM-DUE-1", "PM-DUE-2"]
+        assert due[0]["next_due_date"] == (date.today() + timedelta(days=1)).isoformat()
+        assert json.loads((await get_due_pms(db=db_session, current_user=user, days_ahead=-1)).body) == []
+
+
+class TestPMUpdates:
+    """Test tenant-scoped PM updates and deactivation."""
+
+    @pytest.mark.asyncio
+    async def test_update_and_deactivate(self, db_session):
+        """Updates return the new row; other tenants' PMs are reported as missing."""
+        user = await _create_org_user(db_session, "UPD")
+        outsider = await _create_org_user(db_session, "UPD-OUT")
+        pm = PreventiveMaintenance(organization_id=user.organization_id, pm_number="PM-UPD", name="Old")
+        db_session.add(pm)
+        await db_session.commit()
+
+        updated = await update_pm(
+            db=db_session, current_user=user, pm_id=pm.id,
+            pm_data=PMUpdate(name="New", excluded_days={"weekdays": [6]}),
+        )
+        assert (updated.name, updated.excluded_days, updated.updated_by_id) == (
+            "New", {"weekdays": [6]}, user.id,
+        )
+
+        for call in (
+            update_pm(db=db_session, current_user=outsider, pm_id=pm.id, pm_data=PMUpdate(name="Stolen")),
+            delete_pm(db=db_session, current_user=outsider, pm_id=pm.id),
+        ):
+            with pytest.raises(HTTPException) as exc_info:
+                await call
+            assert exc_info.value.status_code == 404
+
+        await delete_pm(db=db_session, current_user=user, pm_id=pm.id)
+        row = (await db_session.execute(
+            select(PreventiveMaintenance.name, PreventiveMaintenance.is_active)
+            .where(PreventiveMaintenance.id == pm.id)
+        )).one()
+        assert tuple(row) == ("New", False)
+
+
+class TestPMNumbering:
+    """Test counter-backed PM and work order numbering."""
+
+    @pytest.mark.asyncio
+    async def test_pm_numbers_continue_from_existing_pms(self, db_session):
+        """The PM counter is seeded from existing PMs and then increments per call."""
+        user = await _create_org_user(db_session, "NUM")
+        db_session.add(PreventiveMaintenance(
+            organization_id=user.organization_id, pm_number="PM-LEGACY", name="Legacy",
+        ))
+        await db_session.flush()
+
+        assert await generate_pm_number(db_session, user.organization_id) == "PM-000002"
+        assert await generate_pm_number(db_session, user.organization_id) == "PM-000003"
+
+    @pytest.mark.asyncio
+    async def test_pm_and_manual_work_orders_share_one_sequence(self, db_session):
+        """Work orders generated from a PM and created by hand draw from the same counter."""
+        user = await _create_org_user(db_session, "WONUM")
+        pm = PreventiveMaintenance(
+            organization_id=user.organization_id, pm_number="PM-WONUM", name="Lube",
+            frequency=1, frequency_unit="WEEKS", next_due_date=date.today(),
+        )
+        db_session.add_all([
+            pm,
+            WorkOrder(organization_id=user.organization_id, wo_number="WO-LEGACY", title="Legacy"),
+        ])
+        await db_session.commit()
+
+        response = await generate_work_order(db=db_session, current_user=user, pm_id=pm.id)
+
+        assert response["wo_number"] == "WO-000002"
+        assert await generate_wo_number(db_session, user.organization_id) == "WO-000003"
+
+
+class TestPMCreation:
+    """Test creating PMs and job plans with their child rows."""
+
+    @pytest.mark.asyncio
+    async def test_job_plan_children_and_work_order_tasks(self, db_session):
+        """Job plan tasks and parts are stored, and copied tasks land on generated work orders."""
+        user = await _create_org_user(db_session, "CHILD")
+        part = Part(organization_id=user.organization_id, part_number="P-CHILD", name="Filter")
+        db_session.add(part)
+        await db_session.commit()
+
+        job_plan = await create_job_plan(db=db_session, current_user=user, jp_data=JobPlanCreate(
+            code="JP-CHILD",
+            name="Filter change",
+            tasks=[
+                {"sequence": 1, "description": "Isolate"},
+                {"sequence": 2, "description": "Swap filter", "estimated_hours": 0.5},
+            ],
+            parts=[{"part_id": part.id, "quantity": 2}],
+        ))
+        pm = await create_pm(db=db_session, current_user=user, pm_data=PMCreate(
+            name="Filter change",
+            job_plan_id=job_plan.id,
+            frequency=1,
+            frequency_unit="MONTHS",
+            schedules=[
+                {"name": "Monthly", "frequency": 1, "frequency_unit": "MONTHS"},
+                {"name": "Yearly", "sequence": 1, "frequency": 1, "frequency_unit": "YEARS"},
+            ],
+        ))
+        # Server-generated columns came back with the writes; no refresh was needed
+        assert PMResponse.model_validate(pm).created_at is not None
+        assert JobPlanResponse.model_validate(job_plan).revision == 1
+        updated = await update_job_plan(
+            db=db_session, current_user=user, jp_id=job_plan.id, jp_data=JobPlanUpdate(name="Filter swap"),
+        )
+        assert JobPlanResponse.model_validate(updated).revision == 2
+        db_session.expunge_all()
+
+        detail = await get_job_plan(db=db_session, current_user=user, jp_id=job_plan.id)
+        assert [task.description for task in sorted(detail.tasks, key=lambda t: t.sequence)] == [
+            "Isolate", "Swap filter",
+        ]
+        assert [(jp_part.part_id, jp_part.quantity) for jp_part in detail.parts] == [(part.id, 2)]
+
+        pm_detail = await get_pm(db=db_session, current_user=user, pm_id=pm.id)
+        assert sorted(schedule.name for schedule in pm_detail.schedules) == ["Monthly", "Yearly"]
+
+        response = await generate_work_order(db=db_session, current_user=user, pm_id=pm.id)
+        result = await db_session.execute(
+            select(WorkOrderTask.sequence, WorkOrderTask.description, WorkOrderTask.created_by_id)
+            .where(WorkOrderTask.work_order_id == response["work_order_id"])
+            .order_by(WorkOrderTask.sequence)
+        )
+        assert result.all() == [(1, "Isolate", user.id), (2, "Swap filter", user.id)]
+
+
+    @pytest.mark.asyncio
+    async def test_duplicate_job_plan_code_rejected(self, db_session):
+        """A duplicate job plan code is rejected by the insert and leaves the session usable."""
+        user = await _create_org_user(db_session, "DUP")
+        await create_job_plan(db=db_session, current_user=user, jp_data=JobPlanCreate(code="JP-DUP", name="First"))
+
+        with pytest.raises(HTTPException) as exc_info:
+            await create_job_plan(db=db_session, current_user=user, jp_data=JobPlanCreate(
+                code="JP-DUP", name="Second", tasks=[{"sequence": 1, "description": "Orphan"}],
+            ))
+        assert exc_info.value.status_code == 400
+
+        result = await db_session.execute(select(JobPlan.name).where(JobPlan.code == "JP-DUP"))
+        assert result.scalars().all() == ["First"]
+        assert (await db_session.execute(
+            select(JobPlanTask).where(JobPlanTask.description == "Orphan")
+        )).first() is None
+
+
+class TestPMDueDates:
+    """Test next due date calculation."""
+
+    def test_month_and_year_steps_clamp_to_month_end(self):
+        """Month and year steps land on the last valid day, using the full leap-year rule."""
+        assert add_frequency(date(2024, 1, 31), 1, "MONTHS") == date(2024, 2, 29)
+        assert add_frequency(date(2100, 1, 31), 1, "MONTHS") == date(2100, 2, 28)
+        assert add_frequency(date(2024, 11, 30), 3, "MONTHS") == date(2025, 2, 28)
+        assert add_frequency(date(2024, 2, 29), 1, "YEARS") == date(2025, 2, 28)
+        assert add_frequency(date(2024, 2, 29), 2, "WEEKS") == date(2024, 3, 14)
+        assert add_frequency(date(2024, 2, 29), 1, "FORTNIGHTS") is None
+
+    def test_endpoint_and_scheduler_agree(self):
+        """The endpoint and the scheduler step a fixed PM forward the same way."""
+        pm = PreventiveMaintenance(
+            frequency=1, frequency_unit="YEARS", schedule_type="FIXED", next_due_date=date(2028, 2, 29),
+        )
+        assert calculate_next_due_date(pm, pm.next_due_date) == date(2029, 2, 28)
+        assert PMScheduler(None)._calculate_next_due_date(pm) == date(2029, 2, 28)
+
+        pm.frequency_unit = None
+        assert calculate_next_due_date(pm, pm.next_due_date) is None
+
+    def test_unscheduled_pm_steps_from_given_today(self):
+        """A PM without a due date steps from the caller's today, in the endpoint and the scheduler."""
+        pm = PreventiveMaintenance(frequency=10, frequency_unit="DAYS", schedule_type="FIXED")
+        today = date(2030, 1, 1)
+        assert calculate_next_due_date(pm, pm.next_due_date, today) == date(2030, 1, 11)
+        assert PMScheduler(None)._calculate_next_due_date(pm, today) == date(2030, 1, 11)
+
+        pm.schedule_type = "FLOATING"
+        pm.next_due_date = date(2020, 1, 1)
+        assert PMScheduler(None)._calculate_next_due_date(pm, today) == date(2030, 1, 11)
+
+
+class TestPMScheduler:
+    """Test scheduled work order generation."""
+
+    @pytest.mark.asyncio
+    async def test_scheduled_work_order_copies_job_plan_tasks(self, db_session, test_session_maker):
+        """The scheduler copies job plan tasks onto the work order it generates."""
+        user = await _create_org_user(db_session, "SCHED")
+        job_plan = JobPlan(organization_id=user.organization_id, code="JP-SCHED", name="Inspect")
+        db_session.add(job_plan)
+        await db_session.flush()
+        db_session.add_all([
+            JobPlanTask(job_plan_id=job_plan.id, sequence=number, description=f"Step {number}")
+            for number in (2, 1)
+        ])
+        pm = PreventiveMaintenance(
+            organization_id=user.organization_id, pm_number="PM-SCHED", name="Inspect",
+            job_plan_id=job_plan.id, frequency=1, frequency_unit="DAYS", next_due_date=date.today(),
+        )
+        # wo_number is unique across organizations, so keep clear of other tests' numbers
+        counter = NumberCounter(organization_id=user.organization_id, name="work_order", last_value=900)
+        db_session.add_all([pm, counter])
+        await db_session.commit()
+
+        wo_id = await PMScheduler(test_session_maker)._generate_work_order(pm, db_session)
+
+        result = await db_session.execute(
+            select(WorkOrderTask.sequence, WorkOrderTask.description)
+            .where(WorkOrderTask.work_order_id == wo_id)
+            .order_by(WorkOrderTask.sequence)
+        )
+        assert result.all() == [(1, "Step 1"), (2, "Step 2")]
@@ -0,0 +1,829 @@
+"""
+Test reporting endpoints
+"""
+import json
+from datetime import date, datetime, timedelta
+
+import pytest
+
+from app.api.v1.endpoints import reports
+from app.core import cache
+from app.api.v1.endpoints.reports import (
+    get_dashboard_metrics,
+    get_asset_summary,
+    get_work_order_summary,
+    get_pm_compliance,
+    get_inventory_value,
+    get_mtbf_mttr,
+    get_notifications,
+    get_dashboard_widget_data,
+    get_dashboard_widgets_batch,
+    generate_report,
+)
+from app.core.security import get_password_hash
+from app.models.asset import Asset, AssetCriticality, AssetStatus
+from app.models.inventory import Part, PartStatus, StockLevel, Storeroom
+from app.models.organization import Organization
+from app.models.user import User
+from app.models.preventive_maintenance import PreventiveMaintenance
+from app.models.work_order import MaterialTransaction, WorkOrder, WorkOrderPriority, WorkOrderStatus, WorkOrderType
+from app.schemas.report import DashboardWidgetRequest
+from tests.test_cache import _FakeRedis
+
+
+@pytest.fixture(autouse=True)
+def read_sessions(monkeypatch, test_session_maker):
+    """Point the reports' concurrent read sessions at the test database."""
+    monkeypatch.setattr(reports, "read_session_maker", test_session_maker)
+
+
+async def _create_org_user(db_session, suffix: str):
+    """Create an org and a user in it, returning the user."""
+    org = Organization(code=f"RPT-{suffix}", name="Report Org")
+    db_session.add(org)
+    await db_session.flush()
+
+    user = User(
+        organization_id=org.id,
+        email=f"analyst-{suffix}@example.com",
+        username=f"analyst-{suffix}",
+        hashed_password=get_password_hash("password"),
+        first_name="Test",
+        last_name="Analyst",
+        is_active=True
+    )
+    db_session.add(user)
+    await db_session.flush()
+    return user
+
+
+async def _widget(db_session, user, widget: str, **filters) -> dict:
+    """Fetch a dashboard widget with unset filters left at their defaults."""
+    params = dict(
+        start_date=None, end_date=None, status=None, priority=None, work_type=None, assigned_to=None,
+        asset_status=None, criticality=None, storeroom=None, craft=None, labor_type=None, limit=10,
+    )
+    params.update(filters)
+    response = await get_dashboard_widget_data(current_user=user, widget=widget, **params)
+    return json.loads(response.body)
+
+
+class TestDashboard:
+    """Test dashboard metrics."""
+
+    @pytest.mark.asyncio
+    async def test_low_stock_counts_active_parts_once(self, db_session):
+        """Low stock counts each active part once, however many storerooms are below reorder point."""
+        user = await _create_org_user(db_session, "LOW")
+        org_id = user.organization_id
+        storerooms = [
+            Storeroom(organization_id=org_id, code=f"RPT-LOW-S{number}", name="Store")
+            for number in range(2)
+        ]
+        parts = {
+            key: Part(organization_id=org_id, part_number=f"RPT-LOW-{key}", name=key, status=status)
+            for key, status in [
+                ("twice", PartStatus.ACTIVE),
+                ("inactive", PartStatus.INACTIVE),
+                ("no-point", PartStatus.ACTIVE),
+                ("stocked", PartStatus.ACTIVE),
+            ]
+        }
+        db_session.add_all([*storerooms, *parts.values()])
+        await db_session.flush()
+
+        db_session.add_all([
+            StockLevel(
+                part_id=parts[key].id, storeroom_id=storerooms[index].id,
+                available_quantity=available, reorder_point=reorder_point,
+            )
+            for key, index, available, reorder_point in [
+                ("twice", 0, 1, 5),
+                ("twice", 1, 5, 5),
+                ("inactive", 0, 0, 5),
+                ("no-point", 0, 0, None),
+                ("stocked", 0, 10, 5),
+            ]
+        ])
+        await db_session.commit()
+
+        metrics = json.loads((await get_dashboard_metrics(current_user=user)).body)
+
+        assert metrics["inventory"]["low_stock_items"] == 1
+
+    @pytest.mark.asyncio
+    async def test_work_order_and_asset_counts(self, db_session):
+        """Dashboard and asset summary counts come back from their concurrent queries."""
+        user = await _create_org_user(db_session, "DASH")
+        org_id = user.organization_id
+        asset = Asset(organization_id=org_id, asset_num="RPT-DASH-A", name="Pump", status=AssetStatus.OPERATING)
+        db_session.add(asset)
+        await db_session.flush()
+        db_session.add_all([
+            WorkOrder(
+                organization_id=org_id, wo_number=f"RPT-DASH-{number}", title="Fix", asset_id=asset.id,
+                status=status, due_date=date.today() - timedelta(days=days_late),
+            )
+            for number, (status, days_late) in enumerate([
+                (WorkOrderStatus.APPROVED, 3),
+                (WorkOrderStatus.IN_PROGRESS, -3),
+                (WorkOrderStatus.CLOSED, 3),
+            ])
+        ])
+        db_session.add_all([
+            WorkOrder(
+                organization_id=org_id, wo_number=f"RPT-DASH-DONE-{number}", title="Done",
+                status=WorkOrderStatus.COMPLETED, due_date=date.today() - timedelta(days=3), actual_end=actual_end,
+            )
+            for number, actual_end in enumerate([datetime.combine(date.today(), datetime.min.time()), datetime(2000, 1, 1)])
+        ])
+        await db_session.commit()
+
+        metrics = json.loads((await get_dashboard_metrics(current_user=user)).body)
+        assert metrics["work_orders"] == {
+            "open": 2,
+            "overdue": 1,
+            "completed_this_month": 1,
+            "by_status": {"APPROVED": 1, "IN_PROGRESS": 1, "CLOSED": 1, "COMPLETED": 2},
+        }
+        assert metrics["assets"] == {"total_active": 1, "by_status": {"OPERATING": 1}}
+
+        summary = await get_asset_summary(current_user=user)
+        assert summary["total_active"] == 1
+        assert summary["top_by_work_orders"] == [
+            {"id": asset.id, "asset_num": "RPT-DASH-A", "name": "Pump", "work_order_count": 3},
+        ]
+
+
+    @pytest.mark.asyncio
+    async def test_top_assets_follow_work_order_changes(self, db_session):
+        """Top assets reflect work orders moved between assets and deleted."""
+        user = await _create_org_user(db_session, "TOP")
+        org_id = user.organization_id
+        pump, fan = [
+            Asset(organization_id=org_id, asset_num=f"RPT-TOP-{name}", name=name)
+            for name in ("pump", "fan")
+        ]
+        db_session.add_all([pump, fan])
+        await db_session.flush()
+        work_orders = [
+            WorkOrder(organization_id=org_id, wo_number=f"RPT-TOP-{number}", title="Fix", asset_id=pump.id)
+            for number in range(4)
+        ]
+        db_session.add_all(work_orders)
+        await db_session.flush()
+
+        work_orders[0].asset_id = fan.id
+        await db_session.delete(work_orders[1])
+        await db_session.commit()
+
+        summary = await get_asset_summary(current_user=user)
+        assert [(item["name"], item["work_order_count"]) for item in summary["top_by_work_orders"]] == [
+            ("pump", 2), ("fan", 1),
+        ]
+
+
+class TestDashboardWidgets:
+    """Test dashboard widget data."""
+
+    @pytest.mark.asyncio
+    async def test_cached_per_filter_set(self, db_session, monkeypatch):
+        """Each filter set gets its own cache entry, refreshed after a write bumps the version."""
+        client = _FakeRedis()
+        monkeypatch.setattr(cache, "get_redis", lambda: client)
+        user = await _create_org_user(db_session, "WIDGET")
+        org_id = user.organization_id
+        db_session.add_all([
+            WorkOrder(organization_id=org_id, wo_number=f"RPT-WIDGET-{number}", title="Fix", priority=priority)
+            for number, priority in enumerate([WorkOrderPriority.HIGH, WorkOrderPriority.LOW])
+        ])
+        await db_session.commit()
+
+        assert await _widget(db_session, user, "wo_by_status") == {"data": {"DRAFT": 2}}
+        assert await _widget(db_session, user, "wo_by_status", priority="HIGH") == {"data": {"DRAFT": 1}}
+        assert await _widget(db_session, user, "unknown") == {"error": "Unknown widget type: unknown"}
+
+        db_session.add(WorkOrder(organization_id=org_id, wo_number="RPT-WIDGET-2", title="Fix"))
+        await db_session.commit()
+        assert await _widget(db_session, user, "wo_by_status") == {"data": {"DRAFT": 2}}
+        await cache.bump_cache_version("reports", org_id)
+        assert await _widget(db_session, user, "wo_by_status") == {"data": {"DRAFT": 3}}
+
+
+    @pytest.mark.asyncio
+    async def test_reliability_widgets_cached_longer(self, db_session, monkeypatch):
+        """MTTR, MTBF and data integrity stay cached for five minutes, other widgets for one."""
+        client = _FakeRedis()
+        monkeypatch.setattr(cache, "get_redis", lambda: client)
+        user = await _create_org_user(db_session, "WTTL")
+
+        await _widget(db_session, user, "mttr")
+        await _widget(db_session, user, "wo_by_status")
+        assert sorted(client.ttls.values()) == [60, 300]
+
+
+    @pytest.mark.asyncio
+    async def test_pm_compliance_rate(self, db_session):
+        """Only completed PM work orders ended by their due date count as on time."""
+        user = await _create_org_user(db_session, "WPMC")
+        org_id = user.organization_id
+        due = date.today() - timedelta(days=2)
+        db_session.add_all([
+            WorkOrder(
+                organization_id=org_id, wo_number=f"RPT-WPMC-{number}", title="PM",
+                work_type=WorkOrderType.PREVENTIVE, status=status, due_date=due, actual_end=actual_end,
+            )
+            for number, (status, actual_end) in enumerate([
+                (WorkOrderStatus.COMPLETED, datetime.combine(due, datetime.max.time())),
+                (WorkOrderStatus.COMPLETED, datetime.combine(due + timedelta(days=1), datetime.min.time())),
+                (WorkOrderStatus.COMPLETED, None),
+                (WorkOrderStatus.IN_PROGRESS, datetime.combine(due, datetime.min.time())),
+            ])
+        ])
+        await db_session.commit()
+
+        assert await _widget(db_session, user, "pm_compliance_rate") == {
+            "data": {"total": 4, "on_time": 1, "compliance_rate": 25.0},
+        }
+
+
+    @pytest.mark.asyncio
+    async def test_low_stock_items_once_per_part(self, db_session):
+        """Low stock lists active parts once, with their first storeroom below reorder point."""
+        user = await _create_org_user(db_session, "WLOW")
+        org_id = user.organization_id
+        storerooms = [
+            Storeroom(organization_id=org_id, code=f"RPT-WLOW-S{number}", name="Store")
+            for number in range(2)
+        ]
+        parts = [
+            Part(organization_id=org_id, part_number=f"RPT-WLOW-{number}", name="Part", status=status)
+            for number, status in enumerate([PartStatus.ACTIVE, PartStatus.INACTIVE, PartStatus.ACTIVE])
+        ]
+        db_session.add_all([*storerooms, *parts])
+        await db_session.flush()
+        db_session.add_all([
+            StockLevel(
+                part_id=parts[part].id, storeroom_id=storerooms[store].id,
+                current_balance=balance, available_quantity=balance, reorder_point=5,
+            )
+            for part, store, balance in [(0, 0, 3), (0, 1, 1), (1, 0, 0), (2, 0, 9), (2, 1, 5)]
+        ])
+        await db_session.commit()
+
+        assert await _widget(db_session, user, "low_stock_items") == {"data": [
+            {"part_id": parts[0].id, "part_number": "RPT-WLOW-0", "name": "Part", "current": 3, "reorder_point": 5},
+            {"part_id": parts[2].id, "part_number": "RPT-WLOW-2", "name": "Part", "current": 5, "reorder_point": 5},
+        ]}
+        assert len((await _widget(db_session, user, "low_stock_items", limit=1))["data"]) == 1
+
+
+    @pytest.mark.asyncio
+    async def test_reactive_vs_preventive(self, db_session):
+        """Corrective and emergency work orders count as reactive against preventive ones."""
+        user = await _create_org_user(db_session, "WRVP")
+        db_session.add_all([
+            WorkOrder(organization_id=user.organization_id, wo_number=f"RPT-WRVP-{number}", title="Fix", work_type=work_type)
+            for number, work_type in enumerate([
+                WorkOrderType.CORRECTIVE, WorkOrderType.EMERGENCY, WorkOrderType.CORRECTIVE,
+                WorkOrderType.PREVENTIVE, WorkOrderType.INSPECTION,
+            ])
+        ])
+        await db_session.commit()
+
+        assert await _widget(db_session, user, "reactive_vs_preventive") == {"data": {
+            "reactive": 3, "preventive": 1, "reactive_pct": 75.0, "preventive_pct": 25.0,
+        }}
+
+
+    @pytest.mark.asyncio
+    async def test_asset_filters(self, db_session):
+        """Asset widgets filter on status and criticality and ignore unknown values."""
+        user = await _create_org_user(db_session, "WAST")
+        org_id = user.organization_id
+        assets = [
+            Asset(organization_id=org_id, asset_num=f"RPT-WAST-{number}", name=f"Asset {number}",
+                  status=status, criticality=criticality)
+            for number, (status, criticality) in enumerate([
+                (AssetStatus.OPERATING, AssetCriticality.CRITICAL),
+                (AssetStatus.OPERATING, AssetCriticality.LOW),
+                (AssetStatus.NOT_OPERATING, AssetCriticality.CRITICAL),
+            ])
+        ]
+        db_session.add_all(assets)
+        await db_session.flush()
+        db_session.add_all([
+            WorkOrder(organization_id=org_id, wo_number=f"RPT-WAST-{number}", title="Fix", asset_id=asset.id)
+            for number, asset in enumerate(assets)
+        ])
+        await db_session.commit()
+
+        async def names(**filters) -> set:
+            data = (await _widget(db_session, user, "assets_most_wo", **filters))["data"]
+            return {item["name"] for item in data}
+
+        assert await names() == {"Asset 0", "Asset 1", "Asset 2"}
+        assert await names(asset_status="OPERATING", criticality="CRITICAL") == {"Asset 0"}
+        assert await names(asset_status="bogus", criticality="CRITICAL") == {"Asset 0", "Asset 2"}
+
+
+    @pytest.mark.asyncio
+    async def test_created_trend_by_day(self, db_session):
+        """The created trend counts work orders per calendar day."""
+        user = await _create_org_user(db_session, "WTRD")
+        today = datetime.combine(date.today(), datetime.min.time())
+        db_session.add_all([
+            WorkOrder(organization_id=user.organization_id, wo_number=f"RPT-WTRD-{number}", title="Fix", created_at=created_at)
+            for number, created_at in enumerate([today, today + timedelta(hours=5), today - timedelta(days=1)])
+        ])
+        await db_session.commit()
+
+        assert await _widget(db_session, user, "wo_created_trend") == {"data": [
+            {"date": (date.today() - timedelta(days=1)).isoformat(), "count": 1},
+            {"date": date.today().isoformat(), "count": 2},
+        ]}
+
+
+    @pytest.mark.asyncio
+    async def test_batch_matches_single_widgets(self, db_session):
+        """A batch returns each widget's data in request order, as the single-widget endpoint would."""
+        user = await _create_org_user(db_session, "WBAT")
+        db_session.add_all([
+            WorkOrder(organization_id=user.organization_id, wo_number=f"RPT-WBAT-{number}", title="Fix", priority=priority)
+            for number, priority in enumerate([WorkOrderPriority.HIGH, WorkOrderPriority.LOW])
+        ])
+        await db_session.commit()
+
+        specs = [
+            DashboardWidgetRequest(widget="wo_by_status"),
+            DashboardWidgetRequest(widget="wo_by_status", priority="HIGH"),
+            DashboardWidgetRequest(widget="unknown"),
+        ]
+        response = await get_dashboard_widgets_batch(current_user=user, specs=specs)
+        assert json.loads(response.body) == [
+            await _widget(db_session, user, spec.widget, **spec.model_dump(exclude={"widget"}))
+            for spec in specs
+        ]
+
+
+    @pytest.mark.asyncio
+    async def test_least_used_parts_by_storeroom(self, db_session):
+        """Least used parts count only issues from the chosen storeroom and keep unused parts."""
+        user = await _create_org_user(db_session, "WLUP")
+        org_id = user.organization_id
+        storerooms = [
+            Storeroom(organization_id=org_id, code=f"RPT-WLUP-S{number}", name="Store")
+            for number in range(2)
+        ]
+        parts = [
+            Part(organization_id=org_id, part_number=f"RPT-WLUP-{number}", name=f"Part {number}", status=PartStatus.ACTIVE)
+            for number in range(2)
+        ]
+        work_order = WorkOrder(organization_id=org_id, wo_number="RPT-WLUP-WO", title="Fix")
+        db_session.add_all([*storerooms, *parts, work_order])
+        await db_session.flush()
+        db_session.add_all([
+            MaterialTransaction(
+                organization_id=org_id, work_order_id=work_order.id, part_id=parts[0].id,
+                storeroom_id=storerooms[store].id,
+                transaction_type="ISSUE", quantity=quantity, unit_cost=1, total_cost=quantity,
+            )
+            for store, quantity in [(0, 2), (1, 5)]
+        ])
+        await db_session.commit()
+
+        async def quantities(**filters) -> dict:
+            data = (await _widget(db_session, user, "least_used_parts", **filters))["data"]
+            return {item["name"]: item["quantity"] for item in data}
+
+        assert await quantities() == {"Part 1": 0, "Part 0": 7}
+        assert await quantities(storeroom=storerooms[0].id) == {"Part 1": 0, "Part 0": 2}
+
+
+    @pytest.mark.asyncio
+    async def test_data_integrity_score(self, db_session):
+        """Completed work orders score as valid only with failure code, cause and remedy all recorded."""
+        user = await _create_org_user(db_session, "WDIS")
+        ended = datetime.combine(date.today(), datetime.min.time())
+        db_session.add_all([
+            WorkOrder(
+                organization_id=user.organization_id, wo_number=f"RPT-WDIS-{number}", title="Fix",
+                status=WorkOrderStatus.COMPLETED, actual_end=ended,
+                failure_code=code, failure_cause=cause, failure_remedy=remedy,
+            )
+            for number, (code, cause, remedy) in enumerate([
+                ("LEAK", "Seal", "Replace"),
+                ("LEAK", "Seal", None),
+                ("", "Seal", "Replace"),
+                (None, None, None),
+            ])
+        ])
+        await db_session.commit()
+
+        assert await _widget(db_session, user, "data_integrity_score") == {
+            "data": {"score": 25.0, "valid": 1, "total": 4},
+        }
+
+
+    @pytest.mark.asyncio
+    async def test_mttr(self, db_session):
+        """MTTR averages positive repair times of completed reactive work orders."""
+        user = await _create_org_user(db_session, "WMTR")
+        ended = datetime.combine(date.today(), datetime.min.time())
+        db_session.add_all([
+            WorkOrder(
+                organization_id=user.organization_id, wo_number=f"RPT-WMTR-{number}", title="Fix",
+                status=WorkOrderStatus.COMPLETED, work_type=work_type,
+                actual_start=ended - timedelta(hours=hours), actual_end=ended,
+            )
+            for number, (work_type, hours) in enumerate([
+                (WorkOrderType.CORRECTIVE, 2),
+                (WorkOrderType.EMERGENCY, 5),
+                (WorkOrderType.CORRECTIVE, 0),
+                (WorkOrderType.PREVENTIVE, 9),
+            ])
+        ])
+        await db_session.commit()
+
+        assert await _widget(db_session, user, "mttr") == {"data": {"avg_hours": 3.5, "sample_size": 2}}
+        assert await _widget(db_session, user, "mttr", work_type="PREVENTIVE") == {
+            "data": {"avg_hours": 9.0, "sample_size": 1},
+        }
+
+
+    @pytest.mark.asyncio
+    async def test_mtbf(self, db_session):
+        """MTBF averages the gaps between consecutive failures of the same asset."""
+        user = await _create_org_user(db_session, "WMTB")
+        assets = [
+            Asset(organization_id=user.organization_id, asset_num=f"RPT-WMTB-{number}", name="Pump")
+            for number in range(2)
+        ]
+        db_session.add_all(assets)
+        await db_session.flush()
+        base = datetime.combine(date.today() - timedelta(days=5), datetime.min.time())
+        db_session.add_all([
+            WorkOrder(
+                organization_id=user.organization_id, wo_number=f"RPT-WMTB-{number}", title="Fix",
+                status=WorkOrderStatus.COMPLETED, work_type=WorkOrderType.CORRECTIVE, asset_id=asset.id,
+                actual_start=base + timedelta(hours=start), actual_end=base + timedelta(hours=start + 1),
+            )
+            for number, (asset, start) in enumerate([
+                (assets[0], 21),
+                (assets[0], 0),
+                (assets[0], 31),
+                (assets[1], 5),
+            ])
+        ])
+        await db_session.commit()
+
+        assert await _widget(db_session, user, "mtbf") == {"data": {"avg_hours": 14.5, "sample_size": 2}}
+
+
+    @pytest.mark.asyncio
+    async def test_grouped_counts_follow_each_filter_set(self, db_session):
+        """Cached compiled statements still bind each call's own filters."""
+        user = await _create_org_user(db_session, "WGRP")
+        db_session.add_all([
+            WorkOrder(
+                organization_id=user.organization_id, wo_number=f"RPT-WGRP-{number}", title="Fix",
+                status=status, priority=priority,
+                created_at=datetime.combine(date.today() - timedelta(days=age), datetime.min.time()),
+            )
+            for number, (status, priority, age) in enumerate([
+                (WorkOrderStatus.DRAFT, WorkOrderPriority.HIGH, 0),
+                (WorkOrderStatus.APPROVED, WorkOrderPriority.HIGH, 0),
+                (WorkOrderStatus.CLOSED, WorkOrderPriority.LOW, 0),
+                (WorkOrderStatus.DRAFT, WorkOrderPriority.LOW, 10),
+            ])
+        ])
+        await db_session.commit()
+
+        yesterday = date.today() - timedelta(days=1)
+        assert (await _widget(db_session, user, "wo_by_status"))["data"] == {"DRAFT": 2, "APPROVED": 1, "CLOSED": 1}
+        assert (await _widget(db_session, user, "wo_by_status", start_date=yesterday))["data"] == {
+            "DRAFT": 1, "APPROVED": 1, "CLOSED": 1,
+        }
+        assert (await _widget(db_session, user, "wo_by_status", priority="HIGH"))["data"] == {"DRAFT": 1, "APPROVED": 1}
+        assert (await _widget(db_session, user, "wo_by_status", priority="LOW"))["data"] == {"DRAFT": 1, "CLOSED": 1}
+        assert (await _widget(db_session, user, "wo_by_priority", status="OPEN"))["data"] == {"HIGH": 2, "LOW": 1}
+        assert (await _widget(db_session, user, "wo_by_priority", status="CLOSED"))["data"] == {"LOW": 1}
+        assert (await _widget(db_session, user, "wo_by_priority", status="DRAFT"))["data"] == {"HIGH": 1, "LOW": 1}
+        assert (await _widget(db_session, user, "wo_by_type", status="bogus"))["data"] == {"CORRECTIVE": 4}
+
+
+    @pytest.mark.asyncio
+    async def test_user_leaderboards(self, db_session):
+        """Per-user widgets name each assignee and total their open work."""
+        user = await _create_org_user(db_session, "WUSR")
+        db_session.add_all([
+            WorkOrder(
+                organization_id=user.organization_id, wo_number=f"RPT-WUSR-{number}", title="Fix",
+                status=status, assigned_to_id=user.id, estimated_hours=hours,
+            )
+            for number, (status, hours) in enumerate([
+                (WorkOrderStatus.APPROVED, 2),
+                (WorkOrderStatus.IN_PROGRESS, 3),
+                (WorkOrderStatus.COMPLETED, 5),
+            ])
+        ])
+        await db_session.commit()
+
+        assert await _widget(db_session, user, "open_wo_by_user") == {"data": [
+            {"user_id": user.id, "name": "Test Analyst", "count": 2},
+        ]}
+        assert await _widget(db_session, user, "user_workload") == {"data": [
+            {"user_id": user.id, "name": "Test Analyst", "wo_count": 2, "est_hours": 5.0},
+        ]}
+
+
+    @pytest.mark.asyncio
+    async def test_backlog_age_in_days(self, db_session):
+        """Backlog and on-hold widgets report each work order's age in whole days, oldest first."""
+        user = await _create_org_user(db_session, "WAGE")
+        work_orders = [
+            WorkOrder(
+                organization_id=user.organization_id, wo_number=f"RPT-WAGE-{age}", title="Fix",
+                status=WorkOrderStatus.ON_HOLD, priority=WorkOrderPriority.HIGH,
+                created_at=datetime.combine(date.today() - timedelta(days=age), datetime.max.time()),
+            )
+            for age in (1, 4)
+        ]
+        db_session.add_all(work_orders)
+        await db_session.commit()
+
+        for widget in ("wo_backlog_age", "waiting_for_parts"):
+            data = (await _widget(db_session, user, widget))["data"]
+            assert [(item["wo_number"], item["age_days"], item["priority"]) for item in data] == [
+                ("RPT-WAGE-4", 4, "HIGH"), ("RPT-WAGE-1", 1, "HIGH"),
+            ]
+
+
+class TestWorkOrderSummary:
+    """Test the work order summary report."""
+
+    @pytest.mark.asyncio
+    async def test_period_covers_whole_end_day(self, db_session):
+        """Work orders created any time on the end date count; the next midnight does not."""
+        user = await _create_org_user(db_session, "SUM")
+        start, end = date(2026, 3, 1), date(2026, 3, 31)
+        db_session.add_all([
+            WorkOrder(
+                organization_id=user.organization_id, wo_number=f"RPT-SUM-{number}", title="Fix",
+                created_at=created_at,
+            )
+            for number, created_at in enumerate([
+                datetime(2026, 2, 28, 23, 59),
+                datetime(2026, 3, 1),
+                datetime(2026, 3, 31, 23, 59, 59),
+                datetime(2026, 4, 1),
+            ])
+        ])
+        await db_session.commit()
+
+        summary = await get_work_order_summary(current_user=user, start_date=start, end_date=end)
+
+        assert summary["counts"]["created"] == 2
+
+    @pytest.mark.asyncio
+    async def test_breakdowns_costs_and_completion_time(self, db_session):
+        """Type and priority counts, costs and completion time roll up from the period's work orders."""
+        user = await _create_org_user(db_session, "BRK")
+        start, end = date(2026, 3, 1), date(2026, 3, 31)
+        db_session.add_all([
+            WorkOrder(
+                organization_id=user.organization_id, wo_number=f"RPT-BRK-{number}", title="Fix",
+                created_at=datetime(2026, 3, 2), work_type=work_type, priority=priority,
+                actual_labor_cost=labor, actual_material_cost=material, status=status,
+                actual_start=started, actual_end=ended,
+            )
+            for number, (work_type, priority, labor, material, status, started, ended) in enumerate([
+                (WorkOrderType.CORRECTIVE, WorkOrderPriority.HIGH, 100.0, 10.0, WorkOrderStatus.COMPLETED,
+                 datetime(2026, 3, 3, 8), datetime(2026, 3, 3, 10)),
+                (WorkOrderType.CORRECTIVE, WorkOrderPriority.LOW, 50.0, 0.0, WorkOrderStatus.COMPLETED,
+                 None, datetime(2026, 3, 4)),
+                (WorkOrderType.PREVENTIVE, WorkOrderPriority.HIGH, 0.0, 5.0, WorkOrderStatus.IN_PROGRESS,
+                 None, None),
+            ])
+        ])
+        await db_session.commit()
+
+        summary = await get_work_order_summary(current_user=user, start_date=start, end_date=end)
+
+        assert summary["counts"] == {"created": 3, "completed": 2}
+        assert summary["by_type"] == {"CORRECTIVE": 2, "PREVENTIVE": 1}
+        assert summary["by_priority"] == {"HIGH": 2, "LOW": 1}
+        assert summary["performance"] == {"average_completion_hours": 2.0}
+        assert summary["costs"] == {"total_labor": 150.0, "total_material": 15.0, "total": 165.0}
+
+
+class TestMTBFMTTR:
+    """Test the MTBF/MTTR reliability report."""
+
+    @pytest.mark.asyncio
+    async def test_repair_times_and_gaps_per_asset(self, db_session):
+        """Repair times and gaps between failures average per asset and overall."""
+        user = await _create_org_user(db_session, "MTBF")
+        org_id = user.organization_id
+        pump, fan = [
+            Asset(organization_id=org_id, asset_num=f"RPT-MTBF-{name}", name=name)
+            for name in ("pump", "fan")
+        ]
+        db_session.add_all([pump, fan])
+        await db_session.flush()
+        db_session.add_all([
+            WorkOrder(
+                organization_id=org_id, wo_number=f"RPT-MTBF-{number}", title="Repair", asset_id=asset.id,
+                work_type=WorkOrderType.CORRECTIVE, status=WorkOrderStatus.COMPLETED,
+                actual_start=started, actual_end=ended,
+            )
+            for number, (asset, started, ended) in enumerate([
+                (pump, datetime(2026, 1, 1, 0), datetime(2026, 1, 1, 2)),
+                (pump, datetime(2026, 1, 2, 0), datetime(2026, 1, 2, 4)),
+                (pump, datetime(2026, 1, 3, 0), datetime(2026, 1, 3, 0)),
+                (fan, datetime(2026, 1, 5, 0), datetime(2026, 1, 5, 6)),
+            ])
+        ])
+        await db_session.commit()
+
+        report = await get_mtbf_mttr(
+            db=db_session, current_user=user, asset_id=None,
+            start_date=date(2026, 1, 1), end_date=date(2026, 1, 31),
+            asset_status=None, criticality=None, category=None, location_id=None,
+            min_failures=2, include_single_failures=False,
+        )
+
+        assert report["overall"] == {"total_failures": 4, "average_mtbf_hours": 21.0, "average_mttr_hours": 4.0}
+        [metrics] = report["by_asset"]
+        assert metrics["asset_id"] == pump.id
+        assert (metrics["failure_count"], metrics["mtbf_hours"], metrics["mttr_hours"], metrics["sample_size"]) == (
+            3, 21.0, 3.0, 2,
+        )
+        assert metrics["availability"] == 87.5
+        assert metrics["last_failure_at"] == datetime(2026, 1, 3).isoformat()
+
+    @pytest.mark.asyncio
+    async def test_reliability_export(self, db_session):
+        """The asset reliability report rolls the same repair times and gaps up per asset."""
+        user = await _create_org_user(db_session, "REL")
+        org_id = user.organization_id
+        pump, fan = [
+            Asset(organization_id=org_id, asset_num=f"RPT-REL-{name}", name=name)
+            for name in ("pump", "fan")
+        ]
+        db_session.add_all([pump, fan])
+        await db_session.flush()
+        db_session.add_all([
+            WorkOrder(
+                organization_id=org_id, wo_number=f"RPT-REL-{number}", title="Repair", asset_id=asset.id,
+                work_type=WorkOrderType.CORRECTIVE, status=WorkOrderStatus.COMPLETED,
+                actual_start=started, actual_end=ended,
+            )
+            for number, (asset, started, ended) in enumerate([
+                (pump, datetime(2026, 1, 2, 0), datetime(2026, 1, 2, 4)),
+                (pump, datetime(2026, 1, 1, 0), datetime(2026, 1, 1, 2)),
+                (pump, datetime(2026, 1, 3, 0), datetime(2026, 1, 3, 0)),
+                (fan, datetime(2026, 1, 5, 0), datetime(2026, 1, 5, 6)),
+            ])
+        ])
+        await db_session.commit()
+
+        report = await generate_report(
+            db=db_session, current_user=user, report_type="asset_reliability", format="json",
+            start_date=date(2026, 1, 1), end_date=date(2026, 1, 31), asset_id=None, status=None,
+            priority=None, work_type=None, assigned_to=None, criticality=None, storeroom_id=None,
+        )
+
+        assert report["overall"] == {"total_failures": 4, "average_mtbf_hours": 21.0, "average_mttr_hours": 4.0}
+        assert [
+            (entry["asset_name"], entry["failures"], entry["mtbf_hours"], entry["mttr_hours"], entry["availability"])
+            for entry in report["assets"]
+        ] == [("pump", 3, 21.0, 3.0, "87.5%"), ("fan", 1, "-", 6.0, "0%")]
+
+
+class TestNotifications:
+    """Test notification alerts."""
+
+    @pytest.mark.asyncio
+    async def test_low_stock_alert_once_per_part(self, db_session):
+        """Each active part below reorder point raises one alert, from its storeroom furthest below."""
+        user = await _create_org_user(db_session, "NTF")
+        org_id = user.organization_id
+        storerooms = [
+            Storeroom(organization_id=org_id, code=f"RPT-NTF-S{number}", name="Store")
+            for number in range(2)
+        ]
+        parts = [
+            Part(organization_id=org_id, part_number=f"RPT-NTF-{key}", name=key, status=status)
+            for key, status in [
+                ("belt", PartStatus.ACTIVE),
+                ("filter", PartStatus.ACTIVE),
+                ("inactive", PartStatus.INACTIVE),
+            ]
+        ]
+        db_session.add_all([*storerooms, *parts])
+        await db_session.flush()
+        belt, filter_, inactive = parts
+        db_session.add_all([
+            StockLevel(
+                part_id=part.id, storeroom_id=storerooms[index].id,
+                current_balance=balance, available_quantity=balance, reorder_point=5,
+            )
+            for part, index, balance in [
+                (belt, 0, 10), (belt, 1, 2), (filter_, 0, 1), (filter_, 1, 0), (inactive, 0, 0),
+            ]
+        ])
+        await db_session.commit()
+
+        result = json.loads((await get_notifications(current_user=user)).body)
+
+        low_stock = sorted(
+            (item["id"], item["severity"]) for item in result["notifications"] if item["type"] == "low_stock"
+        )
+        assert low_stock == [
+            (f"low-stock-{belt.id}-{storerooms[1].id}", "warning"),
+            (f"low-stock-{filter_.id}-{storerooms[1].id}", "critical"),
+        ]
+
+
+class TestPMCompliance:
+    """Test the PM compliance report."""
+
+    @pytest.mark.asyncio
+    async def test_work_orders_classified_by_completion(self, db_session):
+        """PM work orders split into on time, late and not completed; missing dates count as on time."""
+        user = await _create_org_user(db_session, "PMC")
+        org_id = user.organization_id
+        pm = PreventiveMaintenance(organization_id=org_id, pm_number="RPT-PMC", name="Lube")
+        db_session.add(pm)
+        await db_session.flush()
+
+        due = date.today() - timedelta(days=5)
+        db_session.add_all([
+            WorkOrder(
+                organization_id=org_id, wo_number=f"RPT-PMC-{number}", title="PM", pm_id=pm.id,
+                work_type=WorkOrderType.PREVENTIVE, status=status, due_date=due_date, actual_end=actual_end,
+            )
+            for number, (status, due_date, actual_end) in enumerate([
+                (WorkOrderStatus.COMPLETED, due, datetime.combine(due, datetime.max.time())),
+                (WorkOrderStatus.COMPLETED, due, datetime.combine(due + timedelta(days=1), datetime.min.time())),
+                (WorkOrderStatus.COMPLETED, None, None),
+                (WorkOrderStatus.IN_PROGRESS, due, None),
+                (WorkOrderStatus.CANCELLED, due, None),
+            ])
+        ])
+        await db_session.commit()
+
+        report = await get_pm_compliance(current_user=user, start_date=None, end_date=None)
+
+        assert report["compliance"] == {
+            "total_pm_work_orders": 5,
+            "completed_on_time": 2,
+            "completed_late": 1,
+            "not_completed": 1,
+            "compliance_rate": 40.0,
+        }
+
+
+class TestInventoryValue:
+    """Test the inventory value report."""
+
+    @pytest.mark.asyncio
+    async def test_value_rolls_up_by_storeroom_and_part(self, db_session):
+        """Stock of active parts is valued per storeroom, in total and per top part."""
+        user = await _create_org_user(db_session, "VAL")
+        org_id = user.organization_id
+        storerooms = [
+            Storeroom(organization_id=org_id, code=f"RPT-VAL-S{number}", name="Store")
+            for number in range(2)
+        ]
+        parts = [
+            Part(organization_id=org_id, part_number=f"RPT-VAL-{key}", name=key, average_cost=cost, status=status)
+            for key, cost, status in [
+                ("bolt", 2.0, PartStatus.ACTIVE),
+                ("motor", 100.0, PartStatus.ACTIVE),
+                ("empty", 5.0, PartStatus.ACTIVE),
+                ("retired", 50.0, PartStatus.OBSOLETE),
+            ]
+        ]
+        db_session.add_all([*storerooms, *parts])
+        await db_session.flush()
+        bolt, motor, empty, retired = parts
+        db_session.add_all([
+            StockLevel(part_id=part.id, storeroom_id=storerooms[index].id, current_balance=balance)
+            for part, index, balance in [
+                (bolt, 0, 10), (bolt, 1, 5), (motor, 1, 1), (empty, 0, 0), (retired, 0, 3),
+            ]
+        ])
+        await db_session.commit()
+
+        report = await get_inventory_value(current_user=user)
+
+        assert report["summary"] == {"total_value": 130.0, "total_quantity": 16.0, "unique_parts": 2}
+        assert report["by_storeroom"] == {
+            str(storerooms[0].id): {"quantity": 10.0, "value": 20.0},
+            str(storerooms[1].id): {"quantity": 6.0, "value": 110.0},
+        }
+        assert [(item["name"], item["quantity"], item["total_value"]) for item in report["top_value_items"]] == [
+            ("motor", 1.0, 100.0), ("bolt", 15.0, 30.0),
+        ]